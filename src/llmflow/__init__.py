@@ -1,18 +1,37 @@
 """llmflow-core package."""
 
 from .artifacts import ARTIFACTS_VERSION, ArtifactsWriter
+from .cache import MemoryStepCache, SQLiteStepCache, StepCache
+from .events import (
+    RunCompleted,
+    RunEvent,
+    StepCompleted,
+    StepFailed,
+    StepOutputDelta,
+    StepStarted,
+)
+from .inputs import StepInputs
+from .plan import ExecutionPlan
 from .providers import (
+    AsyncProvider,
+    CachingProvider,
     MockProvider,
     Provider,
     ProviderMessage,
     ProviderRequest,
     ProviderResponse,
     ProviderUsage,
+    RateLimit,
+    RateLimitedProvider,
+    SyncProviderAdapter,
 )
 from .replay import replay
 from .registry import StepRegistry, ToolRegistry, ValidatorRegistry
-from .runner import RunConfig, RunResult, Runner
+from .retry import HedgePolicy, RetryPolicy
+from .runner import AsyncRunner, BatchResult, RunConfig, RunResult, Runner
+from .stats import StepDurations
 from .steps import LLMStep, Step
+from .steps.map import MapStep
 from .steps.tool import ToolStep
 from .steps.validate import ValidateStep
 from .workflow import InputDef, StepDef, Workflow, WorkflowMeta, WorkflowSpec
@@ -21,20 +40,42 @@ __all__ = [
     "InputDef",
     "ArtifactsWriter",
     "ARTIFACTS_VERSION",
+    "ExecutionPlan",
+    "AsyncProvider",
+    "AsyncRunner",
+    "BatchResult",
+    "CachingProvider",
+    "HedgePolicy",
     "Provider",
     "ProviderMessage",
     "ProviderRequest",
     "ProviderResponse",
     "ProviderUsage",
+    "RateLimit",
+    "RateLimitedProvider",
+    "MemoryStepCache",
     "MockProvider",
+    "SyncProviderAdapter",
+    "RetryPolicy",
+    "RunCompleted",
     "RunConfig",
+    "RunEvent",
     "RunResult",
+    "SQLiteStepCache",
     "Runner",
     "replay",
     "LLMStep",
+    "MapStep",
     "Step",
+    "StepCache",
+    "StepCompleted",
     "StepDef",
+    "StepDurations",
+    "StepFailed",
+    "StepInputs",
+    "StepOutputDelta",
     "StepRegistry",
+    "StepStarted",
     "ToolRegistry",
     "ToolStep",
     "ValidateStep",
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import json
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from importlib import metadata
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
+from . import jsonio
+from .bundle import WorkflowBundle
 from .errors import ArtifactsError, ArtifactsWriteError
-from .hashing import sha256_text
+from .hashing import sha256_json, sha256_text
 from .workflow import Workflow
 
 ARTIFACTS_VERSION = "1"
@@ -32,6 +33,13 @@ class RunMetadata:
     started_at: str
     ended_at: str
     run_id: str
+    timeline: dict[str, dict[str, Any]] = field(default_factory=dict)
+    cache_hits: dict[str, str] = field(default_factory=dict)
+    requested_outputs: list[str] = field(default_factory=list)
+    skipped_steps: list[str] = field(default_factory=list)
+    bundle_hash: str | None = None
+    bundle_files: dict[str, str | None] = field(default_factory=dict)
+    provider_cache: dict[str, dict[str, int]] = field(default_factory=dict)
 
     def as_dict(self) -> dict[str, Any]:
         return {
@@ -42,6 +50,8 @@ class RunMetadata:
                 "version": self.workflow_version,
                 "hash": self.workflow_hash,
                 "path": self.workflow_path,
+                "bundle_hash": self.bundle_hash,
+                "files": dict(self.bundle_files),
             },
             "provider": self.provider,
             "execution_order": list(self.execution_order),
@@ -52,6 +62,19 @@ class RunMetadata:
             "started_at": self.started_at,
             "ended_at": self.ended_at,
             "run_id": self.run_id,
+            "timeline": {
+                step_id: dict(entry) for step_id, entry in self.timeline.items()
+            },
+            "cache_hits": dict(self.cache_hits),
+            "requested_outputs": list(self.requested_outputs),
+            "skipped_steps": list(self.skipped_steps),
+            "provider_cache": {
+                "hits": sum(entry["hits"] for entry in self.provider_cache.values()),
+                "misses": sum(entry["misses"] for entry in self.provider_cache.values()),
+                "steps": {
+                    step_id: dict(entry) for step_id, entry in self.provider_cache.items()
+                },
+            },
         }
 
 
@@ -66,6 +89,9 @@ class ArtifactsWriter:
         run_id: str | None = None,
         started_at: datetime | None = None,
         engine_version: str | None = None,
+        requested_outputs: Sequence[str] | None = None,
+        skipped_steps: Sequence[str] = (),
+        bundle: WorkflowBundle | None = None,
     ) -> None:
         if not execution_order:
             raise ArtifactsError("execution_order must be non-empty")
@@ -77,6 +103,7 @@ class ArtifactsWriter:
 
         self._workflow = workflow
         self._execution_order = list(execution_order)
+        self._step_ids = frozenset(self._execution_order)
         self._provider_name = provider_name
         self._started_at = started_at or _utc_now()
         self._engine_version = engine_version or _load_engine_version()
@@ -84,6 +111,14 @@ class ArtifactsWriter:
         self._step_output_hashes: dict[str, str] = {}
         self._inputs_hash: str | None = None
         self._outputs_hash: str | None = None
+        self._timeline: dict[str, dict[str, Any]] = {}
+        self._cache_hits: dict[str, str] = {}
+        self._provider_cache: dict[str, dict[str, int]] = {}
+        self._requested_outputs = list(
+            workflow.spec.outputs if requested_outputs is None else requested_outputs
+        )
+        self._skipped_steps = list(skipped_steps)
+        self._bundle = bundle
 
         self._run_dir = _create_run_dir(
             Path(artifacts_dir), self._started_at, run_id
@@ -107,6 +142,23 @@ class ArtifactsWriter:
         output_hash = _write_json(step_path / "output.json", output)
         self._step_output_hashes[step_id] = output_hash
 
+    def write_step_passthrough(self, step_id: str, depends_on: Sequence[str]) -> None:
+        """Record that a step's output is its merged inputs, by reference.
+
+        The recorded output hash combines the inputs hash with the output
+        hashes of ``depends_on``, which together determine the output, so
+        the merged view is never serialized.
+        """
+        step_path = self._ensure_step_dir(step_id)
+        payload = {"inputs": True, "depends_on": list(depends_on)}
+        _write_json(step_path / "passthrough.json", payload)
+        self._step_output_hashes[step_id] = sha256_json(
+            {
+                "inputs": self._inputs_hash,
+                "depends_on": [self._step_output_hashes.get(dep) for dep in depends_on],
+            }
+        )
+
     def write_rendered_prompt(self, step_id: str, rendered_prompt: str) -> None:
         step_path = self._ensure_step_dir(step_id)
         try:
@@ -123,6 +175,69 @@ class ArtifactsWriter:
         step_path = self._ensure_step_dir(step_id)
         _write_json(step_path / "llm_call.json", payload)
 
+    def write_step_item(
+        self,
+        step_id: str,
+        item_path: Sequence[int],
+        *,
+        output: dict[str, Any] | None = None,
+        rendered_prompt: str | None = None,
+        llm_call: dict[str, Any] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Write artifacts for one element of a map step under ``items/``."""
+        item_dir = self._ensure_step_dir(step_id)
+        for index in item_path:
+            item_dir = item_dir / "items" / str(index)
+        try:
+            item_dir.mkdir(parents=True, exist_ok=True)
+            if rendered_prompt is not None:
+                item_dir.joinpath("rendered_prompt.md").write_text(
+                    rendered_prompt, encoding="utf-8"
+                )
+        except OSError as exc:
+            raise ArtifactsWriteError(
+                f"failed to write item artifacts for step '{step_id}': {exc}"
+            ) from exc
+        if llm_call is not None:
+            _write_json(item_dir / "llm_call.json", llm_call)
+        if output is not None:
+            _write_json(item_dir / "output.json", output)
+        if error is not None:
+            _write_json(
+                item_dir / "error.json",
+                {
+                    "step_id": step_id,
+                    "item": list(item_path),
+                    "error_type": error.__class__.__name__,
+                    "message": str(error),
+                    "stage": "step",
+                },
+            )
+
+    def record_step_timing(
+        self,
+        step_id: str,
+        *,
+        started_at: datetime,
+        ended_at: datetime,
+    ) -> None:
+        step_id = self._check_step_id(step_id)
+        duration = (ended_at - started_at).total_seconds()
+        self._timeline[step_id] = {
+            "started_at": _format_precise_timestamp(started_at),
+            "ended_at": _format_precise_timestamp(ended_at),
+            "duration_ms": round(duration * 1000, 3),
+        }
+
+    def record_cache_hit(self, step_id: str, cache_key: str) -> None:
+        step_id = self._check_step_id(step_id)
+        self._cache_hits[step_id] = cache_key
+
+    def record_provider_cache(self, step_id: str, *, hits: int, misses: int) -> None:
+        step_id = self._check_step_id(step_id)
+        self._provider_cache[step_id] = {"hits": hits, "misses": misses}
+
     def write_error(
         self,
         *,
@@ -160,15 +275,26 @@ class ArtifactsWriter:
             started_at=_format_timestamp(self._started_at),
             ended_at=_format_timestamp(end_time),
             run_id=self._run_dir.name,
+            timeline=self._timeline,
+            cache_hits=self._cache_hits,
+            requested_outputs=self._requested_outputs,
+            skipped_steps=self._skipped_steps,
+            bundle_hash=self._bundle.hash if self._bundle is not None else None,
+            bundle_files=dict(self._bundle.files) if self._bundle is not None else {},
+            provider_cache=self._provider_cache,
         )
         payload = metadata.as_dict()
         _write_json(self._run_dir / "metadata.json", payload)
         return payload
 
-    def _ensure_step_dir(self, step_id: str) -> Path:
+    def _check_step_id(self, step_id: str) -> str:
         step_id = _validate_component("step_id", step_id)
-        if step_id not in self._execution_order:
+        if step_id not in self._step_ids:
             raise ArtifactsError(f"unknown step_id '{step_id}'")
+        return step_id
+
+    def _ensure_step_dir(self, step_id: str) -> Path:
+        step_id = self._check_step_id(step_id)
         step_path = self._steps_dir / step_id
         step_path.mkdir(parents=True, exist_ok=True)
         return step_path
@@ -185,6 +311,13 @@ def _format_timestamp(value: datetime) -> str:
     return value.isoformat().replace("+00:00", "Z")
 
 
+def _format_precise_timestamp(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return value.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
 def _create_run_dir(
     artifacts_dir: Path,
     started_at: datetime,
@@ -231,12 +364,7 @@ def _validate_component(label: str, value: str | None) -> str:
 
 
 def _stable_json_dumps(payload: Any) -> str:
-    return json.dumps(
-        payload,
-        indent=2,
-        sort_keys=True,
-        ensure_ascii=True,
-    )
+    return jsonio.dumps(payload, indent=True)
 
 
 def _write_json(path: Path, payload: Any) -> str:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from .hashing import sha256_json
+
+if TYPE_CHECKING:
+    from .workflow import StepDef, Workflow
+
+# Files modified this recently may still change within the same mtime tick,
+# so their hashes are not reused.
+_RACY_WINDOW_NS = 2_000_000_000
+_READ_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class WorkflowBundle:
+    """Content hash of a workflow file and the prompts and schemas it uses.
+
+    ``files`` maps each file (relative to the workflow directory when it is
+    inside it) to its SHA-256, or ``None`` when the file is missing. ``hash``
+    is the SHA-256 of that mapping, so it changes when any file does.
+    """
+
+    hash: str
+    files: dict[str, str | None]
+
+
+class FileHashCache:
+    """SHA-256 of files, re-hashed only when their stat signature changes."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[tuple[int, int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def hash_file(self, path: str | Path) -> str | None:
+        """Return the file's SHA-256, or ``None`` if it cannot be read."""
+        key = os.fspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        digest = _sha256_file(key)
+        if digest is None:
+            return None
+        if time.time_ns() - stat.st_mtime_ns > _RACY_WINDOW_NS:
+            with self._lock:
+                self._entries[key] = (signature, digest)
+        return digest
+
+    def __getstate__(self) -> dict[str, object]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+_default_hashes = FileHashCache()
+
+
+def workflow_bundle(
+    workflow: Workflow,
+    *,
+    hashes: FileHashCache | None = None,
+) -> WorkflowBundle:
+    """Hash ``workflow`` together with every prompt and schema it references.
+
+    The workflow text is covered by ``workflow.workflow_hash``; referenced
+    files are hashed through ``hashes`` (a process-wide cache by default), so
+    unchanged files are not read again.
+    """
+    hashes = hashes if hashes is not None else _default_hashes
+    base_dir = workflow.path.parent.resolve()
+    files: dict[str, str | None] = {workflow.path.name: workflow.workflow_hash}
+    for path in sorted(set(_referenced_paths(workflow.spec.steps))):
+        files[_label(path, base_dir)] = hashes.hash_file(path)
+    digest = sha256_json(files)
+    return WorkflowBundle(hash=digest, files=files)
+
+
+def step_files(step: StepDef, base_dir: Path) -> list[str]:
+    """Return the ``WorkflowBundle.files`` labels of the files ``step`` reads."""
+    return [_label(path, base_dir) for path in _referenced_paths([step])]
+
+
+def _referenced_paths(steps: list[StepDef]) -> Iterator[str]:
+    for step in steps:
+        if step.prompt:
+            yield step.prompt
+        if step.output_schema:
+            yield step.output_schema
+        if step.map is not None:
+            yield from _referenced_paths([step.map.step])
+
+
+def _label(path: str, base_dir: Path) -> str:
+    # Relative labels keep the hash stable when a bundle directory moves.
+    resolved = Path(path)
+    try:
+        return resolved.relative_to(base_dir).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def _sha256_file(path: str) -> str | None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            while chunk := handle.read(_READ_CHUNK):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from . import jsonio
+from .errors import CacheError
+from .hashing import sha256_json
+
+
+class StepCache(ABC):
+    """Cross-run store of step outputs keyed by content hashes."""
+
+    @abstractmethod
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached output for ``key``, or ``None`` on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, output: dict[str, Any]) -> None:
+        """Store ``output`` under ``key``."""
+
+
+class MemoryStepCache(StepCache):
+    """In-process LRU cache with an optional time-to-live in seconds."""
+
+    def __init__(self, *, max_entries: int = 1024, ttl: float | None = None) -> None:
+        if max_entries < 1:
+            raise CacheError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, text = entry
+            if self._ttl is not None and time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return jsonio.loads(text)
+
+    def set(self, key: str, output: dict[str, Any]) -> None:
+        text = _try_encode(output)
+        if text is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class SQLiteStepCache(StepCache):
+    """Local SQLite-backed cache with size-based LRU eviction and TTL.
+
+    ``max_bytes`` caps the total size of stored outputs; least recently used
+    entries are evicted first. ``ttl`` is in seconds of wall-clock time.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = None,
+    ) -> None:
+        if max_bytes < 1:
+            raise CacheError("max_bytes must be at least 1")
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            text, created_at = row
+            if self._ttl is not None and now - created_at > self._ttl:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+        return jsonio.loads(text)
+
+    def set(self, key: str, output: dict[str, Any]) -> None:
+        text = _try_encode(output)
+        if text is None:
+            return
+        size = len(text.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            try:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self._path), check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+                )
+            except (OSError, sqlite3.Error) as exc:
+                raise CacheError(f"failed to open cache database '{self._path}': {exc}") from exc
+            self._conn = conn
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        if self._ttl is not None:
+            conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self._ttl,)
+            )
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self._max_bytes:
+            return
+        overflow = total - self._max_bytes
+        victims: list[str] = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ):
+            victims.append(key)
+            overflow -= size
+            if overflow <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        state["_conn"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def step_cache_key(workflow_hash: str, step_id: str, parts: dict[str, Any]) -> str:
+    payload = {"workflow_hash": workflow_hash, "step_id": step_id, **parts}
+    return sha256_json(payload)
+
+
+def _try_encode(payload: Any) -> str | None:
+    # Outputs that cannot be serialized are reported by the artifacts writer;
+    # the cache simply skips them.
+    try:
+        return jsonio.dumps(payload)
+    except (TypeError, ValueError):
+        return None
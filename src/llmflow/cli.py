@@ -7,6 +7,7 @@ from typing import Any, Iterable
 import typer
 from rich.console import Console
 
+from . import jsonio
 from .errors import (
     ArtifactsError,
     GraphError,
@@ -18,7 +19,7 @@ from .errors import (
 from .providers import MockProvider
 from .replay import replay
 from .runner import RunConfig, Runner
-from .workflow import Workflow
+from .workflow import StepDef, Workflow
 
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
@@ -59,6 +60,12 @@ def run(
         "--mock-output-file",
         help="Path to a JSON file used as the mock provider output.",
     ),
+    output_names: list[str] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Workflow output to produce; only its steps run. Repeat for multiple outputs.",
+    ),
 ) -> None:
     """Run a workflow using the deterministic mock provider."""
     try:
@@ -82,7 +89,7 @@ def run(
                 run_id=run_id,
             ),
         )
-        result = runner.run(workflow_obj, inputs)
+        result = runner.run(workflow_obj, inputs, outputs=output_names or None)
     except typer.BadParameter:
         raise
     except (WorkflowError, GraphError, StepExecutionError, ProviderError, ArtifactsError) as exc:
@@ -94,18 +101,127 @@ def run(
 
 
 @app.command()
-def graph(workflow: Path) -> None:
+def graph(
+    workflow: Path,
+    stats: bool = typer.Option(
+        False,
+        "--stats",
+        help="Also print levels, maximum width and the critical path.",
+    ),
+) -> None:
     """Print the execution order for a workflow."""
     try:
         workflow_obj = Workflow.load(workflow)
-        order = workflow_obj.graph().order
+        graph_obj = workflow_obj.graph()
     except (WorkflowError, GraphError) as exc:
         _exit_with_error(str(exc))
 
     console.print("Execution order:")
-    for index, step_id in enumerate(order, start=1):
+    for index, step_id in enumerate(graph_obj.order, start=1):
         console.print(f"{index}. {step_id}")
 
+    if stats:
+        critical_path = graph_obj.critical_path({})
+        console.print("Stats:")
+        console.print(f"Steps: {len(graph_obj.order)}")
+        console.print(
+            f"Dependencies: {sum(len(deps) for deps in graph_obj.edges.values())}"
+        )
+        console.print(f"Levels: {len(graph_obj.levels)}")
+        console.print(f"Max width: {graph_obj.width}")
+        console.print(
+            f"Critical path ({len(critical_path.steps)} steps): "
+            + " -> ".join(critical_path.steps)
+        )
+
+
+@app.command()
+def serve(
+    workflows: list[Path],
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind."),
+    port: int = typer.Option(8000, "--port", help="TCP port to listen on."),
+    socket_path: Path | None = typer.Option(
+        None,
+        "--socket",
+        help="Listen on a Unix domain socket instead of TCP.",
+    ),
+    workers: int = typer.Option(
+        4,
+        "--workers",
+        min=1,
+        help="Number of runs executed concurrently.",
+    ),
+    artifacts_dir: Path = typer.Option(
+        Path(".runs"),
+        "--artifacts-dir",
+        help="Directory to store run artifacts.",
+    ),
+    provider_name: str = typer.Option(
+        "mock",
+        "--provider-name",
+        help="Provider name recorded in metadata.",
+    ),
+    mock_output: str | None = typer.Option(
+        None,
+        "--mock-output",
+        help="JSON object used as the mock provider output.",
+    ),
+    mock_output_file: Path | None = typer.Option(
+        None,
+        "--mock-output-file",
+        help="Path to a JSON file used as the mock provider output.",
+    ),
+    cache_dir: Path | None = typer.Option(
+        None,
+        "--cache-dir",
+        help="Directory for compiled workflow cache entries.",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        help="Reload workflows when their YAML, prompt or schema files change.",
+    ),
+) -> None:
+    """Serve workflows over HTTP, compiling them once at startup."""
+    from .server import WorkflowServer
+
+    try:
+        workflow_objs = [Workflow.load(path, cache_dir=cache_dir) for path in workflows]
+        output_text = _load_mock_output(mock_output, mock_output_file)
+        if output_text is None and any(_has_llm_steps(item) for item in workflow_objs):
+            raise typer.BadParameter(
+                "LLM steps require --mock-output or --mock-output-file."
+            )
+        runner = Runner(
+            provider=MockProvider(default_output=output_text or "{}", strict=False),
+            config=RunConfig(artifacts_dir=artifacts_dir, provider_name=provider_name),
+        )
+        app_server = WorkflowServer(
+            runner,
+            workflow_objs,
+            workers=workers,
+            watch_interval=1.0 if watch else None,
+        )
+    except typer.BadParameter:
+        raise
+    except (WorkflowError, GraphError, StepExecutionError, ProviderError, ArtifactsError) as exc:
+        _exit_with_error(str(exc))
+
+    if socket_path is not None:
+        http_server = app_server.create_unix_server(socket_path)
+        address = f"unix:{socket_path}"
+    else:
+        http_server = app_server.create_http_server(host, port)
+        address = f"http://{host}:{http_server.server_address[1]}"
+    console.print(f"Serving {', '.join(app_server.workflow_names)} on {address}")
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.server_close()
+        app_server.close()
+
 
 @app.command("replay")
 def replay_cmd(
@@ -169,18 +285,25 @@ def _load_mock_output(
     if mock_output is None:
         return None
     try:
-        payload = json.loads(mock_output)
+        payload = jsonio.loads(mock_output)
     except json.JSONDecodeError as exc:
         raise typer.BadParameter(
             f"mock output must be valid JSON: {exc}"
         ) from exc
     if not isinstance(payload, dict):
         raise typer.BadParameter("mock output must be a JSON object")
-    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return jsonio.dumps(payload)
 
 
 def _has_llm_steps(workflow: Workflow) -> bool:
-    return any(step.type == "llm" for step in workflow.spec.steps)
+    return any(_is_llm_step(step) for step in workflow.spec.steps)
+
+
+def _is_llm_step(step: StepDef) -> bool:
+    if step.type == "llm":
+        return True
+    # Map steps run their child step once per element.
+    return step.map is not None and _is_llm_step(step.map.step)
 
 
 def _exit_with_error(message: str) -> None:
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_DEADLINE: ContextVar[float | None] = ContextVar("llmflow_deadline", default=None)
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the active step deadline, or ``None`` if unbounded."""
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+@contextmanager
+def deadline_scope(deadline: float | None) -> Iterator[None]:
+    """Set the active deadline, as a ``time.monotonic()`` value, for the block."""
+    token = _DEADLINE.set(deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
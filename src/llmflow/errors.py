@@ -38,6 +38,10 @@ class ProviderError(Exception):
     """Base error for provider operations."""
 
 
+class ProviderRateLimitError(ProviderError):
+    """Raised when a provider call is throttled or cannot get rate budget."""
+
+
 class StepExecutionError(Exception):
     """Base error for step execution failures."""
 
@@ -58,6 +62,18 @@ class LLMOutputValidationError(StepExecutionError):
     """Raised when an LLM output fails JSON schema validation."""
 
 
+class StepTimeoutError(StepExecutionError):
+    """Raised when a step exceeds its configured timeout."""
+
+
+class RunDeadlineExceededError(StepTimeoutError):
+    """Raised when a run exceeds its configured deadline."""
+
+
+class MapStepError(StepExecutionError):
+    """Raised when a map step input is invalid or one of its items fails."""
+
+
 class ToolError(Exception):
     """Base error for tool registry and execution."""
 
@@ -98,5 +114,9 @@ class ArtifactsWriteError(ArtifactsError):
     """Raised when artifacts cannot be written to disk."""
 
 
+class CacheError(Exception):
+    """Raised when a step result cache is misconfigured or unavailable."""
+
+
 class ReplayError(Exception):
     """Raised when replay fails or artifacts are inconsistent."""
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Mapping, Union
+
+if TYPE_CHECKING:
+    from .runner import RunResult
+
+
+@dataclass(frozen=True)
+class StepStarted:
+    step_id: str
+
+
+@dataclass(frozen=True)
+class StepOutputDelta:
+    """A chunk of streamed LLM output.
+
+    ``attempt`` counts provider calls within the step, so consumers can drop
+    the text of an attempt that was retried.
+    """
+
+    step_id: str
+    text: str
+    attempt: int = 1
+
+
+@dataclass(frozen=True)
+class StepCompleted:
+    step_id: str
+    output: Mapping[str, Any]
+    started_at: datetime
+    ended_at: datetime
+    cache_hit: bool = False
+
+
+@dataclass(frozen=True)
+class StepFailed:
+    step_id: str
+    error: Exception
+    started_at: datetime
+    ended_at: datetime
+
+
+@dataclass(frozen=True)
+class RunCompleted:
+    result: RunResult
+
+
+RunEvent = Union[StepStarted, StepOutputDelta, StepCompleted, StepFailed, RunCompleted]
@@ -2,48 +2,185 @@ from __future__ import annotations
 
 from collections import deque
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from functools import cached_property
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
 
-from .errors import GraphCycleError, GraphDependencyError
+from .errors import GraphCycleError, GraphDependencyError, GraphError
 
 if TYPE_CHECKING:
     from .workflow import StepDef
 
 
+@dataclass(frozen=True)
+class CriticalPath:
+    steps: list[str]
+    cost: float
+
+
 @dataclass(frozen=True)
 class Graph:
+    """Dependency graph in topological ``order``.
+
+    ``edges`` maps each step to the steps that depend on it. Derived views
+    (levels, width, reachability) are computed on first use and cached.
+    """
+
     order: list[str]
     edges: dict[str, list[str]]
 
+    @cached_property
+    def dependencies(self) -> dict[str, list[str]]:
+        """Map each step to the steps it depends on."""
+        dependencies: dict[str, list[str]] = {step_id: [] for step_id in self.order}
+        for step_id in self.order:
+            for dependent in self.edges[step_id]:
+                dependencies[dependent].append(step_id)
+        return dependencies
+
+    @cached_property
+    def levels(self) -> list[list[str]]:
+        """Group steps by depth: each level depends only on earlier levels."""
+        depth: dict[str, int] = {}
+        levels: list[list[str]] = []
+        for step_id in self.order:
+            level = max((depth[dep] + 1 for dep in self.dependencies[step_id]), default=0)
+            depth[step_id] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(step_id)
+        return levels
+
+    @cached_property
+    def width(self) -> int:
+        """Size of the largest level, a bound for useful step concurrency."""
+        return max((len(level) for level in self.levels), default=0)
+
+    def ancestors(self, step_id: str) -> list[str]:
+        """Return the steps ``step_id`` transitively depends on, in order."""
+        return self._members(self._ancestor_bits[self._index(step_id)])
+
+    def descendants(self, step_id: str) -> list[str]:
+        """Return the steps that transitively depend on ``step_id``, in order.
+
+        These are the steps that must rerun when ``step_id`` changes.
+        """
+        return self._members(self._descendant_bits[self._index(step_id)])
+
+    def critical_path(
+        self,
+        costs: Mapping[str, float],
+        *,
+        default: float | None = None,
+    ) -> CriticalPath:
+        """Return the most expensive dependency chain under ``costs``.
+
+        Steps missing from ``costs`` use ``default`` (see ``path_costs``).
+        """
+        remaining = self.path_costs(costs, default=default)
+        if not remaining:
+            return CriticalPath(steps=[], cost=0.0)
+        # max() keeps the first of equal candidates, so ties follow ``order``.
+        step_id = max(self.order, key=remaining.__getitem__)
+        cost = remaining[step_id]
+        steps = [step_id]
+        while self.edges[step_id]:
+            step_id = max(self.edges[step_id], key=remaining.__getitem__)
+            steps.append(step_id)
+        return CriticalPath(steps=steps, cost=cost)
+
+    def path_costs(
+        self,
+        costs: Mapping[str, float],
+        *,
+        default: float | None = None,
+    ) -> dict[str, float]:
+        """Return each step's most expensive remaining path to a sink.
+
+        The value includes the step's own cost. Steps without a known cost use
+        ``default``, which falls back to the mean of the known costs (or
+        ``1.0`` when there are none, measuring chain length in steps).
+        """
+        if default is None:
+            known = [costs[step_id] for step_id in self.order if step_id in costs]
+            default = sum(known) / len(known) if known else 1.0
+        remaining: dict[str, float] = {}
+        for step_id in reversed(self.order):
+            tail = max((remaining[dependent] for dependent in self.edges[step_id]), default=0.0)
+            remaining[step_id] = costs.get(step_id, default) + tail
+        return remaining
+
+    # Reachability is indexed with one integer bitset per step, where bit i
+    # stands for ``order[i]``. Each index is built in a single pass over the
+    # order on first query.
+
+    @cached_property
+    def _positions(self) -> dict[str, int]:
+        return {step_id: index for index, step_id in enumerate(self.order)}
+
+    @cached_property
+    def _ancestor_bits(self) -> list[int]:
+        positions = self._positions
+        bits = [0] * len(self.order)
+        for index, step_id in enumerate(self.order):
+            mask = 0
+            for dep in self.dependencies[step_id]:
+                dep_index = positions[dep]
+                mask |= bits[dep_index] | (1 << dep_index)
+            bits[index] = mask
+        return bits
+
+    @cached_property
+    def _descendant_bits(self) -> list[int]:
+        positions = self._positions
+        bits = [0] * len(self.order)
+        for index in range(len(self.order) - 1, -1, -1):
+            mask = 0
+            for dependent in self.edges[self.order[index]]:
+                dependent_index = positions[dependent]
+                mask |= bits[dependent_index] | (1 << dependent_index)
+            bits[index] = mask
+        return bits
+
+    def _index(self, step_id: str) -> int:
+        try:
+            return self._positions[step_id]
+        except KeyError:
+            raise GraphError(f"unknown step '{step_id}'") from None
+
+    def _members(self, mask: int) -> list[str]:
+        # bin() renders the highest bit first; reverse it so index i is bit i.
+        flags = bin(mask)[:1:-1]
+        return [self.order[index] for index, flag in enumerate(flags) if flag == "1"]
+
 
 def build_graph(steps: list[StepDef]) -> Graph:
     step_ids = [step.id for step in steps]
-    step_id_set = set(step_ids)
-
-    edges: dict[str, list[str]] = {step_id: [] for step_id in step_ids}
-    for step in steps:
-        for dep in step.depends_on:
-            if dep not in step_id_set:
-                raise GraphDependencyError(f"unknown dependency '{dep}' in step '{step.id}'")
-            edges[dep].append(step.id)
-
-    order = topo_sort(steps)
-    return Graph(order=order, edges=edges)
+    edges = _dependents(steps, step_ids)
+    return Graph(order=_order(steps, step_ids, edges), edges=edges)
 
 
 def topo_sort(steps: list[StepDef]) -> list[str]:
     step_ids = [step.id for step in steps]
-    step_id_set = set(step_ids)
+    return _order(steps, step_ids, _dependents(steps, step_ids))
 
-    indegree = {step_id: 0 for step_id in step_ids}
-    dependents: dict[str, list[str]] = {step_id: [] for step_id in step_ids}
 
+def _dependents(steps: list[StepDef], step_ids: list[str]) -> dict[str, list[str]]:
+    edges: dict[str, list[str]] = {step_id: [] for step_id in step_ids}
     for step in steps:
         for dep in step.depends_on:
-            if dep not in step_id_set:
+            dependents = edges.get(dep)
+            if dependents is None:
                 raise GraphDependencyError(f"unknown dependency '{dep}' in step '{step.id}'")
-            indegree[step.id] += 1
-            dependents[dep].append(step.id)
+            dependents.append(step.id)
+    return edges
+
+
+def _order(
+    steps: list[StepDef],
+    step_ids: list[str],
+    edges: Mapping[str, list[str]],
+) -> list[str]:
+    indegree = {step.id: len(step.depends_on) for step in steps}
 
     order: list[str] = []
     queue = deque(step_id for step_id in step_ids if indegree[step_id] == 0)
@@ -51,13 +188,46 @@ def topo_sort(steps: list[StepDef]) -> list[str]:
     while queue:
         node = queue.popleft()
         order.append(node)
-        for neighbor in dependents[node]:
+        for neighbor in edges[node]:
             indegree[neighbor] -= 1
             if indegree[neighbor] == 0:
                 queue.append(neighbor)
 
     if len(order) != len(step_ids):
-        remaining = [step_id for step_id in step_ids if step_id not in order]
-        raise GraphCycleError(f"cycle detected among steps: {remaining}")
+        cycle = _find_cycle(steps, indegree)
+        raise GraphCycleError(f"cycle detected among steps: {' -> '.join(cycle)}")
 
     return order
+
+
+def _find_cycle(steps: list[StepDef], indegree: Mapping[str, int]) -> list[str]:
+    # Every step left with a positive indegree after Kahn's algorithm has an
+    # unresolved dependency that is itself unresolved, so walking those
+    # dependencies must revisit a step; the revisited segment is a cycle.
+    depends_on = {step.id: step.depends_on for step in steps}
+    node = next(step.id for step in steps if indegree[step.id] > 0)
+    position: dict[str, int] = {}
+    path: list[str] = []
+    while node not in position:
+        position[node] = len(path)
+        path.append(node)
+        node = next(dep for dep in depends_on[node] if indegree[dep] > 0)
+    # ``path`` follows dependencies; report the cycle in execution direction.
+    cycle = path[position[node]:]
+    return [node, *reversed(cycle[1:]), node]
+
+
+def ancestor_closure(
+    dependencies: Mapping[str, Sequence[str]],
+    targets: Iterable[str],
+) -> set[str]:
+    """Return ``targets`` and every step they transitively depend on."""
+    closure: set[str] = set()
+    stack = list(targets)
+    while stack:
+        step_id = stack.pop()
+        if step_id in closure:
+            continue
+        closure.add(step_id)
+        stack.extend(dependencies[step_id])
+    return closure
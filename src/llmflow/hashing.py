@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+from typing import Any
+
+from . import jsonio
 
 
 def sha256_bytes(data: bytes) -> str:
@@ -9,3 +12,8 @@ def sha256_bytes(data: bytes) -> str:
 
 def sha256_text(text: str) -> str:
     return sha256_bytes(text.encode("utf-8"))
+
+
+def sha256_json(payload: Any) -> str:
+    """Hash the canonical JSON encoding of ``payload``."""
+    return sha256_text(jsonio.dumps(payload))
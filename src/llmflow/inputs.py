@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import weakref
+from collections import ChainMap
+from typing import Any, Generic, Iterator, Mapping, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class StepInputs(Mapping[str, Any]):
+    """Read-only layered view over workflow inputs and dependency outputs.
+
+    Layers are given lowest-precedence first, so a key in a later layer
+    shadows the same key in an earlier one, matching successive
+    ``dict.update`` calls. No layer is copied.
+    """
+
+    __slots__ = ("_layers", "_chain", "__weakref__")
+
+    def __init__(self, layers: Sequence[Mapping[str, Any]]) -> None:
+        flattened: list[Mapping[str, Any]] = []
+        for layer in layers:
+            if isinstance(layer, StepInputs):
+                flattened.extend(layer._layers)
+            else:
+                flattened.append(layer)
+        self._layers = tuple(flattened)
+        self._chain: ChainMap[str, Any] = ChainMap(*reversed(flattened))
+
+    @property
+    def layers(self) -> tuple[Mapping[str, Any], ...]:
+        return self._layers
+
+    def __getitem__(self, key: str) -> Any:
+        return self._chain[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._chain
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chain)
+
+    def __len__(self) -> int:
+        return len(self._chain)
+
+    def __repr__(self) -> str:
+        return f"StepInputs({dict(self._chain)!r})"
+
+    def __str__(self) -> str:
+        # Templates print ``{{ inputs }}`` as the dict this view stands for.
+        return str(dict(self._chain))
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self._chain)
+
+
+class InputsMemo(Generic[T]):
+    """Values derived from a step's inputs, kept while the inputs are alive.
+
+    Lets ``Step.cache_key`` hand work it has done to ``execute``, which the
+    runner calls with the same inputs object. Entries are keyed by identity
+    and dropped when the inputs are freed; inputs that cannot be weakly
+    referenced, such as plain dicts, are not memoized.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[int, T] = {}
+
+    def store(self, inputs: Mapping[str, Any], value: T) -> None:
+        key = id(inputs)
+        try:
+            weakref.finalize(inputs, self._values.pop, key, None)
+        except TypeError:
+            return
+        self._values[key] = value
+
+    def take(self, inputs: Mapping[str, Any]) -> T | None:
+        """Remove and return the value stored for ``inputs``, if any."""
+        return self._values.pop(id(inputs), None)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import codecs
+import json
+import os
+from typing import Any, Callable
+
+# The guards below scan a translated copy of the text with substring
+# searches, which is several times faster than a regular expression.
+# ``_DIGITS`` maps digits and "-" to "0" and every other byte to "x".
+_DIGITS = bytes(0x30 if byte in b"-0123456789" else 0x78 for byte in range(256))
+# Integers too large for 64 bits are decoded as floats by the fast parsers.
+_LONG_INTEGER = b"0" * 19
+# ``_SHAPES`` keeps "0", maps the other digits to "1", keeps "-", ".", "e",
+# "n", "u" and "l", and turns every other byte into "x".
+_SHAPES = bytes(
+    0x31 if byte in b"123456789" else byte if byte in b"0-.enul" else 0x78
+    for byte in range(256)
+)
+# Encoded output differs from the stdlib's for floats below 1e-4 (orjson
+# writes 0.00001 and 1e-7, the stdlib 1e-05 and 1e-07), for positive
+# exponents (1e16 against 1e+16) and for null, which is also how NaN and
+# Infinity come out. Such payloads are re-encoded with the stdlib; matches
+# inside strings only cost that fallback. Shapes are searched with an "x"
+# on either side, so numbers at the edges match too.
+_DIFFERING = (
+    b"x0.0000",
+    b"-0.0000",
+    b"0e0",
+    b"0e1",
+    b"1e0",
+    b"1e1",
+    b"e-0x",
+    b"e-1x",
+    b"null",
+)
+# Exact types the fast libraries encode as the stdlib does. Any other value,
+# including subclasses, UUIDs, enums, datetimes and dataclasses, sends the
+# payload to the stdlib, which encodes or rejects it itself.
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+class JsonBackend:
+    """JSON encoding and decoding on top of one JSON library.
+
+    Every backend produces exactly the stdlib's output: ``dumps`` gives sorted
+    keys, ASCII-only text and either the compact canonical form (``","`` and
+    ``":"`` separators) or, with ``indent=True``, two-space indentation.
+    ``loads`` returns the same values as ``json.loads`` and raises
+    ``json.JSONDecodeError`` for invalid documents, and ``dumps`` raises
+    ``TypeError`` for exactly the payloads the stdlib rejects. Fast backends
+    hand any payload they cannot reproduce exactly to the stdlib.
+    """
+
+    name = "json"
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(self, payload: Any, *, indent: bool = False) -> str:
+        if indent:
+            return json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=True)
+        return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+class _FastBackend(JsonBackend):
+    def __init__(
+        self,
+        name: str,
+        decode: Callable[[str | bytes], Any],
+        encode: Callable[[Any, bool], bytes | None],
+        errors: tuple[type[Exception], ...] = (),
+    ) -> None:
+        self.name = name
+        self._decode = decode
+        self._encode = encode
+        self._errors = (TypeError, ValueError, OverflowError, *errors)
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            raw = data.encode("utf-8") if isinstance(data, str) else data
+            if _LONG_INTEGER not in raw.translate(_DIGITS):
+                return self._decode(raw)
+        except (UnicodeEncodeError, *self._errors):
+            pass
+        # Invalid documents, NaN and Infinity, lone surrogates and long
+        # integers: the stdlib decides, and words the error.
+        return json.loads(data)
+
+    def dumps(self, payload: Any, *, indent: bool = False) -> str:
+        encoded = None
+        if _only_json_types(payload):
+            try:
+                encoded = self._encode(payload, indent)
+            except self._errors:
+                pass
+        if encoded is None:
+            return super().dumps(payload, indent=indent)
+        shapes = b"x" + encoded.translate(_SHAPES) + b"x"
+        if any(marker in shapes for marker in _DIFFERING):
+            return super().dumps(payload, indent=indent)
+        if encoded.isascii() and b"\x7f" not in encoded:
+            return encoded.decode("ascii")
+        # Only string contents can be non-ASCII, so escaping every such
+        # character matches ensure_ascii.
+        text = encoded.decode("utf-8").replace("\x7f", "\\u007f")
+        return text.encode("ascii", _ESCAPE_ERRORS).decode("ascii")
+
+
+def _only_json_types(payload: Any) -> bool:
+    # Iterative, and skipping scalars without pushing them, since this runs
+    # over every value of the payload before the fast encode.
+    stack = [payload]
+    scalars = _SCALARS
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind in scalars:
+            continue
+        if kind is dict:
+            value = value.values()
+        elif kind is not list and kind is not tuple:
+            return False
+        for item in value:
+            if type(item) not in scalars:
+                stack.append(item)
+    return True
+
+
+_ESCAPE_ERRORS = "llmflow.jsonio.escape"
+
+
+def _escape_non_ascii(exc: UnicodeError) -> tuple[str, int]:
+    if not isinstance(exc, UnicodeEncodeError):
+        raise exc
+    parts: list[str] = []
+    for char in exc.object[exc.start:exc.end]:
+        code = ord(char)
+        if code < 0x10000:
+            parts.append(f"\\u{code:04x}")
+        else:
+            code -= 0x10000
+            parts.append(f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}")
+    return "".join(parts), exc.end
+
+
+codecs.register_error(_ESCAPE_ERRORS, _escape_non_ascii)
+
+
+def _orjson_backend() -> JsonBackend | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    compact = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    indented = compact | orjson.OPT_INDENT_2
+
+    def encode(payload: Any, indent: bool) -> bytes:
+        # Types the stdlib rejects are passed through to raise here too.
+        return orjson.dumps(payload, option=indented if indent else compact)
+
+    return _FastBackend("orjson", orjson.loads, encode)
+
+
+def _msgspec_backend() -> JsonBackend | None:
+    try:
+        import msgspec
+    except ImportError:
+        return None
+
+    encoder = msgspec.json.Encoder(order="sorted")
+    decoder = msgspec.json.Decoder()
+
+    def encode(payload: Any, indent: bool) -> bytes | None:
+        # msgspec's indented layout is not the stdlib's; only the compact
+        # form is encoded here.
+        if indent:
+            return None
+        return encoder.encode(payload)
+
+    return _FastBackend("msgspec", decoder.decode, encode, (msgspec.MsgspecError,))
+
+
+_FACTORIES: dict[str, Callable[[], JsonBackend | None]] = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": JsonBackend,
+}
+# msgspec is only used when asked for by name: it speeds up compact output
+# only, and indented artifact files fall back to the stdlib.
+_AUTOMATIC = ("orjson", "json")
+
+
+def available_backends() -> list[str]:
+    """Return the names of the backends that can be used, fastest first."""
+    return [name for name, factory in _FACTORIES.items() if factory() is not None]
+
+
+def get_backend(name: str | None = None) -> JsonBackend:
+    """Return the backend called ``name``, or the active one.
+
+    The active backend is orjson when installed and the stdlib otherwise,
+    unless the ``LLMFLOW_JSON_BACKEND`` environment variable names another.
+    """
+    if name is None:
+        return _active
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        raise ValueError(f"unknown JSON backend '{name}'")
+    backend = factory()
+    if backend is None:
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    return backend
+
+
+def _select_backend() -> JsonBackend:
+    requested = os.environ.get("LLMFLOW_JSON_BACKEND")
+    if requested:
+        return get_backend(requested)
+    for name in _AUTOMATIC:
+        backend = _FACTORIES[name]()
+        if backend is not None:
+            return backend
+    return JsonBackend()
+
+
+_active = _select_backend()
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode a JSON document with the active backend."""
+    return _active.loads(data)
+
+
+def dumps(payload: Any, *, indent: bool = False) -> str:
+    """Encode ``payload`` in the canonical form with the active backend."""
+    return _active.dumps(payload, indent=indent)
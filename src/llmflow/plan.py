@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Sequence
+
+from .errors import StepExecutionError
+from .bundle import WorkflowBundle
+from .graph import Graph, ancestor_closure
+from .steps.base import Step
+from .workflow import StepDef, Workflow
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Pre-resolved, reusable form of a workflow produced by ``Runner.compile``.
+
+    A plan holds the resolved order, dependency index and ready-to-run step
+    objects. It is read-only after construction, so it can be executed many
+    times (and concurrently) with only per-run state allocated. Step objects
+    are bound to the provider and registries of the runner that compiled them.
+    ``bundle`` is the workflow bundle hash taken when the plan was built.
+    """
+
+    workflow: Workflow
+    graph: Graph
+    definitions: Mapping[str, StepDef]
+    dependencies: Mapping[str, tuple[str, ...]]
+    steps: Mapping[str, Step]
+    output_steps: frozenset[str]
+    outputs: Mapping[str, str]
+    skipped_steps: tuple[str, ...] = ()
+    bundle: WorkflowBundle | None = None
+
+    @property
+    def order(self) -> list[str]:
+        return list(self.graph.order)
+
+    def select_outputs(self, names: Sequence[str]) -> ExecutionPlan:
+        """Return a plan that produces only the ``names`` workflow outputs.
+
+        Only the steps those outputs transitively depend on are kept; the
+        rest are listed in ``skipped_steps``. Step objects are shared with
+        this plan.
+        """
+        if not names:
+            raise StepExecutionError("at least one workflow output must be requested")
+        unknown = [name for name in names if name not in self.outputs]
+        if unknown:
+            raise StepExecutionError(
+                f"unknown workflow outputs: {', '.join(unknown)}"
+            )
+        outputs = {name: self.outputs[name] for name in dict.fromkeys(names)}
+        keep = ancestor_closure(self.dependencies, outputs.values())
+        order = [step_id for step_id in self.graph.order if step_id in keep]
+        graph = Graph(
+            order=order,
+            edges={
+                step_id: [dep for dep in self.graph.edges[step_id] if dep in keep]
+                for step_id in order
+            },
+        )
+        return ExecutionPlan(
+            workflow=self.workflow,
+            graph=graph,
+            definitions=MappingProxyType({s: self.definitions[s] for s in order}),
+            dependencies=MappingProxyType({s: self.dependencies[s] for s in order}),
+            steps=MappingProxyType({s: self.steps[s] for s in order}),
+            output_steps=frozenset(outputs.values()),
+            outputs=MappingProxyType(outputs),
+            skipped_steps=tuple(
+                step.id for step in self.workflow.spec.steps if step.id not in keep
+            ),
+            bundle=self.bundle,
+        )
@@ -1,11 +1,30 @@
-from .base import Provider, ProviderMessage, ProviderRequest, ProviderResponse, ProviderUsage
+from .base import (
+    AsyncProvider,
+    Provider,
+    ProviderMessage,
+    ProviderRequest,
+    ProviderResponse,
+    ProviderUsage,
+    SyncProviderAdapter,
+    as_async_provider,
+)
+from .cache import CachingProvider
 from .mock import MockProvider
+from .ratelimit import AdaptiveConcurrency, RateLimit, RateLimitedProvider, TokenBucket
 
 __all__ = [
+    "AdaptiveConcurrency",
+    "AsyncProvider",
+    "CachingProvider",
     "MockProvider",
     "Provider",
     "ProviderMessage",
     "ProviderRequest",
     "ProviderResponse",
     "ProviderUsage",
+    "RateLimit",
+    "RateLimitedProvider",
+    "SyncProviderAdapter",
+    "TokenBucket",
+    "as_async_provider",
 ]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Iterator, Literal
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -41,6 +42,7 @@ class ProviderRequest(BaseModel):
     seed: int | None = None
     temperature: float | None = None
     max_tokens: int | None = None
+    timeout: float | None = None
 
     @field_validator("model")
     @classmethod
@@ -91,3 +93,73 @@ class Provider(ABC):
     @abstractmethod
     def call(self, request: ProviderRequest) -> ProviderResponse:
         """Execute the provider call and return a normalized response."""
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether ``stream()`` yields output as it is generated."""
+        return False
+
+    def stream(self, request: ProviderRequest) -> Iterator[str]:
+        """Yield the output text in chunks as the model generates it.
+
+        Callers close the iterator to abort the request early, so streaming
+        providers should cancel the underlying request when their generator
+        is closed. The default yields the whole ``call()`` output at once.
+        """
+        yield self.call(request).output_text
+
+
+class AsyncProvider(ABC):
+    @abstractmethod
+    async def acall(self, request: ProviderRequest) -> ProviderResponse:
+        """Execute the provider call without blocking the event loop."""
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether ``astream()`` yields output as it is generated."""
+        return False
+
+    async def astream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        """Async counterpart of ``Provider.stream``."""
+        response = await self.acall(request)
+        yield response.output_text
+
+
+class SyncProviderAdapter(AsyncProvider):
+    """Expose a synchronous provider through the async interface.
+
+    Calls run on the default executor via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, provider: Provider) -> None:
+        self._provider = provider
+
+    @property
+    def provider(self) -> Provider:
+        return self._provider
+
+    async def acall(self, request: ProviderRequest) -> ProviderResponse:
+        return await asyncio.to_thread(self._provider.call, request)
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._provider.supports_streaming
+
+    async def astream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        # Each chunk is pulled on the executor so a slow stream never blocks
+        # the event loop; closing this generator closes the wrapped one.
+        chunks = self._provider.stream(request)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await asyncio.to_thread(chunks.close)
+
+
+def as_async_provider(provider: Provider | AsyncProvider) -> AsyncProvider:
+    if isinstance(provider, AsyncProvider):
+        return provider
+    return SyncProviderAdapter(provider)
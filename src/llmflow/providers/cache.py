@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, AsyncIterator, Iterator
+
+from pydantic import ValidationError
+
+from ..cache import StepCache
+from ..errors import ProviderError
+from ..hashing import sha256_json
+from ..tracing import current_trace
+from .base import AsyncProvider, Provider, ProviderRequest, ProviderResponse, as_async_provider
+
+# Bumped when the key layout or the stored response format changes.
+_KEY_FORMAT = 1
+
+
+class CachingProvider(Provider, AsyncProvider):
+    """Wrap a provider with a persistent cache of its responses.
+
+    Responses are stored in ``cache`` (e.g. a ``SQLiteStepCache``, which caps
+    its size with LRU eviction and a TTL) under a hash of the whole request
+    except its timeout. Only deterministic requests, with ``temperature`` 0 or
+    a ``seed``, are cached unless ``cache_all`` is set; other requests go
+    straight to the wrapped provider. ``namespace`` separates providers that
+    share one store.
+
+    Hits and misses are counted in ``hits`` and ``misses`` and reported per
+    step and per run under ``provider_cache`` in the run metadata.
+    """
+
+    def __init__(
+        self,
+        provider: Provider | AsyncProvider,
+        cache: StepCache,
+        *,
+        namespace: str = "",
+        cache_all: bool = False,
+    ) -> None:
+        self._provider = provider
+        self._cache = cache
+        self._namespace = namespace
+        self._cache_all = cache_all
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def provider(self) -> Provider | AsyncProvider:
+        return self._provider
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._provider.supports_streaming
+
+    def cache_key(self, request: ProviderRequest) -> str | None:
+        """Return the cache key of ``request``, or ``None`` if it is not cached."""
+        if not self._cache_all and request.temperature != 0 and request.seed is None:
+            return None
+        return sha256_json(
+            {
+                "format": _KEY_FORMAT,
+                "namespace": self._namespace,
+                "request": request.model_dump(exclude={"timeout"}),
+            }
+        )
+
+    def call(self, request: ProviderRequest) -> ProviderResponse:
+        if not isinstance(self._provider, Provider):
+            raise ProviderError("wrapped provider is async-only; use acall()")
+        key = self.cache_key(request)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = self._provider.call(request)
+        self._store(key, response)
+        return response
+
+    async def acall(self, request: ProviderRequest) -> ProviderResponse:
+        key = self.cache_key(request)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = await as_async_provider(self._provider).acall(request)
+        self._store(key, response)
+        return response
+
+    def stream(self, request: ProviderRequest) -> Iterator[str]:
+        if not isinstance(self._provider, Provider):
+            raise ProviderError("wrapped provider is async-only; use astream()")
+        key = self.cache_key(request)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached.output_text
+            return
+        parts: list[str] = []
+        for chunk in self._provider.stream(request):
+            parts.append(chunk)
+            yield chunk
+        # Only a stream that ran to completion is stored; an aborted one
+        # never gets here.
+        self._store_stream(key, request, parts)
+
+    async def astream(self, request: ProviderRequest) -> AsyncIterator[str]:
+        key = self.cache_key(request)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached.output_text
+            return
+        parts: list[str] = []
+        async for chunk in as_async_provider(self._provider).astream(request):
+            parts.append(chunk)
+            yield chunk
+        self._store_stream(key, request, parts)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str | None) -> ProviderResponse | None:
+        if key is None:
+            return None
+        cached = self._cache.get(key)
+        response: ProviderResponse | None = None
+        if cached is not None:
+            try:
+                response = ProviderResponse.model_validate(cached)
+            except ValidationError:
+                # Left by an incompatible version; the fresh response replaces it.
+                response = None
+        hit = response is not None
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        trace = current_trace()
+        if trace is not None:
+            if hit:
+                trace.provider_cache_hits += 1
+            else:
+                trace.provider_cache_misses += 1
+        return response
+
+    def _store(self, key: str | None, response: ProviderResponse) -> None:
+        if key is not None:
+            self._cache.set(key, response.model_dump())
+
+    def _store_stream(self, key: str | None, request: ProviderRequest, parts: list[str]) -> None:
+        output_text = "".join(parts)
+        if key is not None and output_text.strip():
+            self._store(key, ProviderResponse(model=request.model, output_text=output_text))
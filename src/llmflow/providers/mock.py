@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterator
 
 from ..errors import ProviderError
 from .base import Provider, ProviderRequest, ProviderResponse
@@ -13,28 +13,44 @@ class MockProvider(Provider):
         *,
         default_output: str | None = None,
         strict: bool = True,
+        chunk_size: int | None = None,
     ) -> None:
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
         self._responses = dict(responses or {})
         self._default_output = default_output
         self._strict = strict
+        self._chunk_size = chunk_size
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._chunk_size is not None
 
     def call(self, request: ProviderRequest) -> ProviderResponse:
         key = _request_key(request)
-        if key in self._responses:
-            output = self._responses[key]
-        elif self._default_output is not None:
-            output = self._default_output
-        elif self._strict:
-            raise ProviderError(f"mock provider has no response for key: {key}")
-        else:
-            output = ""
-
         return ProviderResponse(
             model=request.model,
-            output_text=output,
+            output_text=self._output(key),
             raw={"mock_key": key},
         )
 
+    def stream(self, request: ProviderRequest) -> Iterator[str]:
+        if self._chunk_size is None:
+            yield from super().stream(request)
+            return
+        output = self._output(_request_key(request))
+        for start in range(0, len(output), self._chunk_size):
+            yield output[start:start + self._chunk_size]
+
+    def _output(self, key: str) -> str:
+        if key in self._responses:
+            return self._responses[key]
+        if self._default_output is not None:
+            return self._default_output
+        if self._strict:
+            raise ProviderError(f"mock provider has no response for key: {key}")
+        return ""
+
 
 def _request_key(request: ProviderRequest) -> str:
     if request.prompt is not None:
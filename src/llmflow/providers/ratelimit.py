@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from ..deadlines import remaining_time
+from ..errors import ProviderError, ProviderRateLimitError
+from .base import AsyncProvider, Provider, ProviderRequest, ProviderResponse, as_async_provider
+
+# Rough prompt size estimate used to reserve token budget before the response
+# reports actual usage.
+_CHARS_PER_TOKEN = 4
+_ASYNC_POLL_INTERVAL = 0.01
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Budgets for one model.
+
+    ``requests_per_second`` and ``tokens_per_minute`` are enforced with token
+    buckets. Concurrency starts at ``initial_concurrency`` and adapts between
+    ``min_concurrency`` and ``max_concurrency``: it grows additively while
+    calls succeed and halves on ``ProviderRateLimitError``. When
+    ``latency_target`` (seconds) is set, slower calls shrink it gently too.
+    """
+
+    requests_per_second: float | None = None
+    tokens_per_minute: float | None = None
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    latency_target: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.requests_per_second is not None and self.requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0")
+        if self.tokens_per_minute is not None and self.tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be greater than 0")
+        if not 1 <= self.min_concurrency <= self.initial_concurrency <= self.max_concurrency:
+            raise ValueError(
+                "concurrency bounds must satisfy "
+                "1 <= min_concurrency <= initial_concurrency <= max_concurrency"
+            )
+        if self.latency_target is not None and self.latency_target <= 0:
+            raise ValueError("latency_target must be greater than 0")
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` always succeeds and returns how long the caller must wait
+    before using the reservation, so it works for threads and event loops.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, when negative) ``amount`` after the fact."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._capacity, self._tokens - amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: additive increase, multiplicative decrease."""
+
+    def __init__(self, limit: RateLimit) -> None:
+        self._config = limit
+        self._limit = float(limit.initial_concurrency)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, *, throttled: bool = False, latency: float | None = None) -> None:
+        config = self._config
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(float(config.min_concurrency), self._limit / 2)
+            elif (
+                latency is not None
+                and config.latency_target is not None
+                and latency > config.latency_target
+            ):
+                self._limit = max(float(config.min_concurrency), self._limit * 0.9)
+            elif latency is not None:
+                # Roughly +1 per window of successful calls.
+                self._limit = min(float(config.max_concurrency), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+
+class _ModelLimiter:
+    def __init__(self, limit: RateLimit) -> None:
+        self.requests = (
+            TokenBucket(limit.requests_per_second, max(limit.requests_per_second, 1.0))
+            if limit.requests_per_second is not None
+            else None
+        )
+        self.tokens = (
+            TokenBucket(limit.tokens_per_minute / 60, limit.tokens_per_minute)
+            if limit.tokens_per_minute is not None
+            else None
+        )
+        self.concurrency = AdaptiveConcurrency(limit)
+
+    def reserve(self, request: ProviderRequest, estimate: int) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(estimate))
+        budget = remaining_time()
+        if budget is not None and delay > budget:
+            # Waiting would overrun the step deadline; give the budget back.
+            self.refund(estimate)
+            raise ProviderRateLimitError(
+                f"rate limit wait for model '{request.model}' exceeds the remaining deadline"
+            )
+        return delay
+
+    def refund(self, estimate: int) -> None:
+        if self.requests is not None:
+            self.requests.adjust(-1)
+        if self.tokens is not None:
+            self.tokens.adjust(-estimate)
+
+    def settle(self, response: ProviderResponse, estimate: int) -> None:
+        if self.tokens is None or response.usage is None:
+            return
+        usage = response.usage
+        actual = usage.total_tokens
+        if actual is None and (usage.input_tokens is not None or usage.output_tokens is not None):
+            actual = (usage.input_tokens or 0) + (usage.output_tokens or 0)
+        if actual is not None:
+            self.tokens.adjust(actual - estimate)
+
+
+class RateLimitedProvider(Provider, AsyncProvider):
+    """Wrap a provider with per-model rate limits and adaptive concurrency.
+
+    ``limits`` maps model names to budgets; ``default`` applies to other
+    models (which are not limited when it is ``None``). Token budgets reserve
+    an estimate before each call and are settled from ``ProviderUsage``.
+    The wrapped provider should raise ``ProviderRateLimitError`` when the
+    backend throttles a request.
+    """
+
+    def __init__(
+        self,
+        provider: Provider | AsyncProvider,
+        *,
+        limits: Mapping[str, RateLimit] | None = None,
+        default: RateLimit | None = None,
+    ) -> None:
+        self._provider = provider
+        self._limits = dict(limits or {})
+        self._default = default
+        self._limiters: dict[str, _ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self) -> Provider | AsyncProvider:
+        return self._provider
+
+    def concurrency_limit(self, model: str) -> int | None:
+        limiter = self._limiter(model)
+        return limiter.concurrency.limit if limiter is not None else None
+
+    def call(self, request: ProviderRequest) -> ProviderResponse:
+        if not isinstance(self._provider, Provider):
+            raise ProviderError("wrapped provider is async-only; use acall()")
+        limiter = self._limiter(request.model)
+        if limiter is None:
+            return self._provider.call(request)
+
+        estimate = _estimate_tokens(request)
+        delay = limiter.reserve(request, estimate)
+        if delay:
+            time.sleep(delay)
+        if not limiter.concurrency.acquire(timeout=remaining_time()):
+            limiter.refund(estimate)
+            raise ProviderRateLimitError(
+                f"no concurrency slot for model '{request.model}' before the deadline"
+            )
+        started = time.monotonic()
+        try:
+            response = self._provider.call(request)
+        except ProviderRateLimitError:
+            limiter.concurrency.release(throttled=True)
+            raise
+        except BaseException:
+            limiter.concurrency.release()
+            raise
+        limiter.concurrency.release(latency=time.monotonic() - started)
+        limiter.settle(response, estimate)
+        return response
+
+    async def acall(self, request: ProviderRequest) -> ProviderResponse:
+        provider = as_async_provider(self._provider)
+        limiter = self._limiter(request.model)
+        if limiter is None:
+            return await provider.acall(request)
+
+        estimate = _estimate_tokens(request)
+        delay = limiter.reserve(request, estimate)
+        if delay:
+            await asyncio.sleep(delay)
+        # Slots may be released from other threads, so waiting polls instead
+        # of tying an asyncio primitive to one loop.
+        budget = remaining_time()
+        give_up = time.monotonic() + budget if budget is not None else None
+        while not limiter.concurrency.try_acquire():
+            if give_up is not None and time.monotonic() >= give_up:
+                limiter.refund(estimate)
+                raise ProviderRateLimitError(
+                    f"no concurrency slot for model '{request.model}' before the deadline"
+                )
+            await asyncio.sleep(_ASYNC_POLL_INTERVAL)
+        started = time.monotonic()
+        try:
+            response = await provider.acall(request)
+        except ProviderRateLimitError:
+            limiter.concurrency.release(throttled=True)
+            raise
+        except BaseException:
+            limiter.concurrency.release()
+            raise
+        limiter.concurrency.release(latency=time.monotonic() - started)
+        limiter.settle(response, estimate)
+        return response
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Budgets are tracked per process; a copy starts with fresh limiters.
+        state = dict(self.__dict__)
+        del state["_lock"]
+        state["_limiters"] = {}
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _limiter(self, model: str) -> _ModelLimiter | None:
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limit = self._limits.get(model, self._default)
+                if limit is None:
+                    return None
+                limiter = self._limiters[model] = _ModelLimiter(limit)
+            return limiter
+
+
+def _estimate_tokens(request: ProviderRequest) -> int:
+    if request.prompt is not None:
+        text_length = len(request.prompt)
+    else:
+        text_length = sum(len(message.content) for message in request.messages or [])
+    return max(1, text_length // _CHARS_PER_TOKEN + (request.max_tokens or 0))
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Mapping
 
 from .errors import (
     StepNotFoundError,
@@ -42,8 +44,8 @@ class StepRegistry:
         return step_cls(definition, **kwargs)
 
 
-ToolFn = Callable[[dict[str, Any]], dict[str, Any]]
-ValidatorFn = Callable[[dict[str, Any]], bool | None]
+ToolFn = Callable[[Mapping[str, Any]], dict[str, Any] | Awaitable[dict[str, Any]]]
+ValidatorFn = Callable[[Mapping[str, Any]], bool | None]
 
 
 class ToolRegistry:
@@ -66,15 +68,33 @@ class ToolRegistry:
         except KeyError as exc:
             raise ToolNotFoundError(f"tool '{name}' is not registered") from exc
 
-    def call(self, name: str, inputs: dict[str, Any]) -> dict[str, Any]:
+    def call(self, name: str, inputs: Mapping[str, Any]) -> dict[str, Any]:
         fn = self.get(name)
+        if inspect.iscoroutinefunction(fn):
+            raise ToolExecutionError(
+                f"tool '{name}' is async and requires an async runner")
         try:
             result = fn(inputs)
         except Exception as exc:  # pragma: no cover - defensive wrapping
             raise ToolExecutionError(f"tool '{name}' failed: {exc}") from exc
-        if not isinstance(result, dict):
-            raise ToolExecutionError(f"tool '{name}' must return a dict")
-        return result
+        return _check_tool_result(name, result)
+
+    async def acall(self, name: str, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        fn = self.get(name)
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(inputs)
+            else:
+                result = await asyncio.to_thread(fn, inputs)
+        except Exception as exc:
+            raise ToolExecutionError(f"tool '{name}' failed: {exc}") from exc
+        return _check_tool_result(name, result)
+
+
+def _check_tool_result(name: str, result: Any) -> dict[str, Any]:
+    if not isinstance(result, dict):
+        raise ToolExecutionError(f"tool '{name}' must return a dict")
+    return result
 
 
 class ValidatorRegistry:
@@ -98,7 +118,7 @@ class ValidatorRegistry:
             raise ValidatorNotFoundError(
                 f"validator '{name}' is not registered") from exc
 
-    def validate(self, name: str, inputs: dict[str, Any]) -> None:
+    def validate(self, name: str, inputs: Mapping[str, Any]) -> None:
         fn = self.get(name)
         try:
             result = fn(inputs)
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 from typing import Any
 
+from . import jsonio
 from .errors import ReplayError
 from .runner import RunResult
 from .workflow import Workflow
@@ -26,9 +27,11 @@ def replay(run_dir: str | Path, *, workflow_path: str | Path | None = None) -> R
 
     step_outputs: dict[str, dict[str, Any]] = {}
     for step_id in execution_order:
-        step_outputs[step_id] = _load_step_output(run_path, step_id)
+        step_outputs[step_id] = _load_step_output(run_path, step_id, step_outputs)
 
-    outputs = _resolve_outputs(workflow, step_outputs)
+    outputs = _resolve_outputs(
+        workflow, step_outputs, metadata.get("requested_outputs")
+    )
     recorded_outputs = _load_json(run_path / "outputs.json")
     if outputs != recorded_outputs:
         raise ReplayError("replay outputs do not match recorded outputs.json")
@@ -56,20 +59,61 @@ def _load_workflow(path: str | Path) -> Workflow:
     return Workflow.load(workflow_path)
 
 
-def _load_step_output(run_path: Path, step_id: str) -> dict[str, Any]:
-    step_path = run_path / "steps" / step_id / "output.json"
-    payload = _load_json(step_path)
+def _load_step_output(
+    run_path: Path,
+    step_id: str,
+    step_outputs: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    step_dir = run_path / "steps" / step_id
+    if (step_dir / "passthrough.json").exists():
+        return _rebuild_passthrough(run_path, step_id, step_outputs)
+    payload = _load_json(step_dir / "output.json")
     if not isinstance(payload, dict):
         raise ReplayError(f"step output for '{step_id}' must be an object")
     return payload
 
 
+def _rebuild_passthrough(
+    run_path: Path,
+    step_id: str,
+    step_outputs: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    reference = _load_json(run_path / "steps" / step_id / "passthrough.json")
+    depends_on = reference.get("depends_on") if isinstance(reference, dict) else None
+    if not isinstance(depends_on, list):
+        raise ReplayError(f"passthrough record for '{step_id}' is invalid")
+
+    inputs = _load_json(run_path / "inputs.json")
+    if not isinstance(inputs, dict):
+        raise ReplayError("recorded inputs.json must be an object")
+    merged = dict(inputs)
+    for dep in depends_on:
+        if dep not in step_outputs:
+            raise ReplayError(
+                f"passthrough step '{step_id}' depends on unreplayed step '{dep}'"
+            )
+        merged.update(step_outputs[dep])
+    return merged
+
+
 def _resolve_outputs(
     workflow: Workflow,
     step_outputs: dict[str, dict[str, Any]],
+    requested_outputs: Any = None,
 ) -> dict[str, Any]:
+    # Runs pruned to a subset of outputs record which ones they produced;
+    # older runs without the field produced all of them.
+    if requested_outputs is None:
+        names = list(workflow.spec.outputs)
+    elif isinstance(requested_outputs, list):
+        names = requested_outputs
+    else:
+        raise ReplayError("metadata requested_outputs is invalid")
     outputs: dict[str, Any] = {}
-    for name, step_id in workflow.spec.outputs.items():
+    for name in names:
+        step_id = workflow.spec.outputs.get(name)
+        if step_id is None:
+            raise ReplayError(f"unknown workflow output '{name}' in metadata")
         if step_id not in step_outputs:
             raise ReplayError(
                 f"missing output for workflow output '{name}'"
@@ -84,6 +128,6 @@ def _load_json(path: Path) -> Any:
     except OSError as exc:
         raise ReplayError(f"failed to read '{path}': {exc}") from exc
     try:
-        return json.loads(text)
+        return jsonio.loads(text)
     except json.JSONDecodeError as exc:
         raise ReplayError(f"invalid JSON in '{path}': {exc}") from exc
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import queue
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from .deadlines import remaining_time
+from .errors import ProviderError
+from .providers import ProviderResponse
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter for provider calls.
+
+    The delay before attempt ``n + 1`` is
+    ``min(max_delay, initial_delay * multiplier ** (n - 1))``, reduced by a
+    random fraction of up to ``jitter``. Only exceptions matching ``retry_on``
+    are retried; entries may be exception classes or class names, which match
+    any class in the exception's hierarchy (convenient for workflow YAML).
+    """
+
+    max_attempts: int = 3
+    initial_delay: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    retry_on: tuple[type[BaseException] | str, ...] = (
+        ProviderError,
+        TimeoutError,
+        ConnectionError,
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if self.initial_delay < 0 or self.max_delay < 0:
+            raise ValueError("retry delays must be non-negative")
+        if self.multiplier < 1:
+            raise ValueError("multiplier must be at least 1")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def delay(self, attempt: int) -> float:
+        base = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return base * (1 - self.jitter * random.random())
+
+    def should_retry(self, exc: BaseException) -> bool:
+        names = {cls.__name__ for cls in type(exc).__mro__}
+        for entry in self.retry_on:
+            if isinstance(entry, str):
+                if entry in names:
+                    return True
+            elif isinstance(exc, entry):
+                return True
+        return False
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Fire a duplicate provider call when the first one is slow.
+
+    The hedge delay is the ``quantile`` of recent latencies for the model once
+    ``min_samples`` calls have been observed, and ``initial_delay`` before
+    that (no hedging when ``initial_delay`` is ``None``).
+    """
+
+    quantile: float = 0.95
+    min_samples: int = 20
+    initial_delay: float | None = None
+
+    def __post_init__(self) -> None:
+        if not 0 < self.quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if self.min_samples < 1:
+            raise ValueError("min_samples must be at least 1")
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies, per model."""
+
+    def __init__(self, *, window: int = 200) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def quantile(self, model: str, q: float, *, min_samples: int = 1) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+@dataclass
+class CallRecorder:
+    """Collects per-attempt records for ``llm_call.json``."""
+
+    attempts: list[dict[str, Any]] = field(default_factory=list)
+
+    def add(
+        self,
+        *,
+        attempt: int,
+        hedge: bool,
+        duration: float,
+        error: BaseException | None = None,
+        selected: bool = False,
+        abandoned: bool = False,
+    ) -> None:
+        self.attempts.append(
+            {
+                "attempt": attempt,
+                "hedge": hedge,
+                "duration_ms": round(duration * 1000, 3),
+                "error": None
+                if error is None
+                else {"type": error.__class__.__name__, "message": str(error)},
+                "selected": selected,
+                "abandoned": abandoned,
+            }
+        )
+
+
+def call_with_retry(
+    call: Callable[[], ProviderResponse],
+    *,
+    model: str,
+    retry: RetryPolicy | None,
+    hedge: HedgePolicy | None,
+    latencies: LatencyTracker | None,
+    recorder: CallRecorder,
+) -> ProviderResponse:
+    """Call ``call`` under ``retry`` and ``hedge``, recording every attempt."""
+    attempt = 1
+    while True:
+        hedge_delay = _hedge_delay(model, hedge, latencies)
+        try:
+            response, duration = _hedged_call(call, attempt, hedge_delay, recorder)
+        except Exception as exc:
+            _raise_unless_retryable(exc, attempt, retry)
+        else:
+            if latencies is not None:
+                latencies.record(model, duration)
+            return response
+        time.sleep(retry.delay(attempt))  # type: ignore[union-attr]
+        attempt += 1
+
+
+async def acall_with_retry(
+    call: Callable[[], Awaitable[ProviderResponse]],
+    *,
+    model: str,
+    retry: RetryPolicy | None,
+    hedge: HedgePolicy | None,
+    latencies: LatencyTracker | None,
+    recorder: CallRecorder,
+) -> ProviderResponse:
+    """Async counterpart of ``call_with_retry``."""
+    attempt = 1
+    while True:
+        hedge_delay = _hedge_delay(model, hedge, latencies)
+        try:
+            response, duration = await _ahedged_call(call, attempt, hedge_delay, recorder)
+        except Exception as exc:
+            _raise_unless_retryable(exc, attempt, retry)
+        else:
+            if latencies is not None:
+                latencies.record(model, duration)
+            return response
+        await asyncio.sleep(retry.delay(attempt))  # type: ignore[union-attr]
+        attempt += 1
+
+
+def _raise_unless_retryable(
+    exc: Exception,
+    attempt: int,
+    retry: RetryPolicy | None,
+) -> None:
+    if retry is None or attempt >= retry.max_attempts or not retry.should_retry(exc):
+        raise exc
+    budget = remaining_time()
+    if budget is not None and retry.delay(attempt) >= budget:
+        # Backing off would overrun the step deadline; fail with the real error.
+        raise exc
+
+
+def _hedge_delay(
+    model: str,
+    hedge: HedgePolicy | None,
+    latencies: LatencyTracker | None,
+) -> float | None:
+    if hedge is None:
+        return None
+    observed = None
+    if latencies is not None:
+        observed = latencies.quantile(model, hedge.quantile, min_samples=hedge.min_samples)
+    return observed if observed is not None else hedge.initial_delay
+
+
+def _hedged_call(
+    call: Callable[[], ProviderResponse],
+    attempt: int,
+    hedge_delay: float | None,
+    recorder: CallRecorder,
+) -> tuple[ProviderResponse, float]:
+    if hedge_delay is None:
+        started = time.monotonic()
+        try:
+            response = call()
+        except Exception as exc:
+            recorder.add(
+                attempt=attempt, hedge=False, duration=time.monotonic() - started, error=exc
+            )
+            raise
+        duration = time.monotonic() - started
+        recorder.add(attempt=attempt, hedge=False, duration=duration, selected=True)
+        return response, duration
+
+    # Hedged calls run on daemon threads so a losing request never blocks the
+    # caller or interpreter shutdown; it is recorded as abandoned.
+    results: queue.Queue[tuple[bool, float, Any]] = queue.Queue()
+    launched: dict[bool, float] = {}
+
+    def _launch(hedged: bool) -> None:
+        context = contextvars.copy_context()
+
+        def _target() -> None:
+            started = time.monotonic()
+            try:
+                outcome: Any = context.run(call)
+            except Exception as exc:
+                outcome = exc
+            results.put((hedged, time.monotonic() - started, outcome))
+
+        launched[hedged] = time.monotonic()
+        threading.Thread(target=_target, name="llmflow-hedge", daemon=True).start()
+
+    _launch(False)
+    try:
+        received = [results.get(timeout=hedge_delay)]
+    except queue.Empty:
+        _launch(True)
+        received = [results.get()]
+    while isinstance(received[-1][2], Exception) and len(received) < len(launched):
+        received.append(results.get())
+    return _select_result(received, launched, attempt, recorder)
+
+
+async def _ahedged_call(
+    call: Callable[[], Awaitable[ProviderResponse]],
+    attempt: int,
+    hedge_delay: float | None,
+    recorder: CallRecorder,
+) -> tuple[ProviderResponse, float]:
+    async def _timed(hedged: bool) -> tuple[bool, float, Any]:
+        started = time.monotonic()
+        try:
+            outcome: Any = await call()
+        except Exception as exc:
+            outcome = exc
+        return hedged, time.monotonic() - started, outcome
+
+    launched = {False: time.monotonic()}
+    pending = {asyncio.ensure_future(_timed(False))}
+    received: list[tuple[bool, float, Any]] = []
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+        received.extend(task.result() for task in done)
+        if not done:
+            launched[True] = time.monotonic()
+            pending.add(asyncio.ensure_future(_timed(True)))
+        while pending and (not received or isinstance(received[-1][2], Exception)):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            received.extend(task.result() for task in done)
+    finally:
+        for task in pending:
+            task.cancel()
+    return _select_result(received, launched, attempt, recorder)
+
+
+def _select_result(
+    received: list[tuple[bool, float, Any]],
+    launched: dict[bool, float],
+    attempt: int,
+    recorder: CallRecorder,
+) -> tuple[ProviderResponse, float]:
+    winner: tuple[bool, float, Any] | None = None
+    for hedged, duration, outcome in received:
+        failed = isinstance(outcome, Exception)
+        selected = winner is None and not failed
+        if selected:
+            winner = (hedged, duration, outcome)
+        else:
+            recorder.add(
+                attempt=attempt,
+                hedge=hedged,
+                duration=duration,
+                error=outcome if failed else None,
+            )
+    finished = {hedged for hedged, _, _ in received}
+    now = time.monotonic()
+    for hedged, started in launched.items():
+        if hedged not in finished:
+            recorder.add(attempt=attempt, hedge=hedged, duration=now - started, abandoned=True)
+    if winner is None:
+        raise received[0][2]
+    hedged, duration, response = winner
+    recorder.add(attempt=attempt, hedge=hedged, duration=duration, selected=True)
+    return response, duration
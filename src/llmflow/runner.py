@@ -1,16 +1,52 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Iterable, Iterator, Literal, Mapping, Sequence
 
 from .artifacts import ArtifactsWriter
-from .errors import StepExecutionError
-from .providers import Provider
+from .bundle import WorkflowBundle, step_files
+from .cache import StepCache, step_cache_key
+from .deadlines import deadline_scope
+from .errors import RunDeadlineExceededError, StepExecutionError, StepTimeoutError
+from .events import (
+    RunCompleted,
+    RunEvent,
+    StepCompleted,
+    StepFailed,
+    StepOutputDelta,
+    StepStarted,
+)
+from .inputs import StepInputs
+from .plan import ExecutionPlan
+from .providers import AsyncProvider, Provider, as_async_provider
 from .registry import StepRegistry, ToolRegistry, ValidatorRegistry
-from .steps import LLMStep
+from .retry import HedgePolicy, LatencyTracker, RetryPolicy
+from .schemas import SchemaCache
+from .scheduler import ReadyQueue, critical_path_priorities
+from .stats import StepDurations
+from .steps import LLMStep, Step
+from .steps.map import MapStep
 from .steps.tool import ToolStep
 from .steps.validate import ValidateStep
+from .templates import TemplateCache
+from .tracing import StepTrace, output_scope, trace_scope
 from .workflow import StepDef, Workflow
 
 
@@ -19,6 +55,22 @@ class RunConfig:
     artifacts_dir: str | Path = ".runs"
     provider_name: str = "unknown"
     run_id: str | None = None
+    max_concurrency: int = 1
+    cache: StepCache | None = None
+    deadline: float | None = None
+    retry: RetryPolicy | None = None
+    hedge: HedgePolicy | None = None
+    step_durations: StepDurations | None = None
+    templates: TemplateCache | None = None
+    schemas: SchemaCache | None = None
+    # Yield StepOutputDelta events while LLM steps stream their output.
+    stream_outputs: bool = False
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("deadline must be greater than 0")
 
 
 @dataclass(frozen=True)
@@ -28,11 +80,23 @@ class RunResult:
     metadata: dict[str, Any]
 
 
-class Runner:
+@dataclass(frozen=True)
+class BatchResult:
+    index: int
+    inputs: dict[str, Any]
+    result: RunResult | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _RunnerBase:
     def __init__(
         self,
         *,
-        provider: Provider,
+        provider: Provider | AsyncProvider,
         config: RunConfig | None = None,
         steps: StepRegistry | None = None,
         tools: ToolRegistry | None = None,
@@ -43,79 +107,856 @@ class Runner:
         self._tools = tools or ToolRegistry()
         self._validators = validators or ValidatorRegistry()
         self._steps = steps or _default_step_registry()
+        # Shared across runs so hedge delays follow observed provider latency.
+        self._latencies = LatencyTracker()
 
-    def run(self, workflow: Workflow, inputs: dict[str, Any]) -> RunResult:
+    def compile(
+        self,
+        workflow: Workflow,
+        *,
+        previous: ExecutionPlan | None = None,
+    ) -> ExecutionPlan:
+        """Resolve ``workflow`` into a reusable ``ExecutionPlan``.
+
+        Step objects are built once and their prompts and schemas are loaded
+        eagerly, so configuration errors surface here rather than mid-run.
+        When ``previous`` is a plan compiled by this runner for an earlier
+        version of the workflow, steps whose definition and files are
+        unchanged keep their step objects instead of being rebuilt.
+        """
+        return self._build_plan(workflow, prepare=True, previous=previous)
+
+    def _build_plan(
+        self,
+        workflow: Workflow,
+        *,
+        prepare: bool,
+        previous: ExecutionPlan | None = None,
+    ) -> ExecutionPlan:
         graph = workflow.graph()
-        step_defs = {step.id: step for step in workflow.spec.steps}
+        bundle = workflow.bundle()
+        definitions = {step.id: step for step in workflow.spec.steps}
+        reusable = _reusable_steps(previous, workflow, bundle) if previous is not None else {}
+        steps: dict[str, Step] = {}
+        for step_id in graph.order:
+            step = reusable.get(step_id)
+            if step is None:
+                step = self._create_step(definitions[step_id])
+                if prepare:
+                    step.prepare()
+            steps[step_id] = step
+        return ExecutionPlan(
+            workflow=workflow,
+            graph=graph,
+            definitions=MappingProxyType(definitions),
+            dependencies=MappingProxyType(
+                {step_id: tuple(definitions[step_id].depends_on) for step_id in graph.order}
+            ),
+            steps=MappingProxyType(steps),
+            output_steps=frozenset(workflow.spec.outputs.values()),
+            outputs=MappingProxyType(dict(workflow.spec.outputs)),
+            bundle=bundle,
+        )
 
+    def _resolve_plan(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        outputs: Sequence[str] | None = None,
+    ) -> ExecutionPlan:
+        if isinstance(workflow, ExecutionPlan):
+            plan = workflow
+        else:
+            # One-off runs keep lazy resource loading so errors are reported
+            # against the failing step in the run artifacts.
+            plan = self._build_plan(workflow, prepare=False)
+        if outputs is not None:
+            plan = plan.select_outputs(outputs)
+        return plan
+
+    def _start_run(
+        self,
+        plan: ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        run_id: str | None = None,
+    ) -> _RunState:
         writer = ArtifactsWriter(
-            workflow,
-            execution_order=graph.order,
+            plan.workflow,
+            execution_order=plan.graph.order,
             provider_name=self._config.provider_name,
             artifacts_dir=self._config.artifacts_dir,
-            run_id=self._config.run_id,
+            run_id=run_id,
+            requested_outputs=list(plan.outputs),
+            skipped_steps=plan.skipped_steps,
+            bundle=plan.bundle,
         )
         writer.write_inputs(inputs)
+        deadline = (
+            time.monotonic() + self._config.deadline
+            if self._config.deadline is not None
+            else None
+        )
+        return _RunState(plan=plan, writer=writer, inputs=inputs, deadline=deadline)
+
+    def _ready_queue(self, plan: ExecutionPlan) -> ReadyQueue:
+        # With a duration history, ready steps on the longest remaining
+        # critical path are dispatched first.
+        if self._config.step_durations is None:
+            return ReadyQueue(plan.graph)
+        return ReadyQueue(
+            plan.graph,
+            critical_path_priorities(plan.graph, self._config.step_durations.estimates()),
+        )
+
+    def _finish(self, state: _RunState) -> RunResult:
+        result = state.finish()
+        if self._config.step_durations is not None:
+            self._config.step_durations.record(result.metadata)
+        return result
 
-        step_outputs: dict[str, dict[str, Any]] = {}
-        error_written = False
+    def _call_step(
+        self,
+        plan: ExecutionPlan,
+        step_id: str,
+        inputs: Mapping[str, Any],
+        run_deadline: float | None,
+        deltas: queue.SimpleQueue[Any] | None = None,
+    ) -> _StepOutcome:
+        step = plan.steps[step_id]
+        started_at = _utc_now()
+        cache_key: str | None = None
+        trace = StepTrace()
         try:
-            _validate_inputs(workflow, inputs)
-            for step_id in graph.order:
-                definition = step_defs[step_id]
-                step = self._create_step(definition)
-                step_inputs = _build_step_inputs(
-                    inputs, step_outputs, definition.depends_on
-                )
-                try:
-                    output = step.execute(step_inputs)
-                except Exception as exc:
-                    writer.write_error(
-                        step_id=step_id,
-                        error_type=exc.__class__.__name__,
-                        message=str(exc),
-                        stage="step",
+            deadline, error_cls = _step_deadline(plan, step_id, run_deadline)
+            cache_key = self._cache_key(plan, step_id, inputs)
+            if cache_key is not None:
+                cached = self._config.cache.get(cache_key)
+                if cached is not None:
+                    # Artifacts of the cached step, such as its rendered
+                    # prompt, are still written.
+                    with trace_scope(trace):
+                        step.record_cache_hit(inputs, cached)
+                    return _StepOutcome(
+                        cached, None, started_at, _utc_now(), cache_key,
+                        cache_hit=True, trace=trace,
                     )
-                    writer.finalize()
-                    error_written = True
-                    raise
-                writer.write_step_output(step_id, output)
-                step_outputs[step_id] = output
-
-            outputs = _resolve_outputs(workflow, step_outputs)
-            writer.write_outputs(outputs)
-            metadata = writer.finalize()
-            return RunResult(
-                outputs=outputs,
-                run_dir=writer.run_dir,
-                metadata=metadata,
-            )
+            with trace_scope(trace), _delta_scope(step_id, deltas):
+                output = _call_with_deadline(step, inputs, deadline, error_cls)
+            if cache_key is not None:
+                self._config.cache.set(cache_key, output)
         except Exception as exc:
-            if not error_written:
-                writer.write_error(
-                    step_id=None,
-                    error_type=exc.__class__.__name__,
-                    message=str(exc),
-                    stage="workflow",
-                )
-                writer.finalize()
-            raise
+            return _StepOutcome({}, exc, started_at, _utc_now(), cache_key, trace=trace)
+        return _StepOutcome(output, None, started_at, _utc_now(), cache_key, trace=trace)
+
+    async def _acall_step(
+        self,
+        plan: ExecutionPlan,
+        step_id: str,
+        inputs: Mapping[str, Any],
+        run_deadline: float | None,
+        semaphore: asyncio.Semaphore,
+        deltas: asyncio.Queue[Any] | None = None,
+    ) -> _StepOutcome:
+        step = plan.steps[step_id]
+        async with semaphore:
+            started_at = _utc_now()
+            cache_key: str | None = None
+            trace = StepTrace()
+            try:
+                deadline, error_cls = _step_deadline(plan, step_id, run_deadline)
+                cache_key = self._cache_key(plan, step_id, inputs)
+                if cache_key is not None:
+                    cached = self._config.cache.get(cache_key)
+                    if cached is not None:
+                        with trace_scope(trace):
+                            step.record_cache_hit(inputs, cached)
+                        return _StepOutcome(
+                            cached, None, started_at, _utc_now(), cache_key,
+                            cache_hit=True, trace=trace,
+                        )
+                with trace_scope(trace), _delta_scope(step_id, deltas):
+                    output = await _acall_with_deadline(step, inputs, deadline, error_cls)
+                if cache_key is not None:
+                    self._config.cache.set(cache_key, output)
+            except Exception as exc:
+                return _StepOutcome({}, exc, started_at, _utc_now(), cache_key, trace=trace)
+            return _StepOutcome(output, None, started_at, _utc_now(), cache_key, trace=trace)
+
+    def _cache_key(
+        self,
+        plan: ExecutionPlan,
+        step_id: str,
+        inputs: Mapping[str, Any],
+    ) -> str | None:
+        if self._config.cache is None or plan.definitions[step_id].cache is False:
+            return None
+        parts = plan.steps[step_id].cache_key(inputs)
+        if parts is None:
+            return None
+        try:
+            # The bundle hash also changes when a prompt or schema is edited.
+            content_hash = (
+                plan.bundle.hash if plan.bundle is not None else plan.workflow.workflow_hash
+            )
+            return step_cache_key(content_hash, step_id, parts)
+        except (TypeError, ValueError):
+            # Inputs that are not JSON-serializable cannot be keyed.
+            return None
 
     def _create_step(self, definition: StepDef) -> Any:
         if definition.type == "llm":
-            return LLMStep(definition, provider=self._provider)
+            return LLMStep(
+                definition,
+                provider=self._provider,
+                retry=self._config.retry,
+                hedge=self._config.hedge,
+                latencies=self._latencies,
+                templates=self._config.templates,
+                schemas=self._config.schemas,
+            )
         if definition.type == "tool":
             return ToolStep(definition, tools=self._tools)
         if definition.type == "validate":
             return ValidateStep(definition, validators=self._validators)
+        if definition.type == "map":
+            return MapStep(definition, create_step=self._create_step)
         return self._steps.create(definition)
 
 
+class Runner(_RunnerBase):
+    def __init__(
+        self,
+        *,
+        provider: Provider,
+        config: RunConfig | None = None,
+        steps: StepRegistry | None = None,
+        tools: ToolRegistry | None = None,
+        validators: ValidatorRegistry | None = None,
+    ) -> None:
+        super().__init__(
+            provider=provider,
+            config=config,
+            steps=steps,
+            tools=tools,
+            validators=validators,
+        )
+
+    def run(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        outputs: Sequence[str] | None = None,
+    ) -> RunResult:
+        """Run ``workflow`` once.
+
+        When ``outputs`` names a subset of the workflow outputs, only the
+        steps they depend on are executed; the others are recorded under
+        ``skipped_steps`` in the run metadata.
+        """
+        plan = self._resolve_plan(workflow, outputs)
+        return self._run(plan, inputs, run_id=self._config.run_id)
+
+    def iter_run(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        outputs: Sequence[str] | None = None,
+    ) -> Iterator[RunEvent]:
+        """Run ``workflow`` and yield events as steps start and finish.
+
+        Artifacts are written before each event is yielded. A failing step
+        yields ``StepFailed`` and then raises its error; a successful run ends
+        with ``RunCompleted``. Closing the iterator early abandons the run and
+        records it as failed. With ``RunConfig.stream_outputs``, LLM steps
+        whose provider streams also yield ``StepOutputDelta`` events between
+        their ``StepStarted`` and ``StepCompleted``.
+        """
+        plan = self._resolve_plan(workflow, outputs)
+        return self._iter_run(plan, inputs, run_id=self._config.run_id)
+
+    def run_many(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: Iterable[dict[str, Any]],
+        *,
+        workers: int = 4,
+        mode: Literal["thread", "process"] = "thread",
+        ordered: bool = True,
+        max_in_flight: int | None = None,
+    ) -> Iterator[BatchResult]:
+        """Run ``workflow`` once per inputs record and stream the results.
+
+        Results are yielded in submission order when ``ordered`` is true, or
+        as they complete otherwise. At most ``max_in_flight`` records
+        (default ``2 * workers``) are submitted or buffered at once. A failing
+        record is reported through ``BatchResult.error`` and does not stop the
+        batch. In ``process`` mode the runner and workflow must be picklable.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        limit = max_in_flight if max_in_flight is not None else workers * 2
+        if limit < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        return self._iter_batch(workflow, inputs, workers, mode, ordered, limit)
+
+    def _iter_batch(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: Iterable[dict[str, Any]],
+        workers: int,
+        mode: str,
+        ordered: bool,
+        limit: int,
+    ) -> Iterator[BatchResult]:
+        executor: Executor
+        if mode == "process":
+            # Compiled plans hold jinja templates, which do not pickle; each
+            # worker process compiles its own plan once.
+            if isinstance(workflow, ExecutionPlan):
+                workflow = workflow.workflow
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_batch_worker,
+                initargs=(self, workflow),
+            )
+            task, task_args = _run_batch_worker_item, ()
+        else:
+            plan = workflow if isinstance(workflow, ExecutionPlan) else self.compile(workflow)
+            executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="llmflow-batch",
+            )
+            task, task_args = self._run_batch_item, (plan,)
+
+        records = enumerate(inputs)
+        pending: dict[Future[BatchResult], int] = {}
+        buffered: dict[int, BatchResult] = {}
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) + len(buffered) < limit:
+                    try:
+                        index, item = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[executor.submit(task, *task_args, index, item)] = index
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=pending.__getitem__):
+                    pending.pop(future)
+                    result = future.result()
+                    if ordered:
+                        buffered[result.index] = result
+                    else:
+                        yield result
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run_batch_item(
+        self,
+        plan: ExecutionPlan,
+        index: int,
+        inputs: dict[str, Any],
+    ) -> BatchResult:
+        run_id = f"{self._config.run_id}-{index}" if self._config.run_id else None
+        try:
+            result = self._run(plan, inputs, run_id=run_id)
+        except Exception as exc:
+            return BatchResult(index=index, inputs=inputs, error=exc)
+        return BatchResult(index=index, inputs=inputs, result=result)
+
+    def _run(
+        self,
+        plan: ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        run_id: str | None,
+    ) -> RunResult:
+        for event in self._iter_run(plan, inputs, run_id=run_id):
+            if isinstance(event, RunCompleted):
+                return event.result
+        raise StepExecutionError("run ended without completing")
+
+    def _iter_run(
+        self,
+        plan: ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        run_id: str | None,
+    ) -> Iterator[RunEvent]:
+        state = self._start_run(plan, inputs, run_id=run_id)
+        try:
+            _validate_inputs(plan.workflow, inputs)
+            if self._config.max_concurrency > 1 or self._config.stream_outputs:
+                yield from self._execute_parallel(plan, state)
+            else:
+                yield from self._execute_serial(plan, state)
+            result = self._finish(state)
+        except GeneratorExit:
+            state.fail(StepExecutionError("run was closed before it completed"))
+            raise
+        except Exception as exc:
+            state.fail(exc)
+            raise
+        yield RunCompleted(result)
+
+    def _execute_serial(self, plan: ExecutionPlan, state: _RunState) -> Iterator[RunEvent]:
+        for step_id in plan.graph.order:
+            step_inputs = state.step_inputs(step_id)
+            yield StepStarted(step_id)
+            outcome = self._call_step(plan, step_id, step_inputs, state.deadline)
+            yield from state.record(step_id, outcome)
+
+    def _execute_parallel(self, plan: ExecutionPlan, state: _RunState) -> Iterator[RunEvent]:
+        ready = self._ready_queue(plan)
+        running: dict[Future[_StepOutcome], str] = {}
+        # With streaming, deltas and finished futures arrive on one queue in
+        # the order they happened; a step's chunks precede its completion.
+        deltas: queue.SimpleQueue[Any] | None = (
+            queue.SimpleQueue() if self._config.stream_outputs else None
+        )
+        pool = ThreadPoolExecutor(
+            max_workers=self._config.max_concurrency,
+            thread_name_prefix="llmflow-step",
+        )
+        try:
+            while ready or running:
+                while ready and len(running) < self._config.max_concurrency:
+                    step_id = ready.pop()
+                    step_inputs = state.step_inputs(step_id)
+                    future = pool.submit(
+                        self._call_step, plan, step_id, step_inputs, state.deadline, deltas
+                    )
+                    running[future] = step_id
+                    yield StepStarted(step_id)
+                    if deltas is not None:
+                        future.add_done_callback(deltas.put_nowait)
+
+                if deltas is None:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    while not done:
+                        item = deltas.get()
+                        if isinstance(item, StepOutputDelta):
+                            # Steps abandoned on timeout may keep streaming.
+                            if item.step_id in running.values():
+                                yield item
+                        elif item in running:
+                            done = {item}
+                for future in sorted(done, key=lambda item: ready.position(running[item])):
+                    step_id = running.pop(future)
+                    yield from state.record(step_id, future.result())
+                    ready.complete(step_id)
+        finally:
+            # On failure, queued steps are cancelled; steps already running
+            # are left to finish in the background and their results dropped.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncRunner(_RunnerBase):
+    """Run workflows on an asyncio event loop.
+
+    Ready steps are scheduled as tasks, bounded by ``RunConfig.max_concurrency``.
+    Synchronous providers are adapted with ``SyncProviderAdapter``.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: Provider | AsyncProvider,
+        config: RunConfig | None = None,
+        steps: StepRegistry | None = None,
+        tools: ToolRegistry | None = None,
+        validators: ValidatorRegistry | None = None,
+    ) -> None:
+        super().__init__(
+            provider=as_async_provider(provider),
+            config=config,
+            steps=steps,
+            tools=tools,
+            validators=validators,
+        )
+
+    async def run(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        outputs: Sequence[str] | None = None,
+    ) -> RunResult:
+        async for event in self.iter_run(workflow, inputs, outputs=outputs):
+            if isinstance(event, RunCompleted):
+                return event.result
+        raise StepExecutionError("run ended without completing")
+
+    async def iter_run(
+        self,
+        workflow: Workflow | ExecutionPlan,
+        inputs: dict[str, Any],
+        *,
+        outputs: Sequence[str] | None = None,
+    ) -> AsyncIterator[RunEvent]:
+        """Async counterpart of ``Runner.iter_run``."""
+        plan = self._resolve_plan(workflow, outputs)
+        state = self._start_run(plan, inputs, run_id=self._config.run_id)
+        try:
+            _validate_inputs(plan.workflow, inputs)
+            async for event in self._execute(plan, state):
+                yield event
+            result = self._finish(state)
+        except GeneratorExit:
+            state.fail(StepExecutionError("run was closed before it completed"))
+            raise
+        except Exception as exc:
+            state.fail(exc)
+            raise
+        yield RunCompleted(result)
+
+    async def _execute(self, plan: ExecutionPlan, state: _RunState) -> AsyncIterator[RunEvent]:
+        ready = self._ready_queue(plan)
+        semaphore = asyncio.Semaphore(self._config.max_concurrency)
+        running: dict[asyncio.Task[_StepOutcome], str] = {}
+        deltas: asyncio.Queue[Any] | None = (
+            asyncio.Queue() if self._config.stream_outputs else None
+        )
+        try:
+            while ready or running:
+                while ready:
+                    step_id = ready.pop()
+                    step_inputs = state.step_inputs(step_id)
+                    task = asyncio.create_task(
+                        self._acall_step(
+                            plan, step_id, step_inputs, state.deadline, semaphore, deltas
+                        )
+                    )
+                    running[task] = step_id
+                    yield StepStarted(step_id)
+                    if deltas is not None:
+                        task.add_done_callback(deltas.put_nowait)
+
+                if deltas is None:
+                    done, _ = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    done = set()
+                    while not done:
+                        item = await deltas.get()
+                        if isinstance(item, StepOutputDelta):
+                            if item.step_id in running.values():
+                                yield item
+                        elif item in running:
+                            done = {item}
+                for task in sorted(done, key=lambda item: ready.position(running[item])):
+                    step_id = running.pop(task)
+                    for event in state.record(step_id, task.result()):
+                        yield event
+                    ready.complete(step_id)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+
+_BATCH_WORKER: tuple[Runner, ExecutionPlan] | None = None
+
+
+def _init_batch_worker(runner: Runner, workflow: Workflow) -> None:
+    global _BATCH_WORKER
+    _BATCH_WORKER = (runner, runner.compile(workflow))
+
+
+def _run_batch_worker_item(index: int, inputs: dict[str, Any]) -> BatchResult:
+    if _BATCH_WORKER is None:
+        raise RuntimeError("batch worker was not initialized")
+    runner, plan = _BATCH_WORKER
+    return runner._run_batch_item(plan, index, inputs)
+
+
+@dataclass(frozen=True)
+class _StepOutcome:
+    output: Mapping[str, Any]
+    error: Exception | None
+    started_at: datetime
+    ended_at: datetime
+    cache_key: str | None = None
+    cache_hit: bool = False
+    trace: StepTrace | None = None
+
+
+@dataclass
+class _RunState:
+    plan: ExecutionPlan
+    writer: ArtifactsWriter
+    inputs: dict[str, Any]
+    deadline: float | None = None
+    step_outputs: dict[str, Mapping[str, Any]] = field(default_factory=dict)
+    error_written: bool = False
+    pending_consumers: dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        # An output is live until every dependent step has been dispatched
+        # (its inputs view then holds the reference) unless a workflow output
+        # needs it. Dead outputs are dropped; they are already on disk.
+        self.pending_consumers = {
+            step_id: len(dependents)
+            for step_id, dependents in self.plan.graph.edges.items()
+        }
+
+    def record(self, step_id: str, outcome: _StepOutcome) -> Iterator[RunEvent]:
+        """Write a step's artifacts, then yield its event.
+
+        A failed step yields ``StepFailed`` and then raises its error.
+        """
+        self.writer.record_step_timing(
+            step_id,
+            started_at=outcome.started_at,
+            ended_at=outcome.ended_at,
+        )
+        if outcome.trace is not None:
+            _write_trace(self.writer, step_id, outcome.trace)
+            hits, misses = _provider_cache_counts(outcome.trace)
+            if hits or misses:
+                self.writer.record_provider_cache(step_id, hits=hits, misses=misses)
+        if outcome.error is not None:
+            self.writer.write_error(
+                step_id=step_id,
+                error_type=outcome.error.__class__.__name__,
+                message=str(outcome.error),
+                stage="timeout" if isinstance(outcome.error, StepTimeoutError) else "step",
+            )
+            self.writer.finalize()
+            self.error_written = True
+            yield StepFailed(step_id, outcome.error, outcome.started_at, outcome.ended_at)
+            raise outcome.error
+
+        if outcome.cache_hit and outcome.cache_key is not None:
+            self.writer.record_cache_hit(step_id, outcome.cache_key)
+        if isinstance(outcome.output, StepInputs):
+            # Pass-through outputs re-expose the step's inputs; record where
+            # they come from instead of writing the merged view again.
+            self.writer.write_step_passthrough(step_id, self.plan.dependencies[step_id])
+        else:
+            self.writer.write_step_output(step_id, outcome.output)
+        if self._is_live(step_id):
+            self.step_outputs[step_id] = outcome.output
+        yield StepCompleted(
+            step_id,
+            outcome.output,
+            outcome.started_at,
+            outcome.ended_at,
+            cache_hit=outcome.cache_hit,
+        )
+
+    def step_inputs(self, step_id: str) -> StepInputs:
+        dependencies = self.plan.dependencies[step_id]
+        step_inputs = _build_step_inputs(self.inputs, self.step_outputs, dependencies)
+        for dep in dependencies:
+            self.pending_consumers[dep] -= 1
+            if not self._is_live(dep):
+                self.step_outputs.pop(dep, None)
+        return step_inputs
+
+    def _is_live(self, step_id: str) -> bool:
+        return (
+            self.pending_consumers[step_id] > 0
+            or step_id in self.plan.output_steps
+        )
+
+    def finish(self) -> RunResult:
+        outputs = _resolve_outputs(self.plan.outputs, self.step_outputs)
+        self.writer.write_outputs(outputs)
+        metadata = self.writer.finalize()
+        return RunResult(
+            outputs=outputs,
+            run_dir=self.writer.run_dir,
+            metadata=metadata,
+        )
+
+    def fail(self, exc: Exception) -> None:
+        if self.error_written:
+            return
+        self.writer.write_error(
+            step_id=None,
+            error_type=exc.__class__.__name__,
+            message=str(exc),
+            stage="workflow",
+        )
+        self.writer.finalize()
+
+
+def _write_trace(
+    writer: ArtifactsWriter,
+    step_id: str,
+    trace: StepTrace,
+    item_path: tuple[int, ...] = (),
+) -> None:
+    if item_path:
+        writer.write_step_item(
+            step_id,
+            item_path,
+            output=trace.output,
+            rendered_prompt=trace.rendered_prompt,
+            llm_call=trace.llm_call,
+            error=trace.error,
+        )
+    else:
+        if trace.rendered_prompt is not None:
+            writer.write_rendered_prompt(step_id, trace.rendered_prompt)
+        if trace.llm_call is not None:
+            writer.write_llm_call(step_id, trace.llm_call)
+    for index in sorted(trace.items):
+        _write_trace(writer, step_id, trace.items[index], (*item_path, index))
+
+
+def _provider_cache_counts(trace: StepTrace) -> tuple[int, int]:
+    hits, misses = trace.provider_cache_hits, trace.provider_cache_misses
+    for item in trace.items.values():
+        item_hits, item_misses = _provider_cache_counts(item)
+        hits += item_hits
+        misses += item_misses
+    return hits, misses
+
+
+def _reusable_steps(
+    previous: ExecutionPlan,
+    workflow: Workflow,
+    bundle: WorkflowBundle,
+) -> dict[str, Step]:
+    # Bundle file labels are relative to the workflow directory, so hashes
+    # are only comparable between plans loaded from the same place.
+    base_dir = workflow.path.parent.resolve()
+    if previous.bundle is None or previous.workflow.path.parent.resolve() != base_dir:
+        return {}
+    reusable: dict[str, Step] = {}
+    for definition in workflow.spec.steps:
+        step = previous.steps.get(definition.id)
+        if step is None or previous.definitions[definition.id] != definition:
+            continue
+        if all(
+            previous.bundle.files.get(label) == bundle.files.get(label)
+            for label in step_files(definition, base_dir)
+        ):
+            reusable[definition.id] = step
+    return reusable
+
+
+def _step_deadline(
+    plan: ExecutionPlan,
+    step_id: str,
+    run_deadline: float | None,
+) -> tuple[float | None, type[StepTimeoutError]]:
+    """Return the effective monotonic deadline for a step and its error type."""
+    timeout = plan.definitions[step_id].timeout
+    step_deadline = time.monotonic() + timeout if timeout is not None else None
+    if run_deadline is not None and (step_deadline is None or run_deadline <= step_deadline):
+        if run_deadline <= time.monotonic():
+            raise RunDeadlineExceededError(
+                f"run deadline exceeded before step '{step_id}' started"
+            )
+        return run_deadline, RunDeadlineExceededError
+    return step_deadline, StepTimeoutError
+
+
+def _call_with_deadline(
+    step: Step,
+    inputs: Mapping[str, Any],
+    deadline: float | None,
+    error_cls: type[StepTimeoutError],
+) -> Mapping[str, Any]:
+    if deadline is None:
+        return step.execute(inputs)
+
+    # Threads cannot be interrupted, so the step runs on a daemon thread that
+    # is abandoned on timeout. Providers receive the remaining budget through
+    # ProviderRequest.timeout so they can abort the request themselves.
+    outcome: list[Any] = []
+    finished = threading.Event()
+    context = contextvars.copy_context()
+
+    def _target() -> None:
+        try:
+            with deadline_scope(deadline):
+                outcome.append(step.execute(inputs))
+        except BaseException as exc:
+            outcome.append(exc)
+        finally:
+            finished.set()
+
+    thread = threading.Thread(
+        target=context.run,
+        args=(_target,),
+        name=f"llmflow-step-{step.step_id}",
+        daemon=True,
+    )
+    thread.start()
+    if not finished.wait(max(deadline - time.monotonic(), 0.0)):
+        raise error_cls(_timeout_message(step.step_id, error_cls))
+    result = outcome[0]
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+async def _acall_with_deadline(
+    step: Step,
+    inputs: Mapping[str, Any],
+    deadline: float | None,
+    error_cls: type[StepTimeoutError],
+) -> Mapping[str, Any]:
+    if deadline is None:
+        return await step.aexecute(inputs)
+    with deadline_scope(deadline):
+        try:
+            return await asyncio.wait_for(
+                step.aexecute(inputs), max(deadline - time.monotonic(), 0.0)
+            )
+        except asyncio.TimeoutError:
+            raise error_cls(_timeout_message(step.step_id, error_cls)) from None
+
+
+def _delta_scope(
+    step_id: str,
+    deltas: queue.SimpleQueue[Any] | asyncio.Queue[Any] | None,
+) -> AbstractContextManager[Any]:
+    if deltas is None:
+        return nullcontext()
+    return output_scope(
+        lambda text, attempt: deltas.put_nowait(StepOutputDelta(step_id, text, attempt))
+    )
+
+
+def _timeout_message(step_id: str, error_cls: type[StepTimeoutError]) -> str:
+    if error_cls is RunDeadlineExceededError:
+        return f"run deadline exceeded during step '{step_id}'"
+    return f"step '{step_id}' timed out"
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 def _default_step_registry() -> StepRegistry:
     registry = StepRegistry()
     registry.register("llm", LLMStep)
     registry.register("tool", ToolStep)
     registry.register("validate", ValidateStep)
+    # Map steps are built by the runner, which hands them its step factory
+    # for their child; StepRegistry.create cannot supply it.
     return registry
 
 
@@ -129,30 +970,31 @@ def _validate_inputs(workflow: Workflow, inputs: dict[str, Any]) -> None:
 
 
 def _build_step_inputs(
-    workflow_inputs: dict[str, Any],
-    step_outputs: dict[str, dict[str, Any]],
-    dependencies: list[str],
-) -> dict[str, Any]:
-    resolved = dict(workflow_inputs)
+    workflow_inputs: Mapping[str, Any],
+    step_outputs: dict[str, Mapping[str, Any]],
+    dependencies: Sequence[str],
+) -> StepInputs:
+    layers = [workflow_inputs]
     for dep in dependencies:
         output = step_outputs.get(dep)
         if output is None:
             raise StepExecutionError(
                 f"missing output for dependency '{dep}'"
             )
-        resolved.update(output)
-    return resolved
+        layers.append(output)
+    return StepInputs(layers)
 
 
 def _resolve_outputs(
-    workflow: Workflow,
-    step_outputs: dict[str, dict[str, Any]],
+    output_steps: Mapping[str, str],
+    step_outputs: dict[str, Mapping[str, Any]],
 ) -> dict[str, Any]:
     outputs: dict[str, Any] = {}
-    for name, step_id in workflow.spec.outputs.items():
+    for name, step_id in output_steps.items():
         if step_id not in step_outputs:
             raise StepExecutionError(
                 f"missing output for workflow output '{name}'"
             )
-        outputs[name] = step_outputs[step_id]
+        output = step_outputs[step_id]
+        outputs[name] = output.to_dict() if isinstance(output, StepInputs) else output
     return outputs
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import heapq
+from typing import Mapping
+
+from .graph import Graph
+
+
+class ReadyQueue:
+    """Track unmet dependencies and hand out steps as they become runnable.
+
+    Ready steps are released highest ``priorities`` first (see
+    ``critical_path_priorities``), then in topological-order position, so
+    concurrent dispatch stays deterministic for a given graph.
+    """
+
+    def __init__(self, graph: Graph, priorities: Mapping[str, float] | None = None) -> None:
+        self._edges = graph.edges
+        self._position = {step_id: index for index, step_id in enumerate(graph.order)}
+        self._priorities = priorities or {}
+        self._indegree = {step_id: 0 for step_id in graph.order}
+        for dependents in graph.edges.values():
+            for dependent in dependents:
+                self._indegree[dependent] += 1
+
+        self._heap: list[tuple[float, int, str]] = []
+        for step_id in graph.order:
+            if self._indegree[step_id] == 0:
+                self._push(step_id)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def pop(self) -> str:
+        _, _, step_id = heapq.heappop(self._heap)
+        return step_id
+
+    def complete(self, step_id: str) -> None:
+        for dependent in self._edges[step_id]:
+            self._indegree[dependent] -= 1
+            if self._indegree[dependent] == 0:
+                self._push(dependent)
+
+    def position(self, step_id: str) -> int:
+        return self._position[step_id]
+
+    def _push(self, step_id: str) -> None:
+        priority = self._priorities.get(step_id, 0.0)
+        heapq.heappush(self._heap, (-priority, self._position[step_id], step_id))
+
+
+def critical_path_priorities(
+    graph: Graph,
+    durations: Mapping[str, float],
+    *,
+    default: float | None = None,
+) -> dict[str, float]:
+    """Return each step's longest remaining path to a sink, in seconds.
+
+    The value includes the step's own duration. Steps without a known duration
+    use ``default``, which falls back to the mean of the known durations (or
+    ``1.0`` when there are none, ranking steps by remaining chain length).
+    """
+    return graph.path_costs(durations, default=default)
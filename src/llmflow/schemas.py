@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Mapping
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import SchemaError, ValidationError as JsonSchemaError
+
+from .bundle import FileHashCache
+from .errors import LLMOutputSchemaError, LLMOutputValidationError
+
+if TYPE_CHECKING:
+    from .workflow import StepDef, Workflow
+
+# Keywords that never affect validation.
+_ANNOTATIONS = frozenset(
+    {"$schema", "$id", "$comment", "title", "description", "default", "examples"}
+)
+_TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "integer": (
+        "((isinstance({v}, int) and not isinstance({v}, bool))"
+        " or (isinstance({v}, float) and {v}.is_integer()))"
+    ),
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+}
+# Characters a JSON value of each type can start with.
+_TYPE_STARTS = {
+    "object": "{",
+    "array": "[",
+    "string": '"',
+    "boolean": "tf",
+    "null": "n",
+    "integer": "-0123456789",
+    "number": "-0123456789",
+}
+_WHITESPACE = " \t\n\r"
+
+
+class OutputValidator:
+    """Validate step outputs against one JSON schema.
+
+    Schemas that only use ``type``, ``properties``, ``required``, ``enum``
+    (of strings or null), ``items`` and ``additionalProperties: false`` are
+    compiled into a plain Python check. Other schemas, and every output the
+    fast check rejects, go through jsonschema's ``Draft7Validator``, so
+    error messages are the same either way.
+    """
+
+    def __init__(self, schema: Any, *, fast: bool = True) -> None:
+        self.schema = schema
+        self._validator = Draft7Validator(schema)
+        self._fast_check = compile_schema(schema) if fast else None
+        self._stream_rules = _stream_rules(schema)
+
+    @property
+    def is_fast(self) -> bool:
+        return self._fast_check is not None
+
+    def stream_checker(self) -> StreamChecker:
+        """Return a checker for one streamed output."""
+        return StreamChecker(*self._stream_rules)
+
+    def validate(self, output: Any) -> None:
+        if self._fast_check is not None and self._fast_check(output):
+            return
+        try:
+            self._validator.validate(output)
+        except JsonSchemaError as exc:
+            raise LLMOutputValidationError(
+                f"llm output failed schema validation: {exc.message}") from exc
+
+
+class StreamChecker:
+    """Reject a streamed JSON output as soon as its prefix cannot be valid.
+
+    Chunks are scanned as they arrive. ``feed`` raises
+    ``LLMOutputValidationError`` when the output does not start an object,
+    has a top-level key the schema disallows, starts a top-level value of
+    the wrong type, or continues after the object closed. Anything else,
+    including malformed JSON, is left to the full parse and validation once
+    the output is complete; after such input the checker stops looking.
+    """
+
+    def __init__(
+        self,
+        allowed_keys: frozenset[str] | None,
+        value_starts: Mapping[str, str],
+    ) -> None:
+        self._allowed_keys = allowed_keys
+        self._value_starts = value_starts
+        self._state = _START
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: list[str] = []
+        self._current_key = ""
+
+    def feed(self, chunk: str) -> None:
+        for char in chunk:
+            state = self._state
+            if state is _NESTED:
+                self._scan_nested(char)
+            elif state is _KEY:
+                self._scan_key(char)
+            elif state is _SCALAR:
+                if char == ",":
+                    self._state = _NEXT_KEY
+                elif char == "}":
+                    self._state = _DONE
+                elif char in _WHITESPACE:
+                    self._state = _AFTER_VALUE
+            elif char in _WHITESPACE:
+                continue
+            elif state is _START:
+                if char != "{":
+                    raise LLMOutputValidationError("llm output must be a JSON object")
+                self._state = _OPEN
+            elif state is _OPEN or state is _NEXT_KEY:
+                if char == '"':
+                    self._key.clear()
+                    self._state = _KEY
+                elif char == "}" and state is _OPEN:
+                    self._state = _DONE
+                else:
+                    self._state = _PASSIVE
+            elif state is _COLON:
+                self._state = _VALUE if char == ":" else _PASSIVE
+            elif state is _VALUE:
+                self._start_value(char)
+            elif state is _AFTER_VALUE:
+                if char == ",":
+                    self._state = _NEXT_KEY
+                elif char == "}":
+                    self._state = _DONE
+                else:
+                    self._state = _PASSIVE
+            elif state is _DONE:
+                raise LLMOutputValidationError(
+                    "llm output is not valid JSON: unexpected data after the object")
+            if self._state is _PASSIVE:
+                return
+
+    def _scan_nested(self, char: str) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    self._state = _AFTER_VALUE
+        elif char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._state = _AFTER_VALUE
+
+    def _scan_key(self, char: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            try:
+                key = json.loads(f'"{"".join(self._key)}"')
+            except json.JSONDecodeError:
+                self._state = _PASSIVE
+                return
+            if self._allowed_keys is not None and key not in self._allowed_keys:
+                raise LLMOutputValidationError(
+                    "llm output failed schema validation: "
+                    f"additional property {key!r} is not allowed")
+            self._current_key = key
+            self._state = _COLON
+            return
+        self._key.append(char)
+
+    def _start_value(self, char: str) -> None:
+        starts = self._value_starts.get(self._current_key)
+        if starts is not None and char not in starts:
+            raise LLMOutputValidationError(
+                "llm output failed schema validation: "
+                f"property {self._current_key!r} has the wrong type")
+        if char in "{[":
+            self._depth = 1
+            self._state = _NESTED
+        elif char == '"':
+            self._depth = 0
+            self._in_string = True
+            self._state = _NESTED
+        else:
+            self._state = _SCALAR
+
+
+# StreamChecker states.
+_START = "start"
+_OPEN = "open"
+_KEY = "key"
+_NEXT_KEY = "next_key"
+_COLON = "colon"
+_VALUE = "value"
+_NESTED = "nested"
+_SCALAR = "scalar"
+_AFTER_VALUE = "after_value"
+_DONE = "done"
+_PASSIVE = "passive"
+
+
+class SchemaCache:
+    """Thread-safe cache of output validators keyed by path and content hash.
+
+    Each schema file is read, parsed and checked against the JSON Schema
+    metaschema once; later lookups only stat the file.
+    """
+
+    def __init__(self, *, fast: bool = True) -> None:
+        self._fast = fast
+        self._setup()
+
+    def get(self, path: str | Path) -> OutputValidator:
+        """Return the validator for the schema file at ``path``."""
+        name = str(path)
+        content_hash = self._hashes.hash_file(name)
+        with self._lock:
+            entry = self._validators.get(name)
+        if entry is not None and content_hash is not None and entry[0] == content_hash:
+            return entry[1]
+
+        validator = OutputValidator(_load_schema(Path(name)), fast=self._fast)
+        if content_hash is not None:
+            with self._lock:
+                self._validators[name] = (content_hash, validator)
+        return validator
+
+    def precompile(self, workflow: Workflow) -> None:
+        """Load every output schema of ``workflow`` so errors surface now."""
+        for step in _schema_steps(workflow.spec.steps):
+            try:
+                self.get(step.output_schema or "")
+            except LLMOutputSchemaError as exc:
+                raise LLMOutputSchemaError(f"step '{step.id}': {exc}") from exc
+
+    def clear(self) -> None:
+        with self._lock:
+            self._validators.clear()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"_fast": self._fast}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._setup()
+
+    def _setup(self) -> None:
+        self._hashes = FileHashCache()
+        self._validators: dict[str, tuple[str, OutputValidator]] = {}
+        self._lock = threading.Lock()
+
+
+_default_cache = SchemaCache()
+
+
+def default_schema_cache() -> SchemaCache:
+    """Return the process-wide cache used when no other one is configured."""
+    return _default_cache
+
+
+def compile_schema(schema: Any) -> Callable[[Any], bool] | None:
+    """Compile ``schema`` into a function returning whether a value is valid.
+
+    Returns ``None`` when the schema uses keywords outside the supported
+    subset.
+    """
+    lines = ["def check(v0):"]
+    if not _emit(schema, "v0", lines, 1, [0]):
+        return None
+    lines.append("    return True")
+    namespace: dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<llmflow schema>", "exec"), namespace)
+    return namespace["check"]
+
+
+def _emit(schema: Any, var: str, lines: list[str], depth: int, counter: list[int]) -> bool:
+    if schema is True or schema == {}:
+        return True
+    if not isinstance(schema, Mapping):
+        return False
+    unsupported = set(schema) - _ANNOTATIONS - {
+        "type", "properties", "required", "enum", "items", "additionalProperties",
+    }
+    if unsupported:
+        return False
+    pad = "    " * depth
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else types
+        if not isinstance(names, list) or not names or any(n not in _TYPE_CHECKS for n in names):
+            return False
+        test = " or ".join(_TYPE_CHECKS[name].format(v=var) for name in names)
+        lines.append(f"{pad}if not ({test}):")
+        lines.append(f"{pad}    return False")
+
+    if "enum" in schema:
+        options = schema["enum"]
+        if not isinstance(options, list) or not all(
+            option is None or isinstance(option, str) for option in options
+        ):
+            return False
+        strings = [option for option in options if option is not None]
+        test = f"({var} is None)" if None in options else "False"
+        if strings:
+            test += f" or (isinstance({var}, str) and {var} in {set(strings)!r})"
+        lines.append(f"{pad}if not ({test}):")
+        lines.append(f"{pad}    return False")
+
+    object_keywords = {"properties", "required", "additionalProperties"} & set(schema)
+    if object_keywords:
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        if (
+            not isinstance(properties, Mapping)
+            or not isinstance(required, list)
+            or not all(isinstance(name, str) for name in required)
+            or additional not in (True, False)
+        ):
+            return False
+        lines.append(f"{pad}if isinstance({var}, dict):")
+        inner = pad + "    "
+        lines.append(f"{inner}pass")
+        for name in required:
+            lines.append(f"{inner}if {name!r} not in {var}:")
+            lines.append(f"{inner}    return False")
+        if additional is False:
+            allowed = set(properties)
+            lines.append(f"{inner}for key in {var}:")
+            lines.append(f"{inner}    if key not in {allowed!r}:")
+            lines.append(f"{inner}        return False")
+        for name, subschema in properties.items():
+            counter[0] += 1
+            child = f"v{counter[0]}"
+            lines.append(f"{inner}if {name!r} in {var}:")
+            lines.append(f"{inner}    {child} = {var}[{name!r}]")
+            if not _emit(subschema, child, lines, depth + 2, counter):
+                return False
+
+    if "items" in schema:
+        items = schema["items"]
+        if not isinstance(items, Mapping) and items is not True:
+            return False
+        counter[0] += 1
+        child = f"v{counter[0]}"
+        lines.append(f"{pad}if isinstance({var}, list):")
+        lines.append(f"{pad}    for {child} in {var}:")
+        lines.append(f"{pad}        pass")
+        if not _emit(items, child, lines, depth + 2, counter):
+            return False
+
+    return True
+
+
+def _stream_rules(schema: Any) -> tuple[frozenset[str] | None, dict[str, str]]:
+    # Top-level keys allowed and, per property, the characters its value may
+    # start with; only what a prefix of the output can already contradict.
+    if not isinstance(schema, Mapping):
+        return None, {}
+    properties = schema.get("properties")
+    if not isinstance(properties, Mapping):
+        properties = {}
+    allowed = (
+        frozenset(properties)
+        if schema.get("additionalProperties") is False and not schema.get("patternProperties")
+        else None
+    )
+    starts: dict[str, str] = {}
+    for name, subschema in properties.items():
+        types = subschema.get("type") if isinstance(subschema, Mapping) else None
+        names = [types] if isinstance(types, str) else types
+        if isinstance(names, list) and names and all(n in _TYPE_STARTS for n in names):
+            starts[name] = "".join(_TYPE_STARTS[n] for n in names)
+    return allowed, starts
+
+
+def _load_schema(schema_path: Path) -> Any:
+    try:
+        schema_text = schema_path.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise LLMOutputSchemaError(
+            f"failed to read output schema: {schema_path}") from exc
+
+    try:
+        schema = json.loads(schema_text)
+    except json.JSONDecodeError as exc:
+        raise LLMOutputSchemaError(
+            f"output schema is not valid JSON: {schema_path}") from exc
+
+    try:
+        Draft7Validator.check_schema(schema)
+    except SchemaError as exc:
+        raise LLMOutputSchemaError(
+            f"output schema is invalid: {schema_path}: {exc.message}") from exc
+    return schema
+
+
+def _schema_steps(steps: list[StepDef]) -> list[StepDef]:
+    found: list[StepDef] = []
+    for step in steps:
+        if step.output_schema:
+            found.append(step)
+        if step.map is not None:
+            found.extend(_schema_steps([step.map.step]))
+    return found
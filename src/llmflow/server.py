@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import os
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import jsonio
+from .errors import (
+    ArtifactsError,
+    GraphError,
+    ProviderError,
+    StepExecutionError,
+    WorkflowError,
+)
+from .plan import ExecutionPlan
+from .runner import Runner
+from .watch import WorkflowWatcher
+from .workflow import Workflow
+
+_MAX_BODY_BYTES = 16 * 1024 * 1024
+_RUN_ERRORS = (StepExecutionError, ProviderError, ArtifactsError, GraphError, WorkflowError)
+
+
+class ServerRequestError(Exception):
+    """An HTTP-level error returned to the client as a JSON body."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class WorkflowServer:
+    """Serve runs of pre-compiled workflows over HTTP.
+
+    Workflows are compiled once at construction and addressed by their
+    ``workflow.name``. Runs execute on a shared pool of ``workers`` threads;
+    request threads wait for their run and return its outputs.
+
+    Endpoints:
+
+    - ``GET /health``
+    - ``GET /workflows``
+    - ``POST /runs/<name>`` with ``{"inputs": {...}, "outputs": [...]}``
+
+    With ``watch_interval``, each workflow is kept up to date by a
+    ``WorkflowWatcher``: edits to the workflow, prompt or schema files are
+    picked up without a restart, while runs already in progress finish on
+    the plan they started with.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        workflows: Iterable[Workflow],
+        *,
+        workers: int = 4,
+        watch_interval: float | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._runner = runner
+        self._plans: dict[str, ExecutionPlan] = {}
+        self._watchers: dict[str, WorkflowWatcher] = {}
+        for workflow in workflows:
+            name = workflow.spec.workflow.name
+            if name in self._plans or name in self._watchers:
+                raise WorkflowError(f"duplicate workflow name '{name}'")
+            if watch_interval is None:
+                self._plans[name] = runner.compile(workflow)
+            else:
+                self._watchers[name] = WorkflowWatcher(
+                    runner, workflow, interval=watch_interval
+                )
+        for watcher in self._watchers.values():
+            watcher.start()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llmflow-serve")
+
+    @property
+    def workflow_names(self) -> list[str]:
+        return sorted([*self._plans, *self._watchers])
+
+    def plan(self, name: str) -> ExecutionPlan | None:
+        """Return the current plan for ``name``, or ``None`` if it is not served."""
+        watcher = self._watchers.get(name)
+        if watcher is not None:
+            return watcher.plan
+        return self._plans.get(name)
+
+    def describe(self) -> dict[str, Any]:
+        plans = {name: self.plan(name) for name in self.workflow_names}
+        return {
+            "workflows": [
+                {
+                    "name": name,
+                    "version": plan.workflow.spec.workflow.version,
+                    "hash": plan.workflow.workflow_hash,
+                    "bundle_hash": plan.bundle.hash if plan.bundle is not None else None,
+                    "inputs": sorted(plan.workflow.spec.inputs),
+                    "outputs": list(plan.outputs),
+                }
+                for name, plan in plans.items()
+                if plan is not None
+            ]
+        }
+
+    def run(self, name: str, payload: Any) -> dict[str, Any]:
+        plan = self.plan(name)
+        if plan is None:
+            raise ServerRequestError(HTTPStatus.NOT_FOUND, f"unknown workflow '{name}'")
+        inputs, outputs = _parse_run_payload(payload)
+        future = self._pool.submit(self._runner.run, plan, inputs, outputs=outputs)
+        try:
+            result = future.result()
+        except _RUN_ERRORS as exc:
+            raise ServerRequestError(
+                HTTPStatus.UNPROCESSABLE_ENTITY, f"{exc.__class__.__name__}: {exc}"
+            ) from exc
+        return {
+            "run_id": result.metadata["run_id"],
+            "run_dir": str(result.run_dir),
+            "outputs": result.outputs,
+        }
+
+    def create_http_server(self, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+        return ThreadingHTTPServer((host, port), _handler_for(self))
+
+    def create_unix_server(self, path: str | Path) -> socketserver.UnixStreamServer:
+        socket_path = Path(path)
+        if socket_path.exists():
+            os.unlink(socket_path)
+        return _ThreadingUnixHTTPServer(str(socket_path), _handler_for(self))
+
+    def close(self) -> None:
+        for watcher in self._watchers.values():
+            watcher.stop()
+        self._pool.shutdown(wait=True)
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_app: WorkflowServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/workflows":
+            self._send(HTTPStatus.OK, self.server_app.describe())
+        else:
+            self._send_error(ServerRequestError(HTTPStatus.NOT_FOUND, "not found"))
+
+    def do_POST(self) -> None:
+        prefix = "/runs/"
+        if not self.path.startswith(prefix):
+            self._send_error(ServerRequestError(HTTPStatus.NOT_FOUND, "not found"))
+            return
+        try:
+            payload = self._read_json()
+            body = self.server_app.run(self.path[len(prefix):], payload)
+        except ServerRequestError as exc:
+            self._send_error(exc)
+            return
+        except Exception as exc:
+            self._send_error(
+                ServerRequestError(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, f"{exc.__class__.__name__}: {exc}"
+                )
+            )
+            return
+        self._send(HTTPStatus.OK, body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _read_json(self) -> Any:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError as exc:
+            raise ServerRequestError(HTTPStatus.BAD_REQUEST, "invalid Content-Length") from exc
+        if length > _MAX_BODY_BYTES:
+            raise ServerRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            return jsonio.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ServerRequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON body: {exc}") from exc
+
+    def _send_error(self, exc: ServerRequestError) -> None:
+        self._send(exc.status, {"error": {"status": exc.status.value, "message": str(exc)}})
+
+    def _send(self, status: HTTPStatus, payload: Any) -> None:
+        body = jsonio.dumps(payload).encode("ascii")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _handler_for(app: WorkflowServer) -> type[_Handler]:
+    return type("WorkflowRequestHandler", (_Handler,), {"server_app": app})
+
+
+def _parse_run_payload(payload: Any) -> tuple[dict[str, Any], list[str] | None]:
+    if not isinstance(payload, dict):
+        raise ServerRequestError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+    inputs = payload.get("inputs", {})
+    if not isinstance(inputs, dict):
+        raise ServerRequestError(HTTPStatus.BAD_REQUEST, "'inputs' must be an object")
+    outputs = payload.get("outputs")
+    if outputs is not None and (
+        not isinstance(outputs, list) or not all(isinstance(name, str) for name in outputs)
+    ):
+        raise ServerRequestError(HTTPStatus.BAD_REQUEST, "'outputs' must be a list of names")
+    return inputs, outputs
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from . import jsonio
+from .errors import ArtifactsError
+
+
+class StepDurations:
+    """Per-step duration history used to prioritize scheduling.
+
+    Keeps the last ``window`` observed durations (seconds) for each step and
+    estimates a step's duration as their median. Cache hits are ignored since
+    they do not reflect the cost of executing the step.
+    """
+
+    def __init__(self, *, window: int = 20) -> None:
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_artifacts(
+        cls,
+        artifacts_dir: str | Path,
+        workflow_name: str,
+        *,
+        window: int = 20,
+    ) -> StepDurations:
+        """Build the history from the most recent runs of ``workflow_name``."""
+        durations = cls(window=window)
+        for metadata in _recent_metadata(Path(artifacts_dir), workflow_name, window):
+            durations.record(metadata)
+        return durations
+
+    @classmethod
+    def load(cls, path: str | Path, *, window: int = 20) -> StepDurations:
+        """Load a stats file written by ``save``; a missing file is empty."""
+        durations = cls(window=window)
+        stats_path = Path(path)
+        if not stats_path.exists():
+            return durations
+        try:
+            payload = jsonio.loads(stats_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            raise ArtifactsError(f"failed to read step stats '{stats_path}': {exc}") from exc
+        steps = payload.get("steps") if isinstance(payload, dict) else None
+        if not isinstance(steps, dict):
+            raise ArtifactsError(f"step stats '{stats_path}' must contain a 'steps' mapping")
+        for step_id, samples in steps.items():
+            if isinstance(samples, list):
+                durations.add_samples(step_id, samples)
+        return durations
+
+    def save(self, path: str | Path) -> None:
+        with self._lock:
+            payload = {
+                "steps": {
+                    step_id: list(samples)
+                    for step_id, samples in sorted(self._samples.items())
+                }
+            }
+        try:
+            Path(path).write_text(
+                jsonio.dumps(payload, indent=True), encoding="utf-8"
+            )
+        except OSError as exc:
+            raise ArtifactsError(f"failed to write step stats '{path}': {exc}") from exc
+
+    def record(self, metadata: Mapping[str, Any]) -> None:
+        """Add the step durations from a run's ``metadata.json`` payload."""
+        timeline = metadata.get("timeline")
+        if not isinstance(timeline, dict):
+            return
+        cache_hits = metadata.get("cache_hits") or {}
+        for step_id, entry in timeline.items():
+            if step_id in cache_hits or not isinstance(entry, dict):
+                continue
+            duration_ms = entry.get("duration_ms")
+            if isinstance(duration_ms, (int, float)):
+                self.add_samples(step_id, [duration_ms / 1000])
+
+    def add_samples(self, step_id: str, samples: Iterable[float]) -> None:
+        with self._lock:
+            history = self._samples.get(step_id)
+            if history is None:
+                history = self._samples[step_id] = deque(maxlen=self._window)
+            history.extend(float(sample) for sample in samples)
+
+    def estimates(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                step_id: statistics.median(samples)
+                for step_id, samples in self._samples.items()
+                if samples
+            }
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _recent_metadata(
+    artifacts_dir: Path,
+    workflow_name: str,
+    limit: int,
+) -> list[dict[str, Any]]:
+    # Run directories are named run_<UTC timestamp>_<id>, so name order is
+    # chronological. Unreadable or in-progress runs are skipped.
+    matches: list[dict[str, Any]] = []
+    for metadata_path in sorted(artifacts_dir.glob("run_*/metadata.json"), reverse=True):
+        try:
+            metadata = jsonio.loads(metadata_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        workflow = metadata.get("workflow") if isinstance(metadata, dict) else None
+        if isinstance(workflow, dict) and workflow.get("name") == workflow_name:
+            matches.append(metadata)
+            if len(matches) >= limit:
+                break
+    matches.reverse()
+    return matches
@@ -1,10 +1,14 @@
 from .base import Step
 from .llm import LLMStep
 
-__all__ = ["LLMStep", "Step", "ToolStep", "ValidateStep"]
+__all__ = ["LLMStep", "MapStep", "Step", "ToolStep", "ValidateStep"]
 
 
 def __getattr__(name: str):
+    if name == "MapStep":
+        from .map import MapStep
+
+        return MapStep
     if name == "ToolStep":
         from .tool import ToolStep
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Mapping
 
 from ..workflow import StepDef
 
@@ -22,6 +23,20 @@ class Step(ABC):
     def depends_on(self) -> list[str]:
         return list(self.definition.depends_on)
 
+    def prepare(self) -> None:
+        """Load static resources ahead of the first execution."""
+
+    def cache_key(self, inputs: Mapping[str, Any]) -> dict[str, Any] | None:
+        """Describe what determines this step's output, or ``None`` if uncacheable."""
+        return None
+
+    def record_cache_hit(self, inputs: Mapping[str, Any], output: Mapping[str, Any]) -> None:
+        """Fill the current trace for a run served from the step cache."""
+
     @abstractmethod
-    def execute(self, inputs: dict[str, Any]) -> dict[str, Any]:
+    def execute(self, inputs: Mapping[str, Any]) -> Mapping[str, Any]:
         """Run the step and return a JSON-serializable output mapping."""
+
+    async def aexecute(self, inputs: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Run the step from an event loop; defaults to a worker thread."""
+        return await asyncio.to_thread(self.execute, inputs)
@@ -1,39 +1,219 @@
 from __future__ import annotations
 
+import itertools
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Mapping
 
-from jinja2 import Environment, StrictUndefined, TemplateError
-from jsonschema import Draft7Validator, ValidationError as JsonSchemaError
+from jinja2 import Template, TemplateError
 
+from .. import jsonio
+from ..deadlines import remaining_time
 from ..errors import (
     LLMConfigError,
-    LLMOutputSchemaError,
     LLMOutputValidationError,
     LLMRenderError,
+    ProviderError,
 )
-from ..providers import Provider, ProviderRequest
+from ..hashing import sha256_text
+from ..inputs import InputsMemo
+from ..providers import (
+    AsyncProvider,
+    Provider,
+    ProviderRequest,
+    ProviderResponse,
+    as_async_provider,
+)
+from ..retry import (
+    CallRecorder,
+    HedgePolicy,
+    LatencyTracker,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+)
+from ..schemas import OutputValidator, SchemaCache, default_schema_cache
+from ..templates import TemplateCache, default_template_cache
+from ..tracing import current_output_sink, current_trace
 from ..workflow import StepDef
 from .base import Step
 
 
 class LLMStep(Step):
-    def __init__(self, definition: StepDef, *, provider: Provider) -> None:
+    def __init__(
+        self,
+        definition: StepDef,
+        *,
+        provider: Provider | AsyncProvider,
+        retry: RetryPolicy | None = None,
+        hedge: HedgePolicy | None = None,
+        latencies: LatencyTracker | None = None,
+        templates: TemplateCache | None = None,
+        schemas: SchemaCache | None = None,
+    ) -> None:
         super().__init__(definition)
         self._provider = provider
+        self._templates = templates if templates is not None else default_template_cache()
+        self._schemas = schemas if schemas is not None else default_schema_cache()
+        self._retry = _load_retry_policy(definition, retry)
+        self._hedge = _load_hedge_policy(definition, hedge)
+        self._latencies = latencies if latencies is not None else LatencyTracker()
         self._prompt_path = _require_path(definition.prompt, "prompt")
         self._schema_path = _require_path(definition.output_schema, "output_schema")
         self._llm_config = _load_llm_config(definition)
+        self._template: Template | None = None
+        self._validator: OutputValidator | None = None
+        self._prompts: InputsMemo[str] = InputsMemo()
+
+    def prepare(self) -> None:
+        self._get_template()
+        self._get_validator()
+
+    def cache_key(self, inputs: Mapping[str, Any]) -> dict[str, Any] | None:
+        rendered_prompt = self._render(inputs)
+        # On a cache miss, execute() reuses the prompt instead of rendering
+        # it again.
+        self._prompts.store(inputs, rendered_prompt)
+        return {
+            "type": "llm",
+            "prompt_hash": sha256_text(rendered_prompt),
+            "llm": self._llm_config,
+            "output_schema": self._get_validator().schema,
+        }
+
+    def record_cache_hit(self, inputs: Mapping[str, Any], output: Mapping[str, Any]) -> None:
+        trace = current_trace()
+        if trace is None:
+            return
+        # The prompt rendered for the cache key is reused here.
+        request = self._build_request(inputs)
+        trace.rendered_prompt = request.prompt
+        trace.llm_call = {
+            "request": request.model_dump(exclude={"timeout"}),
+            "response": None,
+            "attempts": [],
+            "cache_hit": True,
+        }
+
+    def execute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        if not isinstance(self._provider, Provider):
+            raise LLMConfigError(
+                "llm step has an async-only provider; use aexecute()")
+        provider = self._provider
+        request = self._build_request(inputs)
+        recorder = _start_trace(request)
+        streams = self._streams(provider)
+        attempts = itertools.count(1)
+
+        def send() -> ProviderResponse:
+            if streams:
+                return self._stream(provider, _refresh_timeout(request), next(attempts))
+            return provider.call(_refresh_timeout(request))
+
+        response = call_with_retry(
+            send,
+            model=request.model,
+            retry=self._retry,
+            hedge=self._hedge,
+            latencies=self._latencies,
+            recorder=recorder,
+        )
+        _trace_response(response)
+        return self._parse_response(response.output_text)
+
+    async def aexecute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        provider = as_async_provider(self._provider)
+        request = self._build_request(inputs)
+        recorder = _start_trace(request)
+        streams = self._streams(provider)
+        attempts = itertools.count(1)
+
+        async def send() -> ProviderResponse:
+            if streams:
+                return await self._astream(provider, _refresh_timeout(request), next(attempts))
+            return await provider.acall(_refresh_timeout(request))
 
-    def execute(self, inputs: dict[str, Any]) -> dict[str, Any]:
-        rendered_prompt = _render_prompt(self._prompt_path, inputs)
-        request = _build_request(rendered_prompt, self._llm_config)
-        response = self._provider.call(request)
-        output = _parse_output(response.output_text)
-        _validate_output(self._schema_path, output)
+        response = await acall_with_retry(
+            send,
+            model=request.model,
+            retry=self._retry,
+            hedge=self._hedge,
+            latencies=self._latencies,
+            recorder=recorder,
+        )
+        _trace_response(response)
+        return self._parse_response(response.output_text)
+
+    def _streams(self, provider: Provider | AsyncProvider) -> bool:
+        # Hedged attempts would interleave their chunks, so hedging wins.
+        return provider.supports_streaming and self._hedge is None
+
+    def _stream(
+        self, provider: Provider, request: ProviderRequest, attempt: int
+    ) -> ProviderResponse:
+        checker = self._get_validator().stream_checker()
+        sink = current_output_sink()
+        parts: list[str] = []
+        chunks = provider.stream(request)
+        try:
+            for chunk in chunks:
+                # Raising here closes the stream, aborting the request.
+                checker.feed(chunk)
+                parts.append(chunk)
+                if sink is not None:
+                    sink(chunk, attempt)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        return _streamed_response(request, parts)
+
+    async def _astream(
+        self, provider: AsyncProvider, request: ProviderRequest, attempt: int
+    ) -> ProviderResponse:
+        checker = self._get_validator().stream_checker()
+        sink = current_output_sink()
+        parts: list[str] = []
+        chunks = provider.astream(request)
+        try:
+            async for chunk in chunks:
+                checker.feed(chunk)
+                parts.append(chunk)
+                if sink is not None:
+                    sink(chunk, attempt)
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return _streamed_response(request, parts)
+
+    def _build_request(self, inputs: Mapping[str, Any]) -> ProviderRequest:
+        rendered_prompt = self._prompts.take(inputs)
+        if rendered_prompt is None:
+            rendered_prompt = self._render(inputs)
+        return _build_request(
+            rendered_prompt, self._llm_config, timeout=remaining_time()
+        )
+
+    def _render(self, inputs: Mapping[str, Any]) -> str:
+        return _render_prompt(self._get_template(), self._prompt_path, inputs)
+
+    def _parse_response(self, output_text: str) -> dict[str, Any]:
+        output = _parse_output(output_text)
+        self._get_validator().validate(output)
         return output
 
+    def _get_template(self) -> Template:
+        # Loaded once per step instance; concurrent first loads are idempotent.
+        if self._template is None:
+            self._template = self._templates.get(self._prompt_path)
+        return self._template
+
+    def _get_validator(self) -> OutputValidator:
+        if self._validator is None:
+            self._validator = self._schemas.get(self._schema_path)
+        return self._validator
+
 
 def _require_path(value: str | None, label: str) -> Path:
     if not value:
@@ -47,23 +227,77 @@ def _load_llm_config(definition: StepDef) -> dict[str, Any]:
     return definition.llm.model_dump()
 
 
-def _render_prompt(prompt_path: Path, inputs: dict[str, Any]) -> str:
-    try:
-        template_text = prompt_path.read_text(encoding="utf-8")
-    except OSError as exc:
-        raise LLMRenderError(
-            f"failed to read prompt file: {prompt_path}") from exc
+def _load_retry_policy(
+    definition: StepDef,
+    default: RetryPolicy | None,
+) -> RetryPolicy | None:
+    if definition.retry is None:
+        return default
+    config = definition.retry.model_dump(exclude_none=True)
+    if "retry_on" in config:
+        config["retry_on"] = tuple(config["retry_on"])
+    return RetryPolicy(**config)
 
-    env = Environment(undefined=StrictUndefined)
+
+def _load_hedge_policy(
+    definition: StepDef,
+    default: HedgePolicy | None,
+) -> HedgePolicy | None:
+    if definition.hedge is None:
+        return default
+    return HedgePolicy(**definition.hedge.model_dump())
+
+
+def _start_trace(request: ProviderRequest) -> CallRecorder:
+    recorder = CallRecorder()
+    trace = current_trace()
+    if trace is not None:
+        # The attempts list is shared so failed calls are still reported.
+        trace.rendered_prompt = request.prompt
+        trace.llm_call = {
+            "request": request.model_dump(exclude={"timeout"}),
+            "response": None,
+            "attempts": recorder.attempts,
+        }
+    return recorder
+
+
+def _trace_response(response: ProviderResponse) -> None:
+    trace = current_trace()
+    if trace is not None and trace.llm_call is not None:
+        trace.llm_call["response"] = response.model_dump()
+
+
+def _streamed_response(request: ProviderRequest, parts: list[str]) -> ProviderResponse:
+    output_text = "".join(parts)
+    if not output_text.strip():
+        raise ProviderError("provider stream returned no output")
+    return ProviderResponse(model=request.model, output_text=output_text)
+
+
+def _refresh_timeout(request: ProviderRequest) -> ProviderRequest:
+    # Retries and hedges see the budget left at the time they are sent.
+    timeout = remaining_time()
+    if timeout == request.timeout:
+        return request
+    return request.model_copy(update={"timeout": timeout})
+
+
+def _render_prompt(template: Template, prompt_path: Path, inputs: Mapping[str, Any]) -> str:
     try:
-        template = env.from_string(template_text)
         return template.render(inputs=inputs)
     except TemplateError as exc:
         raise LLMRenderError(
             f"failed to render prompt '{prompt_path}': {exc}") from exc
 
 
-def _build_request(rendered_prompt: str, config: dict[str, Any]) -> ProviderRequest:
+def _build_request(
+    rendered_prompt: str,
+    config: dict[str, Any],
+    *,
+    timeout: float | None = None,
+) -> ProviderRequest:
+    config = dict(config)
     model = config.pop("model", None)
     if not model:
         raise LLMConfigError("llm config requires 'model'")
@@ -88,12 +322,13 @@ def _build_request(rendered_prompt: str, config: dict[str, Any]) -> ProviderRequ
         temperature=temperature,
         max_tokens=max_tokens,
         seed=seed,
+        timeout=timeout,
     )
 
 
 def _parse_output(output_text: str) -> dict[str, Any]:
     try:
-        payload = json.loads(output_text)
+        payload = jsonio.loads(output_text)
     except json.JSONDecodeError as exc:
         raise LLMOutputValidationError(
             f"llm output is not valid JSON: {exc}") from exc
@@ -102,23 +337,3 @@ def _parse_output(output_text: str) -> dict[str, Any]:
         raise LLMOutputValidationError("llm output must be a JSON object")
 
     return payload
-
-
-def _validate_output(schema_path: Path, output: dict[str, Any]) -> None:
-    try:
-        schema_text = schema_path.read_text(encoding="utf-8")
-    except OSError as exc:
-        raise LLMOutputSchemaError(
-            f"failed to read output schema: {schema_path}") from exc
-
-    try:
-        schema = json.loads(schema_text)
-    except json.JSONDecodeError as exc:
-        raise LLMOutputSchemaError(
-            f"output schema is not valid JSON: {schema_path}") from exc
-
-    try:
-        Draft7Validator(schema).validate(output)
-    except JsonSchemaError as exc:
-        raise LLMOutputValidationError(
-            f"llm output failed schema validation: {exc.message}") from exc
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Mapping, Sequence
+
+from ..errors import MapStepError
+from ..inputs import InputsMemo, StepInputs
+from ..tracing import StepTrace, current_trace, trace_scope
+from ..workflow import StepDef, StepMapConfig
+from .base import Step
+
+
+class MapStep(Step):
+    """Apply a child step to every element of a list-valued input.
+
+    Each element is exposed to the child as ``inputs[<item>]`` on top of the
+    map step's own inputs. Up to ``concurrency`` elements run at once; the
+    output lists child outputs in element order under ``<output>``.
+    """
+
+    def __init__(
+        self,
+        definition: StepDef,
+        *,
+        create_step: Callable[[StepDef], Step],
+    ) -> None:
+        super().__init__(definition)
+        if not definition.map:
+            raise MapStepError("map step requires 'map' config")
+        self._config: StepMapConfig = definition.map
+        self._child = create_step(definition.map.step)
+        self._views: InputsMemo[list[StepInputs]] = InputsMemo()
+
+    def prepare(self) -> None:
+        self._child.prepare()
+
+    def cache_key(self, inputs: Mapping[str, Any]) -> dict[str, Any] | None:
+        views = self._item_views(inputs)
+        # Children may keep work done for their cache key, such as a rendered
+        # prompt, keyed on these views; execute() runs them on the same ones.
+        self._views.store(inputs, views)
+        items: list[dict[str, Any]] = []
+        for view in views:
+            key = self._child.cache_key(view)
+            if key is None:
+                return None
+            items.append(key)
+        return {"type": "map", "output": self._config.output, "items": items}
+
+    def record_cache_hit(self, inputs: Mapping[str, Any], output: Mapping[str, Any]) -> None:
+        outputs = output.get(self._config.output) or []
+        for index, view in enumerate(self._take_views(inputs)):
+            trace = _item_trace(index)
+            if index < len(outputs):
+                trace.output = outputs[index]
+            with trace_scope(trace):
+                self._child.record_cache_hit(view, trace.output or {})
+
+    def execute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        views = self._take_views(inputs)
+        if self._config.concurrency == 1 or len(views) <= 1:
+            outputs = [self._run_item(index, view) for index, view in enumerate(views)]
+            return {self._config.output: outputs}
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(self._config.concurrency, len(views)),
+            thread_name_prefix=f"llmflow-map-{self.step_id}",
+        )
+        try:
+            # Each element runs in a copy of this context so the step deadline
+            # and trace are visible to the child.
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    self._run_item,
+                    index,
+                    view,
+                )
+                for index, view in enumerate(views)
+            ]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                if future in done and future.exception() is not None:
+                    # Fail fast; elements still running are abandoned.
+                    raise future.exception()  # type: ignore[misc]
+            return {self._config.output: [future.result() for future in futures]}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def aexecute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        views = self._take_views(inputs)
+        semaphore = asyncio.Semaphore(self._config.concurrency)
+
+        async def _bounded(index: int, view: StepInputs) -> dict[str, Any]:
+            async with semaphore:
+                return await self._arun_item(index, view)
+
+        tasks = [
+            asyncio.ensure_future(_bounded(index, view))
+            for index, view in enumerate(views)
+        ]
+        try:
+            outputs = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return {self._config.output: list(outputs)}
+
+    def _elements(self, inputs: Mapping[str, Any]) -> Sequence[Any]:
+        if self._config.over not in inputs:
+            raise MapStepError(
+                f"map step '{self.step_id}' input '{self._config.over}' is missing"
+            )
+        elements = inputs[self._config.over]
+        if not isinstance(elements, list):
+            raise MapStepError(
+                f"map step '{self.step_id}' input '{self._config.over}' must be a list"
+            )
+        return elements
+
+    def _item_views(self, inputs: Mapping[str, Any]) -> list[StepInputs]:
+        return [
+            StepInputs([inputs, {self._config.item: element}])
+            for element in self._elements(inputs)
+        ]
+
+    def _take_views(self, inputs: Mapping[str, Any]) -> list[StepInputs]:
+        views = self._views.take(inputs)
+        return views if views is not None else self._item_views(inputs)
+
+    def _run_item(self, index: int, view: StepInputs) -> dict[str, Any]:
+        trace = _item_trace(index)
+        with trace_scope(trace):
+            try:
+                output = self._child.execute(view)
+            except Exception as exc:
+                trace.error = exc
+                raise _item_error(self.step_id, index, exc) from exc
+        trace.output = _materialize(output)
+        return trace.output
+
+    async def _arun_item(self, index: int, view: StepInputs) -> dict[str, Any]:
+        trace = _item_trace(index)
+        with trace_scope(trace):
+            try:
+                output = await self._child.aexecute(view)
+            except Exception as exc:
+                trace.error = exc
+                raise _item_error(self.step_id, index, exc) from exc
+        trace.output = _materialize(output)
+        return trace.output
+
+
+def _item_trace(index: int) -> StepTrace:
+    trace = StepTrace()
+    parent = current_trace()
+    if parent is not None:
+        parent.items[index] = trace
+    return trace
+
+
+def _item_error(step_id: str, index: int, exc: Exception) -> MapStepError:
+    return MapStepError(f"map step '{step_id}' failed on item {index}: {exc}")
+
+
+def _materialize(output: Mapping[str, Any]) -> dict[str, Any]:
+    # Element outputs are collected into a list, so views are copied here.
+    if isinstance(output, StepInputs):
+        return output.to_dict()
+    return dict(output)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Mapping
 
 from ..errors import ToolExecutionError
 from ..registry import ToolRegistry
@@ -16,5 +16,15 @@ class ToolStep(Step):
         self._tool_name = definition.tool.name
         self._tools = tools
 
-    def execute(self, inputs: dict[str, Any]) -> dict[str, Any]:
+    def cache_key(self, inputs: Mapping[str, Any]) -> dict[str, Any] | None:
+        # Tools may have side effects or be nondeterministic, so they are
+        # only cached when the step opts in.
+        if not self.definition.cache:
+            return None
+        return {"type": "tool", "tool": self._tool_name, "inputs": dict(inputs)}
+
+    def execute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
         return self._tools.call(self._tool_name, inputs)
+
+    async def aexecute(self, inputs: Mapping[str, Any]) -> dict[str, Any]:
+        return await self._tools.acall(self._tool_name, inputs)
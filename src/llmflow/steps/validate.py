@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Mapping
 
 from ..errors import ValidationRuleError
 from ..registry import ValidatorRegistry
@@ -16,21 +16,23 @@ class ValidateStep(Step):
         self._config = definition.validate_config
         self._validators = validators
 
-    def execute(self, inputs: dict[str, Any]) -> dict[str, Any]:
+    def execute(self, inputs: Mapping[str, Any]) -> Mapping[str, Any]:
         _check_required(inputs, self._config)
         _check_non_empty(inputs, self._config)
         _check_allowed_values(inputs, self._config)
         _run_validators(inputs, self._config, self._validators)
+        if self._config.passthrough:
+            return inputs
         return dict(inputs)
 
 
-def _check_required(inputs: dict[str, Any], config: StepValidateConfig) -> None:
+def _check_required(inputs: Mapping[str, Any], config: StepValidateConfig) -> None:
     for key in config.required:
         if key not in inputs:
             raise ValidationRuleError(f"missing required field '{key}'")
 
 
-def _check_non_empty(inputs: dict[str, Any], config: StepValidateConfig) -> None:
+def _check_non_empty(inputs: Mapping[str, Any], config: StepValidateConfig) -> None:
     for key in config.non_empty:
         value = inputs.get(key)
         if value in (None, ""):
@@ -39,7 +41,7 @@ def _check_non_empty(inputs: dict[str, Any], config: StepValidateConfig) -> None
             raise ValidationRuleError(f"field '{key}' must be non-empty")
 
 
-def _check_allowed_values(inputs: dict[str, Any], config: StepValidateConfig) -> None:
+def _check_allowed_values(inputs: Mapping[str, Any], config: StepValidateConfig) -> None:
     for key, allowed in config.allowed_values.items():
         if key not in inputs:
             continue
@@ -50,7 +52,7 @@ def _check_allowed_values(inputs: dict[str, Any], config: StepValidateConfig) ->
 
 
 def _run_validators(
-    inputs: dict[str, Any],
+    inputs: Mapping[str, Any],
     config: StepValidateConfig,
     validators: ValidatorRegistry,
 ) -> None:
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Mapping
+
+from jinja2 import (
+    BaseLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    StrictUndefined,
+    Template,
+    TemplateError,
+    TemplateNotFound,
+)
+
+from .bundle import FileHashCache
+from .errors import LLMRenderError
+
+if TYPE_CHECKING:
+    from .workflow import StepDef, Workflow
+
+
+class TemplateCache:
+    """Thread-safe cache of compiled prompt templates.
+
+    Prompts are compiled by a single Jinja environment and kept per path
+    together with the content hash they were compiled from. A lookup only
+    stats the file and recompiles when its content changed. With
+    ``bytecode_dir``, compiled template code is also stored on disk so new
+    processes skip Jinja's compiler for unchanged prompts.
+    """
+
+    def __init__(self, *, bytecode_dir: str | Path | None = None) -> None:
+        self._bytecode_dir = Path(bytecode_dir) if bytecode_dir is not None else None
+        if self._bytecode_dir is not None:
+            self._bytecode_dir.mkdir(parents=True, exist_ok=True)
+        self._setup()
+
+    def get(self, path: str | Path) -> Template:
+        """Return the compiled template for the prompt file at ``path``."""
+        name = str(path)
+        content_hash = self._hashes.hash_file(name)
+        with self._lock:
+            entry = self._templates.get(name)
+        if entry is not None and content_hash is not None and entry[0] == content_hash:
+            return entry[1]
+
+        try:
+            template = self._env.get_template(name)
+        except TemplateNotFound as exc:
+            raise LLMRenderError(f"failed to read prompt file: {name}") from exc
+        except TemplateError as exc:
+            raise LLMRenderError(f"failed to compile prompt '{name}': {exc}") from exc
+        if content_hash is not None:
+            with self._lock:
+                self._templates[name] = (content_hash, template)
+        return template
+
+    def precompile(self, workflow: Workflow) -> None:
+        """Compile every prompt of ``workflow`` so template errors surface now."""
+        for step in _llm_steps(workflow.spec.steps):
+            if not step.prompt:
+                continue
+            try:
+                self.get(step.prompt)
+            except LLMRenderError as exc:
+                raise LLMRenderError(f"step '{step.id}': {exc}") from exc
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Compiled templates do not pickle; a copy starts empty.
+        return {"_bytecode_dir": self._bytecode_dir}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._setup()
+
+    def _setup(self) -> None:
+        self._hashes = FileHashCache()
+        self._templates: dict[str, tuple[str, Template]] = {}
+        self._lock = threading.Lock()
+        self._env = Environment(
+            loader=_PromptLoader(),
+            undefined=StrictUndefined,
+            # Freshness is tracked here by content hash, not by Jinja's cache.
+            cache_size=0,
+            bytecode_cache=(
+                FileSystemBytecodeCache(str(self._bytecode_dir))
+                if self._bytecode_dir is not None
+                else None
+            ),
+        )
+        # ``tojson`` serializes layered step inputs like the dict they stand
+        # for; sort_keys is Jinja's own default.
+        self._env.policies["json.dumps_kwargs"] = {"sort_keys": True, "default": _json_default}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _PromptLoader(BaseLoader):
+    """Load templates by file path; prompt paths are already resolved."""
+
+    def get_source(
+        self, environment: Environment, template: str
+    ) -> tuple[str, str, Callable[[], bool]]:
+        path = Path(template)
+        try:
+            source = path.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise TemplateNotFound(template) from exc
+        return source, str(path), lambda: False
+
+
+_default_cache = TemplateCache()
+
+
+def default_template_cache() -> TemplateCache:
+    """Return the process-wide cache used when no other one is configured."""
+    return _default_cache
+
+
+def _llm_steps(steps: list[StepDef]) -> list[StepDef]:
+    found: list[StepDef] = []
+    for step in steps:
+        if step.type == "llm":
+            found.append(step)
+        if step.map is not None:
+            found.extend(_llm_steps([step.map.step]))
+    return found
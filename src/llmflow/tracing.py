@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Mapping
+
+_TRACE: ContextVar[StepTrace | None] = ContextVar("llmflow_step_trace", default=None)
+# Receives (text, attempt) for each streamed chunk of the executing step.
+OutputSink = Callable[[str, int], None]
+_OUTPUT_SINK: ContextVar[OutputSink | None] = ContextVar("llmflow_output_sink", default=None)
+
+
+@dataclass
+class StepTrace:
+    """Per-execution details a step reports for the run artifacts."""
+
+    rendered_prompt: str | None = None
+    llm_call: dict[str, Any] | None = None
+    # Per-element traces of a map step, keyed by element index.
+    items: dict[int, StepTrace] = field(default_factory=dict)
+    output: Mapping[str, Any] | None = None
+    error: BaseException | None = None
+    # Lookups in a CachingProvider made while the step ran.
+    provider_cache_hits: int = 0
+    provider_cache_misses: int = 0
+
+
+def current_trace() -> StepTrace | None:
+    """Return the trace of the executing step, or ``None`` outside a run."""
+    return _TRACE.get()
+
+
+@contextmanager
+def trace_scope(trace: StepTrace) -> Iterator[StepTrace]:
+    token = _TRACE.set(trace)
+    try:
+        yield trace
+    finally:
+        _TRACE.reset(token)
+
+
+def current_output_sink() -> OutputSink | None:
+    """Return where the executing step sends streamed output, if anywhere."""
+    return _OUTPUT_SINK.get()
+
+
+@contextmanager
+def output_scope(sink: OutputSink) -> Iterator[OutputSink]:
+    token = _OUTPUT_SINK.set(sink)
+    try:
+        yield sink
+    finally:
+        _OUTPUT_SINK.reset(token)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable
+
+from .bundle import FileHashCache
+from .plan import ExecutionPlan
+from .runner import Runner
+from .workflow import Workflow
+
+
+class WorkflowWatcher:
+    """Keep a compiled plan in sync with a workflow and the files it uses.
+
+    The workflow file and every referenced prompt and schema are polled
+    every ``interval`` seconds once ``start()`` is called (or on each
+    ``check()``). When something changed, the workflow is reloaded if needed
+    and recompiled against the current plan, so only the changed steps are
+    rebuilt, and ``plan`` is swapped in one assignment. Runs that already hold
+    the old plan finish on it; later lookups of ``plan`` get the new one.
+
+    If a reload fails, the current plan stays active. ``check()`` raises the
+    error; the background poller stores it in ``last_error`` and passes it to
+    ``on_error``.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        workflow: Workflow | str | Path,
+        *,
+        interval: float = 1.0,
+        cache_dir: str | Path | None = None,
+        on_reload: Callable[[ExecutionPlan], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        if not isinstance(workflow, Workflow):
+            workflow = Workflow.load(workflow, cache_dir=cache_dir)
+        self._runner = runner
+        self._path = workflow.path
+        self._interval = interval
+        self._cache_dir = cache_dir
+        self._on_reload = on_reload
+        self._on_error = on_error
+        self._hashes = FileHashCache()
+        self._source_hash = self._hashes.hash_file(self._path)
+        self._plan = runner.compile(workflow)
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_error: Exception | None = None
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        return self._plan
+
+    def check(self) -> bool:
+        """Reload if any watched file changed; return whether the plan was swapped."""
+        with self._check_lock:
+            current = self._plan
+            source_hash = self._hashes.hash_file(self._path)
+            if source_hash != self._source_hash:
+                workflow = Workflow.load(self._path, cache_dir=self._cache_dir)
+            else:
+                workflow = current.workflow
+                bundle = workflow.bundle()
+                if current.bundle is not None and bundle.hash == current.bundle.hash:
+                    return False
+            plan = self._runner.compile(workflow, previous=current)
+            self._source_hash = source_hash
+            self._plan = plan
+            self.last_error = None
+        if self._on_reload is not None:
+            self._on_reload(plan)
+        return True
+
+    def start(self) -> None:
+        """Poll for changes on a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._poll, name=f"llmflow-watch-{self._path.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+    def __enter__(self) -> WorkflowWatcher:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.check()
+            except Exception as exc:
+                # Report a broken edit once rather than on every poll.
+                reported = self.last_error
+                self.last_error = exc
+                if self._on_error is not None and (
+                    reported is None or str(reported) != str(exc)
+                ):
+                    self._on_error(exc)
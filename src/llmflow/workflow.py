@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from importlib import metadata
 from pathlib import Path
 from typing import Any
 
+import pydantic
 import yaml
 from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 
+from . import jsonio
+from .bundle import WorkflowBundle, workflow_bundle
 from .errors import WorkflowLoadError, WorkflowValidationError
 from .graph import build_graph, Graph
 from .hashing import sha256_text
+from .schemas import default_schema_cache
+from .templates import default_template_cache
+
+# libyaml's loader parses large workflows an order of magnitude faster than the
+# pure-Python one and accepts the same documents.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump when the pickled form of ``Workflow`` changes incompatibly.
+_CACHE_FORMAT = "2"
 
 
 class WorkflowMeta(BaseModel):
@@ -62,6 +79,7 @@ class StepValidateConfig(BaseModel):
     non_empty: list[str] = Field(default_factory=list)
     allowed_values: dict[str, list[Any]] = Field(default_factory=dict)
     validators: list[str] = Field(default_factory=list)
+    passthrough: bool = False
 
     @field_validator("required", "non_empty", "validators", mode="before")
     @classmethod
@@ -82,6 +100,58 @@ class StepValidateConfig(BaseModel):
         raise ValueError("must be a mapping of field to allowed values")
 
 
+class StepRetryConfig(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    max_attempts: int = Field(default=3, ge=1)
+    initial_delay: float = Field(default=0.5, ge=0)
+    max_delay: float = Field(default=30.0, ge=0)
+    multiplier: float = Field(default=2.0, ge=1)
+    jitter: float = Field(default=0.5, ge=0, le=1)
+    retry_on: list[str] | None = None
+
+
+class StepHedgeConfig(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    quantile: float = Field(default=0.95, gt=0, lt=1)
+    min_samples: int = Field(default=20, ge=1)
+    initial_delay: float | None = Field(default=None, gt=0)
+
+
+class StepMapConfig(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    over: str
+    item: str = "item"
+    output: str = "items"
+    concurrency: int = Field(default=1, ge=1)
+    step: "StepDef"
+
+    @field_validator("over", "item", "output")
+    @classmethod
+    def _non_empty(cls, value: str) -> str:
+        value = str(value).strip()
+        if not value:
+            raise ValueError("must be non-empty")
+        return value
+
+    @field_validator("step", mode="before")
+    @classmethod
+    def _default_child_id(cls, value: Any) -> Any:
+        # The child step is addressed through its parent; an id is optional.
+        if isinstance(value, dict) and "id" not in value:
+            return {"id": "item", **value}
+        return value
+
+    @field_validator("step")
+    @classmethod
+    def _no_child_dependencies(cls, value: "StepDef") -> "StepDef":
+        if value.depends_on:
+            raise ValueError("map child steps cannot set 'depends_on'")
+        return value
+
+
 class StepDef(BaseModel):
     model_config = {"populate_by_name": True, "protected_namespaces": ()}
 
@@ -93,6 +163,13 @@ class StepDef(BaseModel):
     llm: StepLLMConfig | None = None
     tool: StepToolConfig | None = None
     validate_config: StepValidateConfig | None = Field(default=None, alias="validate")
+    # ``None`` leaves the choice to the step type: LLM steps are cached, tool
+    # steps, which may have side effects, are not.
+    cache: bool | None = None
+    timeout: float | None = None
+    retry: StepRetryConfig | None = None
+    hedge: StepHedgeConfig | None = None
+    map: StepMapConfig | None = None
 
     @field_validator("id", "type")
     @classmethod
@@ -111,6 +188,13 @@ class StepDef(BaseModel):
             return value
         raise ValueError("must be a list of step ids")
 
+    @field_validator("timeout")
+    @classmethod
+    def _positive_timeout(cls, value: float | None) -> float | None:
+        if value is not None and value <= 0:
+            raise ValueError("must be greater than 0")
+        return value
+
     @model_validator(mode="after")
     def _validate_llm_fields(self) -> "StepDef":
         if self.type == "llm":
@@ -118,6 +202,13 @@ class StepDef(BaseModel):
                 raise ValueError("llm steps require 'prompt'")
             if not self.output_schema:
                 raise ValueError("llm steps require 'output_schema'")
+        elif self.retry or self.hedge:
+            raise ValueError("only llm steps can set 'retry' or 'hedge'")
+        if self.type == "map":
+            if not self.map:
+                raise ValueError("map steps require 'map'")
+        elif self.map:
+            raise ValueError("only map steps can set 'map'")
         if self.type == "tool":
             if not self.tool:
                 raise ValueError("tool steps require 'tool'")
@@ -131,6 +222,9 @@ class StepDef(BaseModel):
         return self
 
 
+StepMapConfig.model_rebuild()
+
+
 class WorkflowSpec(BaseModel):
     workflow: WorkflowMeta
     inputs: dict[str, InputDef]
@@ -163,9 +257,28 @@ class Workflow:
     spec: WorkflowSpec
     path: Path
     workflow_hash: str
+    _graph: Graph | None = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
-    def load(cls, path: str | Path) -> "Workflow":
+    def load(
+        cls,
+        path: str | Path,
+        *,
+        cache_dir: str | Path | None = None,
+        precompile: bool = False,
+    ) -> "Workflow":
+        """Load and validate a workflow file.
+
+        With ``cache_dir``, the validated spec and its graph are stored there
+        keyed by the file's location and content hash, and later loads of an
+        unchanged file skip parsing and validation. Entries are pickles, so
+        the directory must only be writable by trusted users.
+
+        With ``precompile``, every prompt and output schema is loaded into the
+        shared template and schema caches, so their errors raise
+        ``LLMRenderError`` or ``LLMOutputSchemaError`` here instead of during
+        a run.
+        """
         workflow_path = Path(path)
         if not workflow_path.exists():
             raise WorkflowLoadError(
@@ -177,8 +290,22 @@ class Workflow:
             raise WorkflowLoadError(
                 f"failed to read workflow file: {workflow_path}") from exc
 
+        workflow_hash = sha256_text(raw_text)
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = _cache_entry_path(Path(cache_dir), workflow_path, workflow_hash)
+            cached = _read_cache_entry(cache_path)
+            if (
+                isinstance(cached, cls)
+                and cached.path == workflow_path
+                and cached.workflow_hash == workflow_hash
+            ):
+                if precompile:
+                    _precompile(cached)
+                return cached
+
         try:
-            payload = yaml.safe_load(raw_text)
+            payload = _parse_document(raw_text)
         except yaml.YAMLError as exc:
             raise WorkflowLoadError(
                 f"invalid YAML in workflow file: {workflow_path}") from exc
@@ -195,14 +322,104 @@ class Workflow:
             raise WorkflowValidationError(
                 _format_validation_error(exc)) from exc
 
-        return cls(
+        workflow = cls(
             spec=spec,
             path=workflow_path,
-            workflow_hash=sha256_text(raw_text),
+            workflow_hash=workflow_hash,
         )
+        if cache_path is not None:
+            # Only workflows with a valid graph are cached, so a cached entry
+            # never hides a dependency error.
+            workflow.graph()
+            _write_cache_entry(cache_path, workflow)
+        if precompile:
+            _precompile(workflow)
+        return workflow
 
     def graph(self) -> Graph:
-        return build_graph(self.spec.steps)
+        """Return the dependency graph, built on first use and then reused."""
+        graph = self._graph
+        if graph is None:
+            graph = build_graph(self.spec.steps)
+            object.__setattr__(self, "_graph", graph)
+        return graph
+
+    def bundle(self) -> WorkflowBundle:
+        """Hash the workflow together with its prompt and schema files.
+
+        Unlike ``workflow_hash``, the bundle hash changes when a referenced
+        file is edited. It is recomputed on each call; unchanged files are
+        not re-read.
+        """
+        return workflow_bundle(self)
+
+
+def _precompile(workflow: Workflow) -> None:
+    default_template_cache().precompile(workflow)
+    default_schema_cache().precompile(workflow)
+
+
+def _cache_entry_path(cache_dir: Path, workflow_path: Path, workflow_hash: str) -> Path:
+    # Prompt and schema paths are resolved against the path as given, so the
+    # key covers both its spelling and the location it points to.
+    key = json.dumps(
+        [
+            _CACHE_FORMAT,
+            _engine_version(),
+            pydantic.VERSION,
+            str(workflow_path),
+            str(workflow_path.absolute()),
+            workflow_hash,
+        ]
+    )
+    return cache_dir / f"{sha256_text(key)}.pickle"
+
+
+def _read_cache_entry(cache_path: Path) -> Any:
+    # A missing, truncated or incompatible entry is a miss; the load that
+    # follows rewrites it.
+    try:
+        with cache_path.open("rb") as handle:
+            return pickle.load(handle)
+    except Exception:
+        return None
+
+
+def _write_cache_entry(cache_path: Path, workflow: Workflow) -> None:
+    # Written to a temporary file and renamed so concurrent loaders never see
+    # a partial entry. Failing to cache does not fail the load.
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(workflow, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, cache_path)
+    except OSError:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+
+
+def _engine_version() -> str:
+    try:
+        return metadata.version("llmflow-core")
+    except metadata.PackageNotFoundError:
+        return "0.0.0"
+
+
+def _parse_document(raw_text: str) -> Any:
+    # Generated workflows are often emitted as JSON, which is also YAML; the
+    # JSON parser handles them far faster than any YAML loader.
+    if raw_text.lstrip().startswith("{"):
+        try:
+            return jsonio.loads(raw_text)
+        except json.JSONDecodeError:
+            pass
+    return yaml.load(raw_text, Loader=_YAML_LOADER)
 
 
 def _resolve_prompt_paths(payload: dict[str, Any], base_dir: Path) -> dict[str, Any]:
@@ -217,21 +434,32 @@ def _resolve_prompt_paths(payload: dict[str, Any], base_dir: Path) -> dict[str,
             normalized_steps.append(step)
             continue
 
-        updated = dict(step)
-        prompt = updated.get("prompt")
-        if isinstance(prompt, str):
-            updated["prompt"] = _resolve_path(prompt, base_dir)
-
-        output_schema = updated.get("output_schema")
-        if isinstance(output_schema, str):
-            updated["output_schema"] = _resolve_path(output_schema, base_dir)
-
-        normalized_steps.append(updated)
+        normalized_steps.append(_resolve_step_paths(step, base_dir))
 
     normalized["steps"] = normalized_steps
     return normalized
 
 
+def _resolve_step_paths(step: dict[str, Any], base_dir: Path) -> dict[str, Any]:
+    updated = dict(step)
+    prompt = updated.get("prompt")
+    if isinstance(prompt, str):
+        updated["prompt"] = _resolve_path(prompt, base_dir)
+
+    output_schema = updated.get("output_schema")
+    if isinstance(output_schema, str):
+        updated["output_schema"] = _resolve_path(output_schema, base_dir)
+
+    map_config = updated.get("map")
+    if isinstance(map_config, dict) and isinstance(map_config.get("step"), dict):
+        updated["map"] = {
+            **map_config,
+            "step": _resolve_step_paths(map_config["step"], base_dir),
+        }
+
+    return updated
+
+
 def _resolve_path(value: str, base_dir: Path) -> str:
     path = Path(value)
     if not path.is_absolute():
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from llmflow import MockProvider, RunConfig, Runner, Workflow
+from llmflow import bundle as bundle_module
+from llmflow.bundle import FileHashCache, workflow_bundle
+from llmflow.hashing import sha256_text
+
+
+def _write_workflow(tmp_path: Path) -> Path:
+    workflow_path = tmp_path / "workflow.yaml"
+    prompt_path = tmp_path / "prompts" / "outline.md"
+    schema_path = tmp_path / "schemas" / "outline.json"
+    prompt_path.parent.mkdir(parents=True)
+    schema_path.parent.mkdir(parents=True)
+    prompt_path.write_text("Outline {{ inputs.topic }}", encoding="utf-8")
+    schema_path.write_text("{}", encoding="utf-8")
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: outline
+    type: llm
+    prompt: prompts/outline.md
+    output_schema: schemas/outline.json
+    llm:
+      model: mock-model
+
+outputs:
+  article: outline
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    return workflow_path
+
+
+def _age(path: Path) -> None:
+    # Files modified in the last moments are always re-hashed.
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+
+def test_bundle_hash_covers_prompts_and_schemas(tmp_path: Path) -> None:
+    workflow = Workflow.load(_write_workflow(tmp_path))
+
+    before = workflow.bundle()
+    assert before.files == {
+        "workflow.yaml": workflow.workflow_hash,
+        "prompts/outline.md": sha256_text("Outline {{ inputs.topic }}"),
+        "schemas/outline.json": sha256_text("{}"),
+    }
+
+    (tmp_path / "prompts" / "outline.md").write_text("Changed", encoding="utf-8")
+    after = workflow.bundle()
+
+    assert after.hash != before.hash
+    assert after.files["workflow.yaml"] == before.files["workflow.yaml"]
+    assert after.files["prompts/outline.md"] == sha256_text("Changed")
+
+
+def test_bundle_reuses_hashes_of_unchanged_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    workflow = Workflow.load(_write_workflow(tmp_path))
+    prompt_path = tmp_path / "prompts" / "outline.md"
+    _age(prompt_path)
+    _age(tmp_path / "schemas" / "outline.json")
+    hashes = FileHashCache()
+    first = workflow_bundle(workflow, hashes=hashes)
+
+    read: list[str] = []
+    sha256_file = bundle_module._sha256_file
+
+    def _recording(path: str) -> str | None:
+        read.append(path)
+        return sha256_file(path)
+
+    monkeypatch.setattr(bundle_module, "_sha256_file", _recording)
+
+    assert workflow_bundle(workflow, hashes=hashes) == first
+    assert read == []
+
+    prompt_path.write_text("Edited prompt", encoding="utf-8")
+    workflow_bundle(workflow, hashes=hashes)
+    assert read == [str(prompt_path.resolve())]
+
+
+def test_missing_referenced_file_is_recorded(tmp_path: Path) -> None:
+    workflow = Workflow.load(_write_workflow(tmp_path))
+    (tmp_path / "schemas" / "outline.json").unlink()
+
+    assert workflow.bundle().files["schemas/outline.json"] is None
+
+
+def test_run_metadata_records_bundle(tmp_path: Path) -> None:
+    workflow = Workflow.load(_write_workflow(tmp_path))
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        config=RunConfig(artifacts_dir=tmp_path / "runs"),
+    )
+
+    result = runner.run(workflow, {"topic": "AI"})
+
+    metadata = json.loads((result.run_dir / "metadata.json").read_text(encoding="utf-8"))
+    bundle = workflow.bundle()
+    assert metadata["workflow"]["bundle_hash"] == bundle.hash
+    assert metadata["workflow"]["files"] == bundle.files
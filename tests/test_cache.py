@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from llmflow.cache import MemoryStepCache, SQLiteStepCache, step_cache_key
+from llmflow.errors import CacheError
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = MemoryStepCache(max_entries=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.set("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+
+def test_memory_cache_expires_entries() -> None:
+    cache = MemoryStepCache(ttl=0)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") is None
+
+
+def test_memory_cache_returns_independent_copies() -> None:
+    cache = MemoryStepCache()
+    cache.set("a", {"items": [1]})
+    cache.get("a")["items"].append(2)
+    assert cache.get("a") == {"items": [1]}
+
+
+def test_sqlite_cache_persists_and_evicts_by_size(tmp_path) -> None:
+    path = tmp_path / "cache" / "steps.sqlite"
+    cache = SQLiteStepCache(path, max_bytes=40)
+    cache.set("a", {"value": "x" * 10})
+    cache.set("b", {"value": "y" * 10})
+    cache.close()
+
+    reopened = SQLiteStepCache(path, max_bytes=40)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == {"value": "y" * 10}
+
+
+def test_step_cache_key_is_stable() -> None:
+    first = step_cache_key("hash", "step", {"b": 1, "a": [1, 2]})
+    second = step_cache_key("hash", "step", {"a": [1, 2], "b": 1})
+    assert first == second
+    assert first != step_cache_key("hash", "other", {"a": [1, 2], "b": 1})
+
+
+def test_cache_rejects_invalid_limits(tmp_path) -> None:
+    with pytest.raises(CacheError):
+        MemoryStepCache(max_entries=0)
+    with pytest.raises(CacheError):
+        SQLiteStepCache(tmp_path / "cache.sqlite", max_bytes=0)
@@ -53,6 +53,18 @@ def test_cli_graph(tmp_path: Path) -> None:
     assert "outline" in result.output
 
 
+def test_cli_graph_stats(tmp_path: Path) -> None:
+    workflow_path = _write_workflow(tmp_path)
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["graph", str(workflow_path), "--stats"])
+
+    assert result.exit_code == 0
+    assert "Levels: 1" in result.output
+    assert "Max width: 1" in result.output
+    assert "Critical path (1 steps): outline" in result.output
+
+
 def test_cli_run_and_replay(tmp_path: Path) -> None:
     workflow_path = _write_workflow(tmp_path)
     artifacts_dir = tmp_path / "runs"
@@ -81,3 +93,54 @@ def test_cli_run_and_replay(tmp_path: Path) -> None:
 
     assert replay_result.exit_code == 0
     assert "Replay completed" in replay_result.output
+
+
+def test_cli_run_requires_mock_output_for_mapped_llm_steps(tmp_path: Path) -> None:
+    (tmp_path / "prompt.md").write_text("Expand {{ inputs.section }}", encoding="utf-8")
+    (tmp_path / "schema.json").write_text("{}", encoding="utf-8")
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        """
+workflow:
+  name: sections
+  version: "1.0"
+
+inputs:
+  sections:
+    type: array
+
+steps:
+  - id: expand
+    type: map
+    map:
+      over: sections
+      item: section
+      step:
+        type: llm
+        prompt: prompt.md
+        output_schema: schema.json
+        llm:
+          model: mock-model
+
+outputs:
+  drafts: expand
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(workflow_path),
+            "--input",
+            'sections=["intro"]',
+            "--artifacts-dir",
+            str(tmp_path / "runs"),
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert "--mock-output" in result.output
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
+import time
+from pathlib import Path
+
 import pytest
 
-from llmflow.errors import GraphCycleError, GraphDependencyError
+from llmflow.errors import GraphCycleError, GraphDependencyError, GraphError
 from llmflow.graph import build_graph, topo_sort
-from llmflow.workflow import StepDef
+from llmflow.workflow import StepDef, Workflow
 
 
 def _step(step_id: str, *, depends_on: list[str] | None = None) -> StepDef:
@@ -41,13 +45,109 @@ def test_topo_sort_cycle_detection() -> None:
         _step("a", depends_on=["b"]),
         _step("b", depends_on=["a"]),
     ]
-    with pytest.raises(GraphCycleError):
+    with pytest.raises(GraphCycleError, match="a -> b -> a"):
         topo_sort(steps)
 
 
+def test_cycle_error_names_cycle_not_its_dependents() -> None:
+    steps = [
+        _step("root"),
+        _step("x", depends_on=["root", "z"]),
+        _step("y", depends_on=["x"]),
+        _step("z", depends_on=["y"]),
+        _step("after", depends_on=["z"]),
+    ]
+    with pytest.raises(GraphCycleError) as excinfo:
+        build_graph(steps)
+
+    assert str(excinfo.value) == "cycle detected among steps: x -> y -> z -> x"
+
+
 def test_topo_sort_missing_dependency() -> None:
     steps = [
         _step("a", depends_on=["missing"]),
     ]
     with pytest.raises(GraphDependencyError):
         topo_sort(steps)
+
+
+def test_load_and_graph_100k_step_json_workflow_within_budget(tmp_path: Path) -> None:
+    # The budget covers JSON-encoded workflows only. The same workflow as
+    # block YAML spends longer than this in libyaml alone (about 20 s to
+    # load here), which no change in this package can avoid.
+    step_count = 100_000
+    steps = [
+        {
+            "id": f"s{index}",
+            "type": "tool",
+            "depends_on": [f"s{index - 1}"] if index % 10 else [],
+            "tool": {"name": "noop"},
+        }
+        for index in range(step_count)
+    ]
+    workflow_path = tmp_path / "workflow.json"
+    workflow_path.write_text(
+        json.dumps(
+            {
+                "workflow": {"name": "large", "version": "1"},
+                "inputs": {},
+                "steps": steps,
+                "outputs": {"last": f"s{step_count - 1}"},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    started = time.perf_counter()
+    workflow = Workflow.load(workflow_path)
+    graph = workflow.graph()
+    elapsed = time.perf_counter() - started
+
+    assert len(graph.order) == step_count
+    assert workflow.graph() is graph
+    assert elapsed < 15.0, f"load + graph took {elapsed:.2f}s"
+
+
+def _diamond() -> list[StepDef]:
+    return [
+        _step("fetch"),
+        _step("parse", depends_on=["fetch"]),
+        _step("summarize", depends_on=["parse"]),
+        _step("classify", depends_on=["parse"]),
+        _step("tag", depends_on=["fetch"]),
+        _step("report", depends_on=["summarize", "classify"]),
+    ]
+
+
+def test_graph_levels_and_width() -> None:
+    graph = build_graph(_diamond())
+
+    assert graph.levels == [
+        ["fetch"],
+        ["parse", "tag"],
+        ["summarize", "classify"],
+        ["report"],
+    ]
+    assert graph.width == 2
+    assert graph.dependencies["report"] == ["summarize", "classify"]
+
+
+def test_graph_reachability_queries() -> None:
+    graph = build_graph(_diamond())
+
+    assert graph.ancestors("report") == ["fetch", "parse", "summarize", "classify"]
+    assert graph.descendants("parse") == ["summarize", "classify", "report"]
+    assert graph.descendants("report") == []
+    with pytest.raises(GraphError, match="unknown step 'missing'"):
+        graph.descendants("missing")
+
+
+def test_graph_critical_path_uses_costs() -> None:
+    graph = build_graph(_diamond())
+
+    path = graph.critical_path({"fetch": 1.0, "parse": 1.0, "classify": 5.0, "tag": 9.0})
+
+    assert path.steps == ["fetch", "parse", "classify", "report"]
+    # summarize and report use the mean of the known costs (4.0).
+    assert path.cost == 11.0
+    assert graph.critical_path({}).steps == ["fetch", "parse", "summarize", "report"]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from llmflow.inputs import StepInputs
+
+
+def test_step_inputs_later_layers_take_precedence() -> None:
+    base = {"topic": "a", "audience": "b"}
+    view = StepInputs([base, {"topic": "c"}])
+
+    assert view["topic"] == "c"
+    assert view["audience"] == "b"
+    assert view == {"topic": "c", "audience": "b"}
+    assert list(view) == ["topic", "audience"]
+    assert view.layers[0] is base
+
+
+def test_step_inputs_flattens_nested_views() -> None:
+    inner = StepInputs([{"a": 1}, {"b": 2}])
+    outer = StepInputs([inner, {"a": 3}])
+
+    assert len(outer.layers) == 3
+    assert outer.to_dict() == {"a": 3, "b": 2}
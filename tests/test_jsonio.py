@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import enum
+import json
+import random
+import uuid
+from typing import Any
+
+import pytest
+
+from llmflow import jsonio
+from llmflow.cache import step_cache_key
+from llmflow.hashing import sha256_text
+
+BACKENDS = jsonio.available_backends()
+
+CORPUS: list[Any] = [
+    {},
+    [],
+    {"b": 1, "a": [True, False, None], "c": {"z": [], "y": {}}},
+    {"text": "quote \" backslash \\ slash / tab \t newline \n nul \x00 del \x7f"},
+    {"text": "café   ￿ 😀 𝄞", "ключ": "значение"},
+    {"floats": [0.1, 2.5, -0.0, 1e15, 1e16, 1.2345678901234567e17, 1e-4, 1e-5, 5e-324]},
+    [12.3456, 10.00001, 1.5e-4, 1e-7, -1e-7, 1e-10, 2.5e22, -0.00001234],
+    1e-7,
+    {"special": [float("nan"), float("inf"), float("-inf")]},
+    {"ints": [0, -1, 2**53, 2**63 - 1, -(2**63), 2**64, 10**30]},
+    {"hex": "3e4f0e-1d", "number_like": ":1e5 ,0.00001 null"},
+    ["a", ("tuple", 1), {"nested": [[[{"deep": 1}]]]}],
+    "plain string",
+    12.5,
+]
+
+
+def _random_value(rng: random.Random, depth: int = 0) -> Any:
+    pick = rng.random()
+    if depth < 3 and pick < 0.25:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    if depth < 3 and pick < 0.5:
+        return {
+            _random_text(rng): _random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))
+        }
+    return rng.choice(
+        [
+            _random_text(rng),
+            rng.randint(-(10**6), 10**6),
+            rng.uniform(-1e3, 1e3),
+            rng.choice([1e16, 1e-7, 0.00001, 2**70, float("nan")]),
+            None,
+            True,
+        ]
+    )
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice('az "\\\n\x01\x7fé€😀e1') for _ in range(rng.randint(0, 6)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("payload", CORPUS)
+def test_backend_encodes_same_bytes_as_stdlib(backend: str, payload: Any) -> None:
+    encoder = jsonio.get_backend(backend)
+
+    assert encoder.dumps(payload) == json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=True
+    )
+    assert encoder.dumps(payload, indent=True) == json.dumps(
+        payload, indent=2, sort_keys=True, ensure_ascii=True
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_matches_stdlib_on_random_payloads(backend: str) -> None:
+    encoder = jsonio.get_backend(backend)
+    stdlib = jsonio.get_backend("json")
+    rng = random.Random(7)
+    for _ in range(500):
+        payload = _random_value(rng)
+        canonical = stdlib.dumps(payload)
+        assert encoder.dumps(payload) == canonical
+        assert encoder.dumps(payload, indent=True) == stdlib.dumps(payload, indent=True)
+        # Decoding may not change a value, including int versus float.
+        assert stdlib.dumps(encoder.loads(canonical)) == canonical
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "text",
+    ['{"a": 1}', "[1, 2.0, -0]", str(2**70), "NaN", "1e400", '"\\ud800"', '"café"'],
+)
+def test_backend_decodes_like_stdlib(backend: str, text: str) -> None:
+    decoded = jsonio.get_backend(backend).loads(text)
+    expected = json.loads(text)
+
+    assert repr(decoded) == repr(expected)
+    assert type(decoded) is type(expected)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("text", ["", "{", "[1,]", '{"a": 1} trailing', "{'a': 1}"])
+def test_backend_rejects_invalid_json_like_stdlib(backend: str, text: str) -> None:
+    with pytest.raises(json.JSONDecodeError) as excinfo:
+        jsonio.get_backend(backend).loads(text)
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+
+    assert str(excinfo.value) == str(expected.value)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "payload",
+    [{1: "x", 2: "y"}, {True: 1}, {None: 2}, {1.5: [1]}, {2**64: 1}, {"a": {3: {"b": 4}}}],
+)
+def test_backend_encodes_non_string_keys_like_stdlib(backend: str, payload: Any) -> None:
+    encoder = jsonio.get_backend(backend)
+    stdlib = jsonio.get_backend("json")
+
+    assert encoder.dumps(payload) == stdlib.dumps(payload)
+    assert encoder.dumps(payload, indent=True) == stdlib.dumps(payload, indent=True)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("payload", [{1: "x", "y": 2}, {"a": object()}])
+def test_backend_rejects_what_stdlib_rejects(backend: str, payload: Any) -> None:
+    with pytest.raises(TypeError):
+        jsonio.get_backend(backend).dumps(payload)
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+
+
+class _Color(enum.Enum):
+    RED = "red"
+
+
+class _Size(int, enum.Enum):
+    SMALL = 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"a": {1, 2}},
+        {"a": b"bytes"},
+        {"at": datetime.datetime(2024, 1, 2, 3, 4, 5)},
+        {"on": datetime.date(2024, 1, 2)},
+        {"point": _Point(1)},
+        {"id": uuid.UUID(int=1)},
+        {"color": _Color.RED},
+        [[{"deep": [uuid.UUID(int=2)]}]],
+    ],
+)
+def test_backend_rejects_non_json_values_like_stdlib(backend: str, payload: Any) -> None:
+    with pytest.raises(TypeError):
+        jsonio.get_backend(backend).dumps(payload)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_encodes_builtin_subclasses_like_stdlib(backend: str) -> None:
+    payload = {"size": _Size.SMALL, "sizes": [_Size.SMALL], "flag": True}
+    encoder = jsonio.get_backend(backend)
+    stdlib = jsonio.get_backend("json")
+
+    assert encoder.dumps(payload) == stdlib.dumps(payload)
+    assert encoder.dumps(payload, indent=True) == stdlib.dumps(payload, indent=True)
+
+
+@pytest.mark.parametrize("backend", [name for name in BACKENDS if name != "json"])
+def test_fast_backend_encodes_ordinary_floats_itself(
+    backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    encoder = jsonio.get_backend(backend)
+    payload = {"scores": [12.3456, 0.000123, 10.00001, -3.14159265], "count": 10000}
+    expected = encoder.dumps(payload)
+
+    def fail(*args: Any, **kwargs: Any) -> str:
+        raise AssertionError("fell back to the stdlib")
+
+    monkeypatch.setattr(jsonio.json, "dumps", fail)
+    assert encoder.dumps(payload) == expected
+
+
+def test_get_backend_rejects_unknown_names() -> None:
+    assert "json" in BACKENDS
+    assert jsonio.get_backend().name in BACKENDS
+    with pytest.raises(ValueError, match="unknown JSON backend 'yaml'"):
+        jsonio.get_backend("yaml")
+
+
+def test_automatic_selection_skips_msgspec(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("LLMFLOW_JSON_BACKEND", raising=False)
+
+    expected = "orjson" if "orjson" in BACKENDS else "json"
+    assert jsonio._select_backend().name == expected
+
+
+def test_step_cache_key_is_independent_of_backend() -> None:
+    parts = {"type": "llm", "prompt_hash": "3e4f", "llm": {"temperature": 0.0}}
+    canonical = json.dumps(
+        {"workflow_hash": "abc", "step_id": "draft", **parts},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+    )
+
+    assert step_cache_key("abc", "draft", parts) == sha256_text(canonical)
+
+
+def _random_float(rng: random.Random) -> float:
+    mantissa = rng.choice([rng.random(), rng.uniform(1, 10), float(rng.randint(1, 10**17))])
+    return rng.choice([1, -1]) * mantissa * 10.0 ** rng.randint(-30, 30)
+
+
+def test_msgspec_encodes_json_values_like_stdlib() -> None:
+    pytest.importorskip("msgspec")
+    encoder = jsonio.get_backend("msgspec")
+    stdlib = jsonio.get_backend("json")
+    rng = random.Random(11)
+    floats = [_random_float(rng) for _ in range(20000)]
+    ints = [rng.choice([1, -1]) * 2 ** rng.randint(0, 80) for _ in range(2000)]
+
+    for payload in [floats, ints, {"floats": floats[:50], "ints": ints[:50]}]:
+        assert encoder.dumps(payload) == stdlib.dumps(payload)
+        assert encoder.dumps(payload, indent=True) == stdlib.dumps(payload, indent=True)
+        assert encoder.loads(stdlib.dumps(payload)) == payload
@@ -1,10 +1,20 @@
+import asyncio
 import json
+from typing import Iterator
 
 import pytest
 
-from llmflow.errors import LLMOutputValidationError, LLMRenderError
-from llmflow.providers import MockProvider
+from llmflow.errors import LLMConfigError, LLMOutputValidationError, LLMRenderError
+from llmflow.inputs import StepInputs
+from llmflow.providers import (
+    AsyncProvider,
+    MockProvider,
+    Provider,
+    ProviderRequest,
+    ProviderResponse,
+)
 from llmflow.steps import LLMStep
+from llmflow.tracing import output_scope
 from llmflow.workflow import StepDef
 
 
@@ -54,3 +64,170 @@ def test_llm_step_schema_failure(tmp_path) -> None:
 
     with pytest.raises(LLMOutputValidationError):
         step.execute({"topic": "Testing"})
+
+
+def test_llm_step_aexecute_uses_async_provider(tmp_path) -> None:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("Hello {{ inputs.topic }}", encoding="utf-8")
+
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text("{}", encoding="utf-8")
+
+    class EchoProvider(AsyncProvider):
+        async def acall(self, request: ProviderRequest) -> ProviderResponse:
+            return ProviderResponse(
+                model=request.model,
+                output_text=json.dumps({"prompt": request.prompt}),
+            )
+
+    step_def = StepDef(
+        id="draft",
+        type="llm",
+        prompt=str(prompt_path),
+        output_schema=str(schema_path),
+        llm={"model": "mock"},
+    )
+    step = LLMStep(step_def, provider=EchoProvider())
+
+    assert asyncio.run(step.aexecute({"topic": "Testing"})) == {"prompt": "Hello Testing"}
+    with pytest.raises(LLMConfigError):
+        step.execute({"topic": "Testing"})
+
+
+class _ChunkProvider(Provider):
+    """Streams fixed chunks and records how far the stream was consumed."""
+
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self.sent = 0
+        self.closed = False
+
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
+    def call(self, request: ProviderRequest) -> ProviderResponse:
+        raise AssertionError("streaming providers are not called")
+
+    def stream(self, request: ProviderRequest) -> Iterator[str]:
+        try:
+            for chunk in self.chunks:
+                self.sent += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def _streaming_step(tmp_path, provider: Provider) -> LLMStep:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("Hello {{ inputs.topic }}", encoding="utf-8")
+    schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {"title": {"type": "string"}},
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema), encoding="utf-8")
+    step_def = StepDef(
+        id="draft",
+        type="llm",
+        prompt=str(prompt_path),
+        output_schema=str(schema_path),
+        llm={"model": "mock"},
+    )
+    return LLMStep(step_def, provider=provider)
+
+
+def test_llm_step_streams_output_to_sink(tmp_path) -> None:
+    provider = _ChunkProvider(['{"tit', 'le": "Str', 'eamed"}'])
+    step = _streaming_step(tmp_path, provider)
+    received: list[tuple[str, int]] = []
+
+    with output_scope(lambda text, attempt: received.append((text, attempt))):
+        output = step.execute({"topic": "Testing"})
+
+    assert output == {"title": "Streamed"}
+    assert received == [('{"tit', 1), ('le": "Str', 1), ('eamed"}', 1)]
+
+
+def test_llm_step_aborts_stream_on_disallowed_key(tmp_path) -> None:
+    provider = _ChunkProvider(['{"body"', ': "x', "x" * 50, '"}'])
+    step = _streaming_step(tmp_path, provider)
+
+    with pytest.raises(LLMOutputValidationError, match="'body' is not allowed"):
+        step.execute({"topic": "Testing"})
+
+    assert provider.sent == 1
+    assert provider.closed
+
+
+def test_llm_step_aexecute_aborts_stream_on_wrong_top_level_type(tmp_path) -> None:
+    provider = _ChunkProvider(["[", '"title"', "]"])
+    step = _streaming_step(tmp_path, provider)
+
+    with pytest.raises(LLMOutputValidationError, match="must be a JSON object"):
+        asyncio.run(step.aexecute({"topic": "Testing"}))
+
+    assert provider.sent == 1
+    assert provider.closed
+
+
+@pytest.mark.parametrize(
+    ("template", "expected"),
+    [
+        ("{{ inputs }}", "{'a': 1, 'b': 2}"),
+        ("{{ inputs | tojson }}", '{"a": 1, "b": 2}'),
+    ],
+)
+def test_llm_step_renders_layered_inputs_as_dict(tmp_path, template, expected) -> None:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text(template, encoding="utf-8")
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text("{}", encoding="utf-8")
+    step_def = StepDef(
+        id="draft",
+        type="llm",
+        prompt=str(prompt_path),
+        output_schema=str(schema_path),
+        llm={"model": "mock"},
+    )
+    prompts: list[str | None] = []
+
+    class RecordingProvider(Provider):
+        def call(self, request: ProviderRequest) -> ProviderResponse:
+            prompts.append(request.prompt)
+            return ProviderResponse(model=request.model, output_text="{}")
+
+    step = LLMStep(step_def, provider=RecordingProvider())
+
+    assert step.execute(StepInputs([{"a": 1}, {"b": 2}])) == {}
+    assert prompts == [expected]
+
+
+def test_llm_step_renders_fields_without_copying_inputs(tmp_path) -> None:
+    class UncopyableInputs(StepInputs):
+        def __iter__(self):
+            raise AssertionError("inputs were copied")
+
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("{{ inputs.a }} and {{ inputs['b'] }}", encoding="utf-8")
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text("{}", encoding="utf-8")
+    step_def = StepDef(
+        id="draft",
+        type="llm",
+        prompt=str(prompt_path),
+        output_schema=str(schema_path),
+        llm={"model": "mock"},
+    )
+
+    class EchoProvider(Provider):
+        def call(self, request: ProviderRequest) -> ProviderResponse:
+            return ProviderResponse(
+                model=request.model, output_text=json.dumps({"prompt": request.prompt})
+            )
+
+    step = LLMStep(step_def, provider=EchoProvider())
+
+    output = step.execute(UncopyableInputs([{"a": 1}, {"b": 2}]))
+    assert output == {"prompt": "1 and 2"}
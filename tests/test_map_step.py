@@ -0,0 +1,221 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from llmflow.cache import MemoryStepCache
+from llmflow.errors import MapStepError
+from llmflow.providers import MockProvider, ProviderRequest, ProviderResponse
+from llmflow.registry import StepRegistry, ToolRegistry
+from llmflow.runner import AsyncRunner, RunConfig, Runner
+from llmflow.steps import llm as llm_step
+from llmflow.workflow import Workflow
+
+
+def _write_workflow(tmp_path, child: str, *, concurrency: int = 1) -> Workflow:
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        f"""
+workflow:
+  name: sections
+  version: "1.0"
+
+inputs:
+  sections:
+    type: array
+
+steps:
+  - id: expand
+    type: map
+    map:
+      over: sections
+      item: section
+      output: drafts
+      concurrency: {concurrency}
+      step:
+{child}
+
+outputs:
+  drafts: expand
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    return Workflow.load(workflow_path)
+
+
+_TOOL_CHILD = """        type: tool
+        tool:
+          name: expand"""
+
+
+def test_map_step_runs_elements_concurrently_in_order(tmp_path) -> None:
+    workflow = _write_workflow(tmp_path, _TOOL_CHILD, concurrency=3)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def expand(inputs: dict) -> dict:
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        # Later elements finish first to check ordering.
+        time.sleep(0.05 * (3 - inputs["section"]))
+        with lock:
+            active[0] -= 1
+        return {"text": f"section {inputs['section']}"}
+
+    tools = ToolRegistry()
+    tools.register("expand", expand)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={"sections": [0, 1, 2]})
+
+    assert result.outputs == {
+        "drafts": {"drafts": [{"text": f"section {index}"} for index in range(3)]}
+    }
+    assert active[1] > 1
+    items_dir = result.run_dir / "steps" / "expand" / "items"
+    assert sorted(path.name for path in items_dir.iterdir()) == ["0", "1", "2"]
+    item_output = json.loads((items_dir / "1" / "output.json").read_text(encoding="utf-8"))
+    assert item_output == {"text": "section 1"}
+
+
+def test_map_step_writes_llm_artifacts_per_item(tmp_path) -> None:
+    (tmp_path / "prompt.md").write_text("Expand {{ inputs.section }}", encoding="utf-8")
+    (tmp_path / "schema.json").write_text('{"type": "object"}', encoding="utf-8")
+    workflow = _write_workflow(
+        tmp_path,
+        """        type: llm
+        prompt: prompt.md
+        output_schema: schema.json
+        llm:
+          model: mock""",
+        concurrency=2,
+    )
+
+    class EchoProvider(MockProvider):
+        def call(self, request: ProviderRequest) -> ProviderResponse:
+            return ProviderResponse(
+                model=request.model, output_text=json.dumps({"prompt": request.prompt})
+            )
+
+    runner = AsyncRunner(
+        provider=EchoProvider(),
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = asyncio.run(runner.run(workflow, inputs={"sections": ["intro", "body"]}))
+
+    assert result.outputs["drafts"]["drafts"] == [
+        {"prompt": "Expand intro"},
+        {"prompt": "Expand body"},
+    ]
+    item_dir = result.run_dir / "steps" / "expand" / "items" / "1"
+    assert (item_dir / "rendered_prompt.md").read_text(encoding="utf-8") == "Expand body"
+    llm_call = json.loads((item_dir / "llm_call.json").read_text(encoding="utf-8"))
+    assert llm_call["request"]["prompt"] == "Expand body"
+
+
+def test_map_step_renders_cached_llm_prompts_once(tmp_path, monkeypatch) -> None:
+    (tmp_path / "prompt.md").write_text("Expand {{ inputs.section }}", encoding="utf-8")
+    (tmp_path / "schema.json").write_text('{"type": "object"}', encoding="utf-8")
+    workflow = _write_workflow(
+        tmp_path,
+        """        type: llm
+        prompt: prompt.md
+        output_schema: schema.json
+        llm:
+          model: mock""",
+        concurrency=2,
+    )
+    rendered: list[str] = []
+    render_prompt = llm_step._render_prompt
+
+    def counting_render(*args):
+        rendered.append(render_prompt(*args))
+        return rendered[-1]
+
+    monkeypatch.setattr(llm_step, "_render_prompt", counting_render)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            cache=MemoryStepCache(),
+        ),
+    )
+
+    runner.run(workflow, inputs={"sections": ["intro", "body"]})
+    assert sorted(rendered) == ["Expand body", "Expand intro"]
+
+    rendered.clear()
+    second = runner.run(workflow, inputs={"sections": ["intro", "body"]})
+    assert sorted(rendered) == ["Expand body", "Expand intro"]
+    assert list(second.metadata["cache_hits"]) == ["expand"]
+    item_dir = second.run_dir / "steps" / "expand" / "items" / "1"
+    assert (item_dir / "rendered_prompt.md").read_text(encoding="utf-8") == "Expand body"
+
+
+def test_map_step_runs_with_custom_step_registry(tmp_path) -> None:
+    # Map steps are built by the runner, not looked up in the step registry.
+    workflow = _write_workflow(tmp_path, _TOOL_CHILD)
+    tools = ToolRegistry()
+    tools.register("expand", lambda inputs: {"text": inputs["section"]})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        steps=StepRegistry(),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={"sections": ["intro"]})
+
+    assert result.outputs["drafts"]["drafts"] == [{"text": "intro"}]
+
+
+def test_map_step_reports_failing_item(tmp_path) -> None:
+    workflow = _write_workflow(tmp_path, _TOOL_CHILD, concurrency=2)
+
+    def expand(inputs: dict) -> dict:
+        if inputs["section"] == "bad":
+            raise ValueError("cannot expand")
+        return {"text": inputs["section"]}
+
+    tools = ToolRegistry()
+    tools.register("expand", expand)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    with pytest.raises(MapStepError, match="item 1"):
+        runner.run(workflow, inputs={"sections": ["ok", "bad"]})
+
+    run_dir = next((tmp_path / ".runs").iterdir())
+    item_error = json.loads(
+        (run_dir / "steps" / "expand" / "items" / "1" / "error.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert item_error["item"] == [1]
+
+
+def test_map_step_requires_list_input(tmp_path) -> None:
+    workflow = _write_workflow(tmp_path, _TOOL_CHILD)
+    tools = ToolRegistry()
+    tools.register("expand", lambda inputs: {})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    with pytest.raises(MapStepError, match="must be a list"):
+        runner.run(workflow, inputs={"sections": "intro"})
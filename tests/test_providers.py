@@ -1,8 +1,26 @@
+import asyncio
+import threading
+import time
+
 import pytest
 from pydantic import ValidationError
 
-from llmflow.errors import ProviderError
-from llmflow.providers import MockProvider, ProviderMessage, ProviderRequest
+from llmflow.cache import MemoryStepCache, SQLiteStepCache
+from llmflow.deadlines import deadline_scope
+from llmflow.errors import ProviderError, ProviderRateLimitError
+from llmflow.providers import (
+    CachingProvider,
+    MockProvider,
+    ProviderMessage,
+    ProviderRequest,
+    ProviderResponse,
+    ProviderUsage,
+    RateLimit,
+    RateLimitedProvider,
+    SyncProviderAdapter,
+    TokenBucket,
+    as_async_provider,
+)
 
 
 def test_provider_request_requires_prompt_or_messages() -> None:
@@ -43,3 +61,208 @@ def test_mock_provider_strict_missing_mapping_raises() -> None:
     request = ProviderRequest(model="mock", prompt="missing")
     with pytest.raises(ProviderError):
         provider.call(request)
+
+
+def test_sync_provider_adapter_exposes_async_call() -> None:
+    provider = as_async_provider(MockProvider(responses={"prompt:hello": "ok"}))
+    assert isinstance(provider, SyncProviderAdapter)
+    assert as_async_provider(provider) is provider
+
+    request = ProviderRequest(model="mock", prompt="hello")
+    response = asyncio.run(provider.acall(request))
+    assert response.output_text == "ok"
+
+
+class _UsageProvider(MockProvider):
+    def __init__(self, *, total_tokens: int | None = None, delay: float = 0.0) -> None:
+        super().__init__(default_output="{}")
+        self._total_tokens = total_tokens
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def call(self, request: ProviderRequest) -> ProviderResponse:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self._delay)
+        with self._lock:
+            self.in_flight -= 1
+        response = super().call(request)
+        if self._total_tokens is None:
+            return response
+        return response.model_copy(
+            update={"usage": ProviderUsage(total_tokens=self._total_tokens)}
+        )
+
+
+def test_token_bucket_reservations_wait_for_refill() -> None:
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    bucket.adjust(-5)
+    assert bucket.reserve(1) == 0.0
+
+
+def test_rate_limited_provider_caps_concurrency_per_model() -> None:
+    inner = _UsageProvider(delay=0.05)
+    provider = RateLimitedProvider(
+        inner,
+        limits={"slow": RateLimit(initial_concurrency=2, max_concurrency=2)},
+    )
+    request = ProviderRequest(model="slow", prompt="hi")
+
+    threads = [threading.Thread(target=provider.call, args=(request,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert inner.peak == 2
+    # Other models are not limited.
+    assert provider.concurrency_limit("other") is None
+
+
+def test_rate_limited_provider_adapts_concurrency_to_throttling() -> None:
+    throttle = [True]
+
+    class ThrottlingProvider(MockProvider):
+        def call(self, request: ProviderRequest) -> ProviderResponse:
+            if throttle[0]:
+                raise ProviderRateLimitError("429")
+            return super().call(request)
+
+    provider = RateLimitedProvider(
+        ThrottlingProvider(default_output="{}"),
+        default=RateLimit(initial_concurrency=8),
+    )
+    request = ProviderRequest(model="m", prompt="hi")
+
+    with pytest.raises(ProviderRateLimitError):
+        provider.call(request)
+    assert provider.concurrency_limit("m") == 4
+
+    throttle[0] = False
+    for _ in range(10):
+        provider.call(request)
+    assert provider.concurrency_limit("m") > 4
+
+
+def test_rate_limited_provider_accounts_tokens_from_usage() -> None:
+    provider = RateLimitedProvider(
+        _UsageProvider(total_tokens=1200),
+        default=RateLimit(tokens_per_minute=600),
+    )
+    request = ProviderRequest(model="m", prompt="hi")
+
+    provider.call(request)
+
+    # Usage overdraws the minute's budget, so the next call cannot fit in 1s.
+    with deadline_scope(time.monotonic() + 1):
+        with pytest.raises(ProviderRateLimitError, match="deadline"):
+            provider.call(request)
+    with deadline_scope(time.monotonic() + 1):
+        with pytest.raises(ProviderRateLimitError):
+            asyncio.run(provider.acall(request))
+
+
+def test_mock_provider_streams_output_in_chunks() -> None:
+    provider = MockProvider(default_output='{"a": 1}', chunk_size=3)
+    request = ProviderRequest(model="mock", prompt="hi")
+
+    assert provider.supports_streaming
+    assert list(provider.stream(request)) == ['{"a', '": ', "1}"]
+    assert not MockProvider(default_output="{}").supports_streaming
+    assert list(MockProvider(default_output="{}").stream(request)) == ["{}"]
+
+
+def test_sync_provider_adapter_streams_chunks() -> None:
+    provider = MockProvider(default_output="abcdef", chunk_size=4)
+    adapter = SyncProviderAdapter(provider)
+    request = ProviderRequest(model="mock", prompt="hi")
+
+    async def _collect() -> list[str]:
+        return [chunk async for chunk in adapter.astream(request)]
+
+    assert adapter.supports_streaming
+    assert asyncio.run(_collect()) == ["abcd", "ef"]
+
+
+class _CountingProvider(MockProvider):
+    def __init__(self, **kwargs: object) -> None:
+        super().__init__(default_output='{"ok": true}', **kwargs)
+        self.calls = 0
+
+    def call(self, request: ProviderRequest) -> ProviderResponse:
+        self.calls += 1
+        return super().call(request)
+
+    def stream(self, request: ProviderRequest):
+        self.calls += 1
+        yield from super().stream(request)
+
+
+def test_caching_provider_reuses_deterministic_responses() -> None:
+    inner = _CountingProvider()
+    provider = CachingProvider(inner, MemoryStepCache())
+    request = ProviderRequest(model="mock", prompt="hi", temperature=0, timeout=5.0)
+
+    first = provider.call(request)
+    second = provider.call(request.model_copy(update={"timeout": 1.0}))
+    provider.call(request.model_copy(update={"max_tokens": 10}))
+
+    assert second == first
+    assert inner.calls == 2
+    assert (provider.hits, provider.misses) == (1, 2)
+
+
+def test_caching_provider_skips_nondeterministic_requests() -> None:
+    inner = _CountingProvider()
+    provider = CachingProvider(inner, MemoryStepCache())
+    request = ProviderRequest(model="mock", prompt="hi", temperature=0.7)
+
+    provider.call(request)
+    provider.call(request)
+    assert inner.calls == 2
+    assert provider.cache_key(request) is None
+    assert provider.cache_key(request.model_copy(update={"seed": 7})) is not None
+    assert (provider.hits, provider.misses) == (0, 0)
+
+    caching_all = CachingProvider(inner, MemoryStepCache(), cache_all=True)
+    caching_all.call(request)
+    caching_all.call(request)
+    assert inner.calls == 3
+
+
+def test_caching_provider_persists_in_sqlite(tmp_path) -> None:
+    request = ProviderRequest(model="mock", prompt="hi", seed=1)
+    first = CachingProvider(_CountingProvider(), SQLiteStepCache(tmp_path / "cache.sqlite"))
+    response = first.call(request)
+
+    inner = _CountingProvider()
+    second = CachingProvider(inner, SQLiteStepCache(tmp_path / "cache.sqlite"))
+    other = CachingProvider(
+        inner, SQLiteStepCache(tmp_path / "cache.sqlite"), namespace="other"
+    )
+
+    assert second.call(request) == response
+    assert inner.calls == 0
+    other.call(request)
+    assert inner.calls == 1
+
+
+def test_caching_provider_stores_completed_streams() -> None:
+    inner = _CountingProvider(chunk_size=4)
+    provider = CachingProvider(inner, MemoryStepCache())
+    request = ProviderRequest(model="mock", prompt="hi", temperature=0)
+
+    aborted = provider.stream(request)
+    next(aborted)
+    aborted.close()
+    assert list(provider.stream(request)) == ['{"ok', '": t', "rue}"]
+    assert list(provider.stream(request)) == ['{"ok": true}']
+    assert asyncio.run(provider.acall(request)).output_text == '{"ok": true}'
+    assert inner.calls == 2
+    assert (provider.hits, provider.misses) == (2, 2)
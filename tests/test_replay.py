@@ -4,6 +4,7 @@ from pathlib import Path
 import pytest
 
 from llmflow.errors import ReplayError
+from llmflow.hashing import sha256_json
 from llmflow.providers import MockProvider
 from llmflow.registry import ToolRegistry
 from llmflow.replay import replay
@@ -87,3 +88,100 @@ def test_replay_allows_workflow_override(tmp_path) -> None:
     result = replay(run_dir, workflow_path=tmp_path / "workflow.yaml")
 
     assert result.outputs == {"result": {"value": "Testing"}}
+
+
+def test_replay_rebuilds_passthrough_outputs(tmp_path) -> None:
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: echo
+    type: tool
+    tool:
+      name: echo
+  - id: check
+    type: validate
+    depends_on: [echo]
+    validate:
+      required: [value]
+      passthrough: true
+
+outputs:
+  result: check
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    tools = ToolRegistry()
+    tools.register("echo", lambda inputs: {"value": inputs["topic"]})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(Workflow.load(workflow_path), inputs={"topic": "Testing"})
+
+    check_dir = result.run_dir / "steps" / "check"
+    assert (check_dir / "passthrough.json").exists()
+    assert not (check_dir / "output.json").exists()
+    assert result.outputs == {"result": {"topic": "Testing", "value": "Testing"}}
+    # Derived from the hashes of what the output is made of.
+    hashes = result.metadata["step_output_hashes"]
+    assert hashes["check"] == sha256_json(
+        {"inputs": result.metadata["inputs_hash"], "depends_on": [hashes["echo"]]}
+    )
+    assert replay(result.run_dir).outputs == result.outputs
+
+
+def test_replay_resolves_only_requested_outputs(tmp_path) -> None:
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: echo
+    type: tool
+    tool:
+      name: echo
+  - id: translate
+    type: tool
+    depends_on: [echo]
+    tool:
+      name: echo
+
+outputs:
+  result: echo
+  translation: translate
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    tools = ToolRegistry()
+    tools.register("echo", lambda inputs: {"value": inputs["topic"]})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(
+        Workflow.load(workflow_path), inputs={"topic": "Testing"}, outputs=["result"]
+    )
+
+    assert replay(result.run_dir).outputs == {"result": {"value": "Testing"}}
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llmflow.errors import ProviderError
+from llmflow.providers import ProviderResponse
+from llmflow.retry import (
+    CallRecorder,
+    HedgePolicy,
+    LatencyTracker,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+)
+
+
+def _response(text: str = "{}") -> ProviderResponse:
+    return ProviderResponse(model="mock", output_text=text)
+
+
+def test_call_with_retry_retries_transient_errors() -> None:
+    failures = [ProviderError("overloaded"), ConnectionError("reset")]
+
+    def _call() -> ProviderResponse:
+        if failures:
+            raise failures.pop(0)
+        return _response()
+
+    recorder = CallRecorder()
+    response = call_with_retry(
+        _call,
+        model="mock",
+        retry=RetryPolicy(max_attempts=3, initial_delay=0),
+        hedge=None,
+        latencies=None,
+        recorder=recorder,
+    )
+
+    assert response.output_text == "{}"
+    assert [item["attempt"] for item in recorder.attempts] == [1, 2, 3]
+    assert [item["error"]["type"] if item["error"] else None for item in recorder.attempts] == [
+        "ProviderError",
+        "ConnectionError",
+        None,
+    ]
+    assert [item["selected"] for item in recorder.attempts] == [False, False, True]
+
+
+def test_call_with_retry_stops_on_non_retryable_error() -> None:
+    calls: list[int] = []
+
+    def _call() -> ProviderResponse:
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retry(
+            _call,
+            model="mock",
+            retry=RetryPolicy(max_attempts=5, initial_delay=0),
+            hedge=None,
+            latencies=None,
+            recorder=CallRecorder(),
+        )
+    assert len(calls) == 1
+
+
+def test_retry_policy_matches_error_names_and_bounds_delay() -> None:
+    policy = RetryPolicy(initial_delay=1, max_delay=3, jitter=0, retry_on=("ProviderError",))
+
+    class RateLimited(ProviderError):
+        pass
+
+    assert policy.should_retry(RateLimited("slow down"))
+    assert not policy.should_retry(TimeoutError())
+    assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [1, 2, 3]
+
+
+def test_hedged_call_takes_the_faster_response() -> None:
+    lock = threading.Lock()
+    calls: list[int] = []
+
+    def _call() -> ProviderResponse:
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(1)
+            return _response('{"from": "primary"}')
+        return _response('{"from": "hedge"}')
+
+    recorder = CallRecorder()
+    started = time.monotonic()
+    response = call_with_retry(
+        _call,
+        model="mock",
+        retry=None,
+        hedge=HedgePolicy(initial_delay=0.05),
+        latencies=None,
+        recorder=recorder,
+    )
+
+    assert time.monotonic() - started < 0.5
+    assert response.output_text == '{"from": "hedge"}'
+    by_hedge = {item["hedge"]: item for item in recorder.attempts}
+    assert by_hedge[True]["selected"] is True
+    assert by_hedge[False]["abandoned"] is True
+
+
+def test_async_hedged_call_cancels_the_loser() -> None:
+    cancelled: list[bool] = []
+    calls: list[int] = []
+
+    async def _call() -> ProviderResponse:
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return _response()
+
+    async def _main() -> CallRecorder:
+        recorder = CallRecorder()
+        await acall_with_retry(
+            _call,
+            model="mock",
+            retry=None,
+            hedge=HedgePolicy(initial_delay=0.05),
+            latencies=None,
+            recorder=recorder,
+        )
+        await asyncio.sleep(0)
+        return recorder
+
+    recorder = asyncio.run(_main())
+
+    assert cancelled == [True]
+    assert [(item["hedge"], item["selected"]) for item in recorder.attempts] == [
+        (False, False),
+        (True, True),
+    ]
+
+
+def test_hedge_delay_follows_observed_latency_quantile() -> None:
+    tracker = LatencyTracker()
+    for value in range(1, 11):
+        tracker.record("mock", value / 100)
+
+    assert tracker.quantile("mock", 0.9, min_samples=20) is None
+    assert tracker.quantile("mock", 0.9) == pytest.approx(0.10)
+    assert tracker.quantile("mock", 0.5) == pytest.approx(0.06)
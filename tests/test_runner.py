@@ -1,10 +1,40 @@
+import asyncio
+import gc
+import json
+import threading
+import time
+import weakref
+
 import pytest
 
-from llmflow.errors import StepExecutionError
-from llmflow.providers import MockProvider
+from llmflow.cache import MemoryStepCache
+from llmflow.errors import (
+    LLMRenderError,
+    ProviderError,
+    RunDeadlineExceededError,
+    StepExecutionError,
+    StepTimeoutError,
+)
+from llmflow.events import (
+    RunCompleted,
+    StepCompleted,
+    StepFailed,
+    StepOutputDelta,
+    StepStarted,
+)
+from llmflow.providers import CachingProvider, MockProvider
 from llmflow.registry import ToolRegistry
-from llmflow.runner import RunConfig, Runner
-from llmflow.workflow import InputDef, StepDef, Workflow, WorkflowMeta, WorkflowSpec
+from llmflow.retry import RetryPolicy
+from llmflow.runner import AsyncRunner, RunConfig, Runner
+from llmflow.stats import StepDurations
+from llmflow.workflow import (
+    InputDef,
+    StepDef,
+    StepRetryConfig,
+    Workflow,
+    WorkflowMeta,
+    WorkflowSpec,
+)
 
 
 def _build_workflow(tmp_path) -> Workflow:
@@ -96,3 +126,781 @@ def test_runner_writes_error_artifacts_on_step_failure(tmp_path) -> None:
     run_dir = run_dirs[0]
     assert (run_dir / "error.json").exists()
     assert (run_dir / "steps" / "echo" / "error.json").exists()
+
+
+def _fan_out_workflow(tmp_path, width: int) -> Workflow:
+    branches = [
+        StepDef(id=f"branch_{index}", type="tool", tool={"name": "branch"})
+        for index in range(width)
+    ]
+    steps = [
+        *branches,
+        StepDef(
+            id="join",
+            type="tool",
+            depends_on=[step.id for step in branches],
+            tool={"name": "join"},
+        ),
+    ]
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="fan_out", version="1.0"),
+        inputs={"topic": InputDef(type="string")},
+        steps=steps,
+        outputs={"result": "join"},
+    )
+    return Workflow(
+        spec=spec,
+        path=tmp_path / "workflow.yaml",
+        workflow_hash="fanout",
+    )
+
+
+def test_runner_parallel_runs_independent_steps_concurrently(tmp_path) -> None:
+    width = 4
+    workflow = _fan_out_workflow(tmp_path, width)
+    barrier = threading.Barrier(width, timeout=5)
+    tools = ToolRegistry()
+
+    def _branch(inputs: dict[str, object]) -> dict[str, object]:
+        barrier.wait()
+        return {threading.current_thread().name: inputs["topic"]}
+
+    tools.register("branch", _branch)
+    tools.register("join", lambda inputs: {"count": len(inputs) - 1})
+
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            run_id="parallel",
+            max_concurrency=width,
+        ),
+    )
+
+    result = runner.run(workflow, inputs={"topic": "Testing"})
+
+    assert result.outputs == {"result": {"count": width}}
+    assert result.metadata["execution_order"] == [
+        *(f"branch_{index}" for index in range(width)),
+        "join",
+    ]
+    timeline = result.metadata["timeline"]
+    assert set(timeline) == set(result.metadata["execution_order"])
+    for index in range(width):
+        assert timeline["join"]["started_at"] >= timeline[f"branch_{index}"]["ended_at"]
+
+
+def test_runner_parallel_fails_fast_and_skips_pending_steps(tmp_path) -> None:
+    workflow = _fan_out_workflow(tmp_path, 3)
+    tools = ToolRegistry()
+
+    def _boom(_: dict[str, object]) -> dict[str, object]:
+        raise ValueError("boom")
+
+    tools.register("branch", _boom)
+    tools.register("join", lambda inputs: {"joined": True})
+
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            run_id="parallel-failure",
+            max_concurrency=2,
+        ),
+    )
+
+    with pytest.raises(StepExecutionError):
+        runner.run(workflow, inputs={"topic": "Testing"})
+
+    run_dir = next((tmp_path / ".runs").iterdir())
+    error = json.loads((run_dir / "error.json").read_text(encoding="utf-8"))
+    assert error["stage"] == "step"
+    assert error["step_id"].startswith("branch_")
+    assert not (run_dir / "steps" / "join").exists()
+
+
+def test_run_config_rejects_invalid_concurrency() -> None:
+    with pytest.raises(ValueError):
+        RunConfig(max_concurrency=0)
+
+
+def test_async_runner_runs_fan_out_on_event_loop(tmp_path) -> None:
+    width = 3
+    workflow = _fan_out_workflow(tmp_path, width)
+    tools = ToolRegistry()
+    in_flight = 0
+    peak = 0
+
+    async def _branch(inputs: dict[str, object]) -> dict[str, object]:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"topic": inputs["topic"]}
+
+    tools.register("branch", _branch)
+    tools.register("join", lambda inputs: {"topic": inputs["topic"]})
+
+    runner = AsyncRunner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            run_id="async",
+            max_concurrency=2,
+        ),
+    )
+
+    result = asyncio.run(runner.run(workflow, inputs={"topic": "Testing"}))
+
+    assert result.outputs == {"result": {"topic": "Testing"}}
+    assert peak == 2
+    assert set(result.metadata["timeline"]) == set(result.metadata["execution_order"])
+
+
+def _echo_topic(inputs: dict[str, object]) -> dict[str, object]:
+    if inputs["topic"] == "bad":
+        raise ValueError("bad topic")
+    return {"value": inputs["topic"]}
+
+
+def _batch_runner(tmp_path, run_id: str) -> Runner:
+    tools = ToolRegistry()
+    tools.register("echo", _echo_topic)
+    return Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            run_id=run_id,
+        ),
+    )
+
+
+def test_runner_run_many_captures_errors_per_item(tmp_path) -> None:
+    workflow = _build_workflow(tmp_path)
+    runner = _batch_runner(tmp_path, "batch")
+    records = ({"topic": topic} for topic in ["a", "bad", "c", "d", "e"])
+
+    results = list(runner.run_many(workflow, records, workers=2, max_in_flight=3))
+
+    assert [item.index for item in results] == [0, 1, 2, 3, 4]
+    assert [item.ok for item in results] == [True, False, True, True, True]
+    assert isinstance(results[1].error, StepExecutionError)
+    assert results[4].result.outputs == {"result": {"value": "e"}}
+    for item in results:
+        if item.ok:
+            assert item.result.run_dir.name.endswith(f"batch-{item.index}")
+
+
+def test_runner_run_many_process_mode(tmp_path) -> None:
+    workflow = _build_workflow(tmp_path)
+    runner = _batch_runner(tmp_path, "proc")
+    records = [{"topic": "x"}, {"topic": "y"}]
+
+    results = list(runner.run_many(workflow, records, workers=2, mode="process", ordered=False))
+
+    assert sorted(item.result.outputs["result"]["value"] for item in results) == ["x", "y"]
+
+
+def test_runner_run_many_rejects_unknown_mode(tmp_path) -> None:
+    runner = _batch_runner(tmp_path, "mode")
+    with pytest.raises(ValueError):
+        runner.run_many(_build_workflow(tmp_path), [], mode="fiber")
+
+
+def _llm_workflow(tmp_path, prompt_text: str = "Hello {{ inputs.topic }}") -> Workflow:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text(prompt_text, encoding="utf-8")
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text('{"type": "object"}', encoding="utf-8")
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="llm", version="1.0"),
+        inputs={"topic": InputDef(type="string")},
+        steps=[
+            StepDef(
+                id="draft",
+                type="llm",
+                prompt=str(prompt_path),
+                output_schema=str(schema_path),
+                llm={"model": "mock", "temperature": 0},
+            )
+        ],
+        outputs={"result": "draft"},
+    )
+    return Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="llm")
+
+
+def test_runner_compiled_plan_is_reused_across_runs(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    runner = Runner(
+        provider=MockProvider(default_output='{"title": "ok"}'),
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    plan = runner.compile(workflow)
+    (tmp_path / "prompt.md").unlink()
+
+    first = runner.run(plan, inputs={"topic": "one"})
+    second = runner.run(plan, inputs={"topic": "two"})
+
+    assert plan.order == ["draft"]
+    assert plan.dependencies == {"draft": ()}
+    assert first.outputs == second.outputs == {"result": {"title": "ok"}}
+    assert first.run_dir != second.run_dir
+
+
+def test_runner_compile_surfaces_template_errors(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path, prompt_text="Hello {{ inputs.topic ")
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    with pytest.raises(LLMRenderError):
+        runner.compile(workflow)
+    assert not (tmp_path / ".runs").exists()
+
+
+def test_runner_serves_repeated_steps_from_cache(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    calls: list[str] = []
+
+    class CountingProvider(MockProvider):
+        def call(self, request):
+            calls.append(request.prompt)
+            return super().call(request)
+
+    runner = Runner(
+        provider=CountingProvider(default_output='{"title": "ok"}'),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            cache=MemoryStepCache(),
+        ),
+    )
+
+    first = runner.run(workflow, inputs={"topic": "same"})
+    second = runner.run(workflow, inputs={"topic": "same"})
+    third = runner.run(workflow, inputs={"topic": "different"})
+
+    assert calls == ["Hello same", "Hello different"]
+    assert first.metadata["cache_hits"] == {}
+    assert list(second.metadata["cache_hits"]) == ["draft"]
+    assert third.metadata["cache_hits"] == {}
+    assert second.outputs == first.outputs
+    assert (second.run_dir / "steps" / "draft" / "output.json").exists()
+
+    # Cached steps keep their prompt artifacts for replay and auditing.
+    assert second.metadata["prompt_hashes"] == first.metadata["prompt_hashes"]
+    step_dir = second.run_dir / "steps" / "draft"
+    assert (step_dir / "rendered_prompt.md").read_text(encoding="utf-8") == "Hello same"
+    llm_call = json.loads((step_dir / "llm_call.json").read_text(encoding="utf-8"))
+    assert llm_call["cache_hit"] is True
+    assert llm_call["request"]["prompt"] == "Hello same"
+
+
+def test_runner_passes_read_only_layered_inputs(tmp_path) -> None:
+    steps = [
+        StepDef(id="first", type="tool", tool={"name": "first"}),
+        StepDef(id="second", type="tool", tool={"name": "second"}),
+        StepDef(
+            id="merge",
+            type="tool",
+            depends_on=["first", "second"],
+            tool={"name": "merge"},
+        ),
+    ]
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="layers", version="1.0"),
+        inputs={"topic": InputDef(type="string")},
+        steps=steps,
+        outputs={"result": "merge"},
+    )
+    workflow = Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="layers")
+    tools = ToolRegistry()
+    tools.register("first", lambda inputs: {"topic": "first", "shared": 1})
+    tools.register("second", lambda inputs: {"shared": 2})
+
+    def _merge(inputs: dict[str, object]) -> dict[str, object]:
+        with pytest.raises(TypeError):
+            inputs["topic"] = "mutated"  # type: ignore[index]
+        return {"seen": dict(inputs)}
+
+    tools.register("merge", _merge)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={"topic": "input"})
+
+    assert result.outputs == {"result": {"seen": {"topic": "first", "shared": 2}}}
+
+
+class _Payload(dict):
+    pass
+
+
+def test_runner_releases_dead_step_outputs(tmp_path) -> None:
+    steps = [
+        StepDef(id="load", type="tool", tool={"name": "load"}),
+        StepDef(id="shrink", type="tool", depends_on=["load"], tool={"name": "shrink"}),
+        StepDef(id="report", type="tool", depends_on=["shrink"], tool={"name": "report"}),
+    ]
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="chain", version="1.0"),
+        inputs={},
+        steps=steps,
+        outputs={"result": "report"},
+    )
+    workflow = Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="chain")
+    loaded: list[weakref.ref[_Payload]] = []
+
+    def _load(_: dict[str, object]) -> dict[str, object]:
+        payload = _Payload(document="x" * 1024)
+        loaded.append(weakref.ref(payload))
+        return payload
+
+    def _report(inputs: dict[str, object]) -> dict[str, object]:
+        gc.collect()
+        return {"released": loaded[0]() is None, "size": inputs["size"]}
+
+    tools = ToolRegistry()
+    tools.register("load", _load)
+    tools.register("shrink", lambda inputs: {"size": len(inputs["document"])})
+    tools.register("report", _report)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={})
+
+    assert result.outputs == {"result": {"released": True, "size": 1024}}
+    assert (result.run_dir / "steps" / "load" / "output.json").exists()
+
+
+def _sleepy_workflow(tmp_path, *, timeout: float | None = None) -> Workflow:
+    steps = [
+        StepDef(id="first", type="tool", tool={"name": "sleep"}, timeout=timeout),
+        StepDef(id="second", type="tool", depends_on=["first"], tool={"name": "sleep"}),
+    ]
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="sleepy", version="1.0"),
+        inputs={"delay": InputDef(type="number")},
+        steps=steps,
+        outputs={"result": "second"},
+    )
+    return Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="sleepy")
+
+
+def _sleep_tools() -> ToolRegistry:
+    tools = ToolRegistry()
+
+    def _sleep(inputs: dict[str, object]) -> dict[str, object]:
+        time.sleep(float(inputs["delay"]))
+        return {"slept": True}
+
+    tools.register("sleep", _sleep)
+    return tools
+
+
+def test_runner_enforces_step_timeout(tmp_path) -> None:
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=_sleep_tools(),
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    start = time.perf_counter()
+    with pytest.raises(StepTimeoutError) as excinfo:
+        runner.run(_sleepy_workflow(tmp_path, timeout=0.05), inputs={"delay": 2})
+
+    assert time.perf_counter() - start < 1
+    assert not isinstance(excinfo.value, RunDeadlineExceededError)
+    run_dir = next((tmp_path / ".runs").iterdir())
+    error = json.loads((run_dir / "steps" / "first" / "error.json").read_text(encoding="utf-8"))
+    assert error["error_type"] == "StepTimeoutError"
+    assert error["stage"] == "timeout"
+
+
+def test_runner_enforces_run_deadline(tmp_path) -> None:
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=_sleep_tools(),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            deadline=0.15,
+        ),
+    )
+
+    with pytest.raises(RunDeadlineExceededError):
+        runner.run(_sleepy_workflow(tmp_path), inputs={"delay": 0.1})
+
+    run_dir = next((tmp_path / ".runs").iterdir())
+    error = json.loads((run_dir / "error.json").read_text(encoding="utf-8"))
+    assert error == {
+        "step_id": "second",
+        "error_type": "RunDeadlineExceededError",
+        "message": "run deadline exceeded during step 'second'",
+        "stage": "timeout",
+    }
+
+
+def test_async_runner_cancels_timed_out_step(tmp_path) -> None:
+    tools = ToolRegistry()
+    cancelled = []
+
+    async def _sleep(inputs: dict[str, object]) -> dict[str, object]:
+        try:
+            await asyncio.sleep(float(inputs["delay"]))
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"slept": True}
+
+    tools.register("sleep", _sleep)
+    runner = AsyncRunner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    with pytest.raises(StepTimeoutError):
+        asyncio.run(runner.run(_sleepy_workflow(tmp_path, timeout=0.05), inputs={"delay": 5}))
+    assert cancelled == [True]
+
+
+def test_runner_passes_remaining_deadline_to_provider(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    timeouts: list[float | None] = []
+
+    class RecordingProvider(MockProvider):
+        def call(self, request):
+            timeouts.append(request.timeout)
+            return super().call(request)
+
+    runner = Runner(
+        provider=RecordingProvider(default_output="{}"),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            deadline=30,
+        ),
+    )
+
+    runner.run(workflow, inputs={"topic": "Testing"})
+
+    assert len(timeouts) == 1
+    assert 0 < timeouts[0] <= 30
+
+
+def test_runner_retries_llm_step_and_records_attempts(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    draft = workflow.spec.steps[0].model_copy(
+        update={"retry": StepRetryConfig(max_attempts=3, initial_delay=0)}
+    )
+    workflow = Workflow(
+        spec=workflow.spec.model_copy(update={"steps": [draft]}),
+        path=workflow.path,
+        workflow_hash=workflow.workflow_hash,
+    )
+    failures = [ProviderError("overloaded")]
+
+    class FlakyProvider(MockProvider):
+        def call(self, request):
+            if failures:
+                raise failures.pop(0)
+            return super().call(request)
+
+    runner = Runner(
+        provider=FlakyProvider(default_output='{"ok": true}'),
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={"topic": "Testing"})
+
+    assert result.outputs == {"result": {"ok": True}}
+    step_dir = result.run_dir / "steps" / "draft"
+    llm_call = json.loads((step_dir / "llm_call.json").read_text(encoding="utf-8"))
+    assert llm_call["request"]["prompt"] == "Hello Testing"
+    assert llm_call["response"]["output_text"] == '{"ok": true}'
+    assert [item["error"] is None for item in llm_call["attempts"]] == [False, True]
+    assert (step_dir / "rendered_prompt.md").read_text(encoding="utf-8") == "Hello Testing"
+    assert "draft" in result.metadata["prompt_hashes"]
+
+
+def test_runner_records_failed_llm_attempts(tmp_path) -> None:
+    class DownProvider(MockProvider):
+        def call(self, request):
+            raise ProviderError("unavailable")
+
+    runner = Runner(
+        provider=DownProvider(),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            retry=RetryPolicy(max_attempts=2, initial_delay=0),
+        ),
+    )
+
+    with pytest.raises(ProviderError):
+        runner.run(_llm_workflow(tmp_path), inputs={"topic": "Testing"})
+
+    run_dir = next((tmp_path / ".runs").iterdir())
+    llm_call = json.loads(
+        (run_dir / "steps" / "draft" / "llm_call.json").read_text(encoding="utf-8")
+    )
+    assert llm_call["response"] is None
+    assert [item["attempt"] for item in llm_call["attempts"]] == [1, 2]
+
+
+def test_runner_runs_only_steps_needed_for_requested_outputs(tmp_path) -> None:
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="branches", version="1.0"),
+        inputs={"topic": InputDef(type="string")},
+        steps=[
+            StepDef(id="draft", type="tool", tool={"name": "record"}),
+            StepDef(id="summary", type="tool", tool={"name": "record"}, depends_on=["draft"]),
+            StepDef(id="translate", type="tool", tool={"name": "record"}, depends_on=["draft"]),
+        ],
+        outputs={"summary": "summary", "translation": "translate"},
+    )
+    workflow = Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="branches")
+    calls: list[int] = []
+    tools = ToolRegistry()
+    tools.register("record", lambda inputs: calls.append(1) or {"count": len(calls)})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    result = runner.run(workflow, inputs={"topic": "Testing"}, outputs=["summary"])
+
+    assert len(calls) == 2
+    assert result.outputs == {"summary": {"count": 2}}
+    assert result.metadata["execution_order"] == ["draft", "summary"]
+    assert result.metadata["skipped_steps"] == ["translate"]
+    assert result.metadata["requested_outputs"] == ["summary"]
+    assert not (result.run_dir / "steps" / "translate").exists()
+
+    with pytest.raises(StepExecutionError, match="unknown workflow outputs"):
+        runner.run(workflow, inputs={"topic": "Testing"}, outputs=["missing"])
+
+
+def test_runner_iter_run_streams_step_events(tmp_path) -> None:
+    workflow = _build_workflow(tmp_path)
+    tools = ToolRegistry()
+    tools.register("echo", lambda inputs: {"topic": inputs["topic"]})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    events = runner.iter_run(workflow, inputs={"topic": "Testing"})
+    first = next(events)
+    completed = next(events)
+
+    assert first == StepStarted("echo")
+    assert isinstance(completed, StepCompleted)
+    assert completed.output == {"topic": "Testing"}
+    run_dir = next((tmp_path / ".runs").iterdir())
+    assert (run_dir / "steps" / "echo" / "output.json").exists()
+
+    final = next(events)
+    assert isinstance(final, RunCompleted)
+    assert final.result.outputs == {"result": {"topic": "Testing"}}
+    with pytest.raises(StopIteration):
+        next(events)
+
+
+def test_runner_iter_run_yields_step_failed_before_raising(tmp_path) -> None:
+    workflow = _build_workflow(tmp_path)
+    tools = ToolRegistry()
+
+    def fail(_: dict[str, object]) -> dict[str, object]:
+        raise RuntimeError("boom")
+
+    tools.register("echo", fail)
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    seen: list[object] = []
+    with pytest.raises(StepExecutionError):
+        for event in runner.iter_run(workflow, inputs={"topic": "Testing"}):
+            seen.append(event)
+
+    assert [type(event) for event in seen] == [StepStarted, StepFailed]
+    assert "boom" in str(seen[1].error)
+
+
+def test_async_runner_iter_run_streams_fan_out(tmp_path) -> None:
+    workflow = _fan_out_workflow(tmp_path, width=3)
+    tools = ToolRegistry()
+    tools.register("branch", lambda inputs: {"ok": True})
+    tools.register("join", lambda inputs: {"done": True})
+    runner = AsyncRunner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            max_concurrency=3,
+        ),
+    )
+
+    async def _collect() -> list[object]:
+        return [event async for event in runner.iter_run(workflow, inputs={"topic": "t"})]
+
+    events = asyncio.run(_collect())
+
+    completed = [event.step_id for event in events if isinstance(event, StepCompleted)]
+    started = [event.step_id for event in events if isinstance(event, StepStarted)]
+    assert sorted(completed) == sorted(started)
+    assert len(completed) == len(workflow.spec.steps)
+    assert isinstance(events[-1], RunCompleted)
+
+
+def test_runner_dispatches_critical_path_first(tmp_path) -> None:
+    spec = WorkflowSpec(
+        workflow=WorkflowMeta(name="uneven", version="1.0"),
+        inputs={"topic": InputDef(type="string")},
+        steps=[
+            StepDef(id="short_a", type="tool", tool={"name": "work"}),
+            StepDef(id="short_b", type="tool", tool={"name": "work"}),
+            StepDef(id="head", type="tool", tool={"name": "work"}),
+            StepDef(id="tail", type="tool", tool={"name": "work"}, depends_on=["head"]),
+        ],
+        outputs={"result": "tail"},
+    )
+    workflow = Workflow(spec=spec, path=tmp_path / "workflow.yaml", workflow_hash="uneven")
+    durations = StepDurations()
+    durations.add_samples("tail", [5.0])
+    tools = ToolRegistry()
+    tools.register("work", lambda inputs: {})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            max_concurrency=2,
+            step_durations=durations,
+        ),
+    )
+
+    events = list(runner.iter_run(workflow, inputs={"topic": "t"}))
+
+    started = [event.step_id for event in events if isinstance(event, StepStarted)]
+    assert started[0] == "head"
+    # Completed runs feed the history.
+    assert set(durations.estimates()) == {"short_a", "short_b", "head", "tail"}
+
+
+def test_runner_iter_run_yields_streamed_output_deltas(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    runner = Runner(
+        provider=MockProvider(default_output='{"title": "Streamed"}', chunk_size=8),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            stream_outputs=True,
+        ),
+    )
+
+    events = list(runner.iter_run(workflow, inputs={"topic": "Testing"}))
+
+    assert events[0] == StepStarted("draft")
+    deltas = [event for event in events if isinstance(event, StepOutputDelta)]
+    assert [event.text for event in deltas] == ['{"title"', ': "Strea', 'med"}']
+    assert all(event.step_id == "draft" and event.attempt == 1 for event in deltas)
+    assert isinstance(events[len(deltas) + 1], StepCompleted)
+    assert events[-1].result.outputs == {"result": {"title": "Streamed"}}
+
+
+def test_async_runner_iter_run_yields_streamed_output_deltas(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    runner = AsyncRunner(
+        provider=MockProvider(default_output='{"title": "Streamed"}', chunk_size=8),
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            stream_outputs=True,
+        ),
+    )
+
+    async def _collect() -> list[object]:
+        return [event async for event in runner.iter_run(workflow, inputs={"topic": "t"})]
+
+    events = asyncio.run(_collect())
+
+    assert [type(event) for event in events] == [
+        StepStarted,
+        StepOutputDelta,
+        StepOutputDelta,
+        StepOutputDelta,
+        StepCompleted,
+        RunCompleted,
+    ]
+    assert "".join(event.text for event in events[1:4]) == '{"title": "Streamed"}'
+
+
+def test_runner_reports_provider_cache_hits_per_run(tmp_path) -> None:
+    workflow = _llm_workflow(tmp_path)
+    provider = CachingProvider(MockProvider(default_output='{"title": "A"}'), MemoryStepCache())
+    runner = Runner(
+        provider=provider,
+        config=RunConfig(artifacts_dir=tmp_path / ".runs", provider_name="mock"),
+    )
+
+    first = runner.run(workflow, inputs={"topic": "Testing"})
+    second = runner.run(workflow, inputs={"topic": "Testing"})
+
+    assert first.metadata["provider_cache"] == {
+        "hits": 0,
+        "misses": 1,
+        "steps": {"draft": {"hits": 0, "misses": 1}},
+    }
+    assert second.metadata["provider_cache"]["hits"] == 1
+    assert second.metadata["provider_cache"]["misses"] == 0
+    assert second.outputs == first.outputs
+
+
+@pytest.mark.parametrize(("cache", "expected_calls"), [(None, 2), (True, 1)])
+def test_runner_caches_tool_steps_only_when_opted_in(tmp_path, cache, expected_calls) -> None:
+    workflow = _build_workflow(tmp_path)
+    workflow.spec.steps[0].cache = cache
+    calls: list[str] = []
+    tools = ToolRegistry()
+    tools.register("echo", lambda inputs: calls.append(inputs["topic"]) or {"value": "ok"})
+    runner = Runner(
+        provider=MockProvider(default_output="{}"),
+        tools=tools,
+        config=RunConfig(
+            artifacts_dir=tmp_path / ".runs",
+            provider_name="mock",
+            cache=MemoryStepCache(),
+        ),
+    )
+
+    runner.run(workflow, inputs={"topic": "same"})
+    second = runner.run(workflow, inputs={"topic": "same"})
+
+    assert len(calls) == expected_calls
+    assert list(second.metadata["cache_hits"]) == (["echo"] if cache else [])
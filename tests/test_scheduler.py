@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from llmflow.graph import build_graph
+from llmflow.scheduler import ReadyQueue, critical_path_priorities
+from llmflow.workflow import StepDef
+
+
+def _step(step_id: str, *, depends_on: list[str] | None = None) -> StepDef:
+    return StepDef(
+        id=step_id,
+        type="tool",
+        depends_on=depends_on or [],
+        tool={"name": "noop"},
+    )
+
+
+def test_ready_queue_releases_steps_when_dependencies_complete() -> None:
+    graph = build_graph(
+        [
+            _step("a"),
+            _step("b"),
+            _step("c", depends_on=["a", "b"]),
+            _step("d", depends_on=["a"]),
+        ]
+    )
+    ready = ReadyQueue(graph)
+
+    assert [ready.pop(), ready.pop()] == ["a", "b"]
+    assert not ready
+
+    ready.complete("b")
+    assert not ready
+
+    ready.complete("a")
+    assert [ready.pop(), ready.pop()] == ["d", "c"]
+    assert not ready
+
+
+def test_critical_path_priorities_follow_longest_remaining_path() -> None:
+    graph = build_graph(
+        [
+            _step("short"),
+            _step("head"),
+            _step("tail", depends_on=["head"]),
+            _step("unknown"),
+        ]
+    )
+
+    priorities = critical_path_priorities(graph, {"short": 1.0, "head": 2.0, "tail": 4.0})
+
+    assert priorities["head"] == 6.0
+    assert priorities["tail"] == 4.0
+    assert priorities["short"] == 1.0
+    # Unknown steps use the mean of the known durations.
+    assert priorities["unknown"] == 7.0 / 3
+
+
+def test_ready_queue_releases_critical_path_first() -> None:
+    graph = build_graph(
+        [
+            _step("short_a"),
+            _step("short_b"),
+            _step("head"),
+            _step("tail", depends_on=["head"]),
+        ]
+    )
+    priorities = critical_path_priorities(
+        graph, {"short_a": 1.0, "short_b": 1.0, "head": 1.0, "tail": 5.0}
+    )
+    ready = ReadyQueue(graph, priorities)
+
+    assert [ready.pop(), ready.pop(), ready.pop()] == ["head", "short_a", "short_b"]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from jsonschema import Draft7Validator
+
+from llmflow.errors import LLMOutputSchemaError, LLMOutputValidationError
+from llmflow.schemas import OutputValidator, SchemaCache, compile_schema
+
+ARTICLE_SCHEMA: dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "required": ["title", "sections", "status"],
+    "additionalProperties": False,
+    "properties": {
+        "title": {"type": "string", "description": "Headline"},
+        "status": {"enum": ["draft", "final", None]},
+        "score": {"type": ["integer", "null"]},
+        "ratio": {"type": "number"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["heading"],
+                "properties": {
+                    "heading": {"type": "string"},
+                    "published": {"type": "boolean"},
+                },
+            },
+        },
+    },
+}
+
+VALID = {
+    "title": "T",
+    "status": "draft",
+    "score": 3,
+    "ratio": 0.5,
+    "sections": [{"heading": "Intro", "published": True}],
+}
+
+INSTANCES: list[Any] = [
+    VALID,
+    {**VALID, "status": None, "score": None, "ratio": 2},
+    {**VALID, "score": 3.0},
+    {**VALID, "score": 3.5},
+    {**VALID, "score": True},
+    {**VALID, "ratio": False},
+    {**VALID, "status": "archived"},
+    {**VALID, "extra": 1},
+    {key: value for key, value in VALID.items() if key != "title"},
+    {**VALID, "sections": [{"published": True}]},
+    {**VALID, "sections": [{"heading": 1}]},
+    {**VALID, "sections": {}},
+    [],
+    "text",
+]
+
+
+@pytest.mark.parametrize("instance", INSTANCES)
+def test_compiled_schema_agrees_with_jsonschema(instance: Any) -> None:
+    check = compile_schema(ARTICLE_SCHEMA)
+
+    assert check is not None
+    assert check(instance) == Draft7Validator(ARTICLE_SCHEMA).is_valid(instance)
+
+
+def test_unsupported_schema_falls_back_to_jsonschema() -> None:
+    schema = {"type": "object", "properties": {"title": {"type": "string", "minLength": 3}}}
+    validator = OutputValidator(schema)
+
+    assert not validator.is_fast
+    validator.validate({"title": "Long"})
+    with pytest.raises(LLMOutputValidationError, match="is too short"):
+        validator.validate({"title": "ab"})
+
+
+def test_fast_validator_reports_jsonschema_errors() -> None:
+    validator = OutputValidator(ARTICLE_SCHEMA)
+
+    assert validator.is_fast
+    with pytest.raises(LLMOutputValidationError, match="'archived' is not one of"):
+        validator.validate({**VALID, "status": "archived"})
+
+
+def test_schema_cache_reuses_and_reloads(tmp_path: Path) -> None:
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text('{"type": "object"}', encoding="utf-8")
+    cache = SchemaCache()
+
+    first = cache.get(schema_path)
+    assert cache.get(schema_path) is first
+
+    schema_path.write_text('{"type": "array"}', encoding="utf-8")
+    assert cache.get(schema_path).schema == {"type": "array"}
+
+    schema_path.write_text('{"type": 5}', encoding="utf-8")
+    with pytest.raises(LLMOutputSchemaError, match="output schema is invalid"):
+        cache.get(schema_path)
+
+
+def test_fast_validation_benchmark() -> None:
+    fast = OutputValidator(ARTICLE_SCHEMA)
+    slow = OutputValidator(ARTICLE_SCHEMA, fast=False)
+    rounds = 2000
+
+    def _time(validator: OutputValidator) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            validator.validate(VALID)
+        return time.perf_counter() - started
+
+    fast_seconds = _time(fast)
+    slow_seconds = _time(slow)
+
+    # The generated check is typically well over 10x faster.
+    assert fast_seconds * 3 < slow_seconds, (fast_seconds, slow_seconds)
+
+
+_STREAM_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "properties": {
+        "title": {"type": "string"},
+        "score": {"type": ["integer", "null"]},
+        "extra": {},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"title": "a \\"}\\" b", "score": null, "extra": {"x": ["}", 1]}}',
+        ' {"score" : -3 , "title":"t"}\n',
+        '{"title": "broken',
+        '{"title" "no colon"',
+    ],
+)
+def test_stream_checker_accepts_prefixes_that_may_be_valid(text: str) -> None:
+    checker = OutputValidator(_STREAM_SCHEMA).stream_checker()
+    for char in text:
+        checker.feed(char)
+
+
+@pytest.mark.parametrize(
+    ("text", "message"),
+    [
+        ('["title"]', "must be a JSON object"),
+        ('{"title": "t", "tags": [', "'tags' is not allowed"),
+        ('{"title": 3', "'title' has the wrong type"),
+        ('{"score": "3"', "'score' has the wrong type"),
+        ('{"title": "t"} Hope this helps', "unexpected data after the object"),
+    ],
+)
+def test_stream_checker_rejects_invalid_prefix(text: str, message: str) -> None:
+    checker = OutputValidator(_STREAM_SCHEMA).stream_checker()
+    with pytest.raises(LLMOutputValidationError, match=message):
+        for char in text:
+            checker.feed(char)
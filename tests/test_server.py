@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from llmflow import MockProvider, RunConfig, Runner, Workflow
+from llmflow.errors import WorkflowError
+from llmflow.server import WorkflowServer
+
+
+def _write_workflow(tmp_path: Path) -> Path:
+    workflow_path = tmp_path / "workflow.yaml"
+    prompt_path = tmp_path / "prompts" / "outline.md"
+    schema_path = tmp_path / "schemas" / "outline.json"
+    prompt_path.parent.mkdir(parents=True)
+    schema_path.parent.mkdir(parents=True)
+    prompt_path.write_text("Outline {{ inputs.topic }}", encoding="utf-8")
+    schema_path.write_text("{}", encoding="utf-8")
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: outline
+    type: llm
+    prompt: prompts/outline.md
+    output_schema: schemas/outline.json
+    llm:
+      model: mock-model
+      temperature: 0
+
+outputs:
+  article: outline
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    return workflow_path
+
+
+@pytest.fixture
+def server_url(tmp_path: Path) -> Iterator[str]:
+    runner = Runner(
+        provider=MockProvider(default_output='{"title": "Draft"}'),
+        config=RunConfig(artifacts_dir=tmp_path / "runs"),
+    )
+    app = WorkflowServer(runner, [Workflow.load(_write_workflow(tmp_path))], workers=2)
+    http_server = app.create_http_server("127.0.0.1", 0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{http_server.server_address[1]}"
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
+        app.close()
+
+
+def _request(url: str, body: bytes | None = None) -> tuple[int, Any]:
+    request = urllib.request.Request(url, data=body, method="POST" if body is not None else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_server_runs_compiled_workflow(server_url: str) -> None:
+    status, health = _request(f"{server_url}/health")
+    assert (status, health) == (200, {"status": "ok"})
+
+    status, listing = _request(f"{server_url}/workflows")
+    assert status == 200
+    assert [item["name"] for item in listing["workflows"]] == ["demo"]
+
+    body = json.dumps({"inputs": {"topic": "AI"}}).encode("utf-8")
+    first_status, first = _request(f"{server_url}/runs/demo", body)
+    second_status, second = _request(f"{server_url}/runs/demo", body)
+
+    assert first_status == second_status == 200
+    assert first["outputs"] == {"article": {"title": "Draft"}}
+    assert first["run_id"] != second["run_id"]
+    assert Path(first["run_dir"], "metadata.json").exists()
+
+
+def test_server_reports_request_errors(server_url: str) -> None:
+    status, payload = _request(f"{server_url}/runs/missing", b"{}")
+    assert status == 404
+    assert "unknown workflow 'missing'" in payload["error"]["message"]
+
+    status, payload = _request(f"{server_url}/runs/demo", b"not json")
+    assert status == 400
+
+    status, payload = _request(f"{server_url}/runs/demo", b'{"inputs": {}}')
+    assert status == 422
+    assert "missing required inputs: topic" in payload["error"]["message"]
+
+
+def test_server_rejects_duplicate_workflow_names(tmp_path: Path) -> None:
+    workflow = Workflow.load(_write_workflow(tmp_path))
+    runner = Runner(provider=MockProvider(default_output="{}"))
+
+    with pytest.raises(WorkflowError, match="duplicate workflow name 'demo'"):
+        WorkflowServer(runner, [workflow, workflow])
+
+
+def test_server_sends_canonical_json(server_url: str) -> None:
+    with urllib.request.urlopen(f"{server_url}/health", timeout=10) as response:
+        body = response.read()
+
+    assert body == b'{"status":"ok"}'
+    assert response.headers["Content-Length"] == str(len(body))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from llmflow.errors import ArtifactsError
+from llmflow.stats import StepDurations
+
+
+def _write_run(artifacts_dir: Path, name: str, workflow: str, timeline: dict, **extra) -> None:
+    run_dir = artifacts_dir / name
+    run_dir.mkdir(parents=True)
+    metadata = {
+        "workflow": {"name": workflow},
+        "timeline": {
+            step_id: {"duration_ms": duration} for step_id, duration in timeline.items()
+        },
+        **extra,
+    }
+    (run_dir / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+
+
+def test_step_durations_from_artifacts_uses_recent_runs(tmp_path: Path) -> None:
+    _write_run(tmp_path, "run_20240101_000000_a", "demo", {"draft": 1000})
+    _write_run(tmp_path, "run_20240102_000000_b", "demo", {"draft": 3000})
+    _write_run(tmp_path, "run_20240103_000000_c", "demo", {"draft": 5000})
+    _write_run(tmp_path, "run_20240104_000000_d", "other", {"draft": 99000})
+    _write_run(
+        tmp_path,
+        "run_20240105_000000_e",
+        "demo",
+        {"draft": 1},
+        cache_hits={"draft": "key"},
+    )
+
+    durations = StepDurations.from_artifacts(tmp_path, "demo", window=3)
+
+    assert durations.estimates() == {"draft": 4.0}
+
+
+def test_step_durations_round_trip_stats_file(tmp_path: Path) -> None:
+    stats_path = tmp_path / "stats.json"
+    assert StepDurations.load(stats_path).estimates() == {}
+
+    durations = StepDurations()
+    durations.record({"timeline": {"draft": {"duration_ms": 1500}}})
+    durations.save(stats_path)
+
+    assert StepDurations.load(stats_path).estimates() == {"draft": 1.5}
+
+    stats_path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ArtifactsError):
+        StepDurations.load(stats_path)
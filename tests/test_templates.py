@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from llmflow import Workflow
+from llmflow.errors import LLMRenderError
+from llmflow.providers import MockProvider
+from llmflow.steps import LLMStep
+from llmflow.templates import TemplateCache
+from llmflow.workflow import StepDef
+
+
+def _step_def(tmp_path: Path, step_id: str, prompt_path: Path) -> StepDef:
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text("{}", encoding="utf-8")
+    return StepDef(
+        id=step_id,
+        type="llm",
+        prompt=str(prompt_path),
+        output_schema=str(schema_path),
+        llm={"model": "mock"},
+    )
+
+
+def test_template_cache_shares_compiled_templates(tmp_path: Path) -> None:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("Hello {{ inputs.topic }}", encoding="utf-8")
+    cache = TemplateCache()
+    provider = MockProvider(default_output="{}")
+
+    first = LLMStep(_step_def(tmp_path, "a", prompt_path), provider=provider, templates=cache)
+    second = LLMStep(_step_def(tmp_path, "b", prompt_path), provider=provider, templates=cache)
+    first.prepare()
+    second.prepare()
+
+    assert cache.get(prompt_path) is cache.get(prompt_path)
+    assert cache.get(prompt_path).render(inputs={"topic": "AI"}) == "Hello AI"
+
+    prompt_path.write_text("Bye {{ inputs.topic }}", encoding="utf-8")
+    assert cache.get(prompt_path).render(inputs={"topic": "AI"}) == "Bye AI"
+
+
+def test_template_cache_writes_bytecode(tmp_path: Path) -> None:
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("Hello {{ inputs.topic }}", encoding="utf-8")
+    bytecode_dir = tmp_path / "bytecode"
+
+    cache = TemplateCache(bytecode_dir=bytecode_dir)
+    cache.get(prompt_path)
+    assert list(bytecode_dir.iterdir())
+
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.get(prompt_path).render(inputs={"topic": "AI"}) == "Hello AI"
+
+
+def test_template_cache_reports_errors(tmp_path: Path) -> None:
+    cache = TemplateCache()
+    broken = tmp_path / "broken.md"
+    broken.write_text("Hello {{ inputs.topic ", encoding="utf-8")
+
+    with pytest.raises(LLMRenderError, match="failed to compile prompt"):
+        cache.get(broken)
+    with pytest.raises(LLMRenderError, match="failed to read prompt file"):
+        cache.get(tmp_path / "missing.md")
+
+
+def test_workflow_load_precompiles_prompts(tmp_path: Path) -> None:
+    (tmp_path / "prompt.md").write_text("{% if %}", encoding="utf-8")
+    (tmp_path / "schema.json").write_text("{}", encoding="utf-8")
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+inputs: {}
+steps:
+  - id: outline
+    type: llm
+    prompt: prompt.md
+    output_schema: schema.json
+    llm:
+      model: mock
+outputs:
+  article: outline
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+
+    assert Workflow.load(workflow_path).spec.steps[0].id == "outline"
+    with pytest.raises(LLMRenderError, match="step 'outline'"):
+        Workflow.load(workflow_path, precompile=True)
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from llmflow.errors import ToolExecutionError
@@ -40,3 +42,17 @@ def test_tool_step_requires_dict_output() -> None:
 
     with pytest.raises(ToolExecutionError):
         step.execute({"value": "hello"})
+
+
+def test_tool_step_aexecute_awaits_async_tool() -> None:
+    async def echo(inputs: dict) -> dict:
+        return {"echo": inputs["value"]}
+
+    tools = ToolRegistry()
+    tools.register("echo", echo)
+
+    step = ToolStep(StepDef(id="tool", type="tool", tool={"name": "echo"}), tools=tools)
+
+    assert asyncio.run(step.aexecute({"value": "hello"})) == {"echo": "hello"}
+    with pytest.raises(ToolExecutionError):
+        step.execute({"value": "hello"})
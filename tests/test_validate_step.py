@@ -56,3 +56,15 @@ def test_validate_step_validator_returns_invalid_type() -> None:
 
     with pytest.raises(ValidationRuleError):
         step.execute({"name": "ok"})
+
+
+def test_validate_step_passthrough_returns_inputs_without_copy() -> None:
+    step_def = StepDef(
+        id="validate",
+        type="validate",
+        validate={"required": ["name"], "passthrough": True},
+    )
+    step = ValidateStep(step_def, validators=ValidatorRegistry())
+    inputs = {"name": "demo"}
+
+    assert step.execute(inputs) is inputs
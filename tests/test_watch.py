@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from llmflow import MockProvider, RunConfig, Runner, Workflow
+from llmflow.errors import WorkflowError
+from llmflow.watch import WorkflowWatcher
+
+
+def _write_workflow(tmp_path: Path, *, extra_step: str = "") -> Path:
+    workflow_path = tmp_path / "workflow.yaml"
+    for name in ("outline", "critique"):
+        prompt_path = tmp_path / "prompts" / f"{name}.md"
+        prompt_path.parent.mkdir(parents=True, exist_ok=True)
+        if not prompt_path.exists():
+            prompt_path.write_text(f"{name} {{{{ inputs.topic }}}}", encoding="utf-8")
+    schema_path = tmp_path / "schemas" / "any.json"
+    schema_path.parent.mkdir(parents=True, exist_ok=True)
+    schema_path.write_text("{}", encoding="utf-8")
+    workflow_path.write_text(
+        f"""
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: outline
+    type: llm
+    prompt: prompts/outline.md
+    output_schema: schemas/any.json
+    llm:
+      model: mock-model
+  - id: critique
+    type: llm
+    depends_on: [outline]
+    prompt: prompts/critique.md
+    output_schema: schemas/any.json
+    llm:
+      model: mock-model
+{extra_step}
+outputs:
+  article: critique
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    return workflow_path
+
+
+def _runner(tmp_path: Path) -> Runner:
+    return Runner(
+        provider=MockProvider(default_output="{}"),
+        config=RunConfig(artifacts_dir=tmp_path / "runs"),
+    )
+
+
+def test_watcher_recompiles_only_changed_steps(tmp_path: Path) -> None:
+    watcher = WorkflowWatcher(_runner(tmp_path), _write_workflow(tmp_path))
+    before = watcher.plan
+
+    assert watcher.check() is False
+
+    (tmp_path / "prompts" / "critique.md").write_text("New critique", encoding="utf-8")
+    assert watcher.check() is True
+
+    after = watcher.plan
+    assert after is not before
+    assert after.steps["outline"] is before.steps["outline"]
+    assert after.steps["critique"] is not before.steps["critique"]
+    assert after.bundle is not None and before.bundle is not None
+    assert after.bundle.hash != before.bundle.hash
+
+
+def test_watcher_reloads_workflow_edits(tmp_path: Path) -> None:
+    workflow_path = _write_workflow(tmp_path)
+    reloaded = []
+    watcher = WorkflowWatcher(_runner(tmp_path), workflow_path, on_reload=reloaded.append)
+    before = watcher.plan
+
+    _write_workflow(
+        tmp_path,
+        extra_step="""
+  - id: summary
+    type: llm
+    depends_on: [critique]
+    prompt: prompts/outline.md
+    output_schema: schemas/any.json
+    llm:
+      model: mock-model
+""",
+    )
+    assert watcher.check() is True
+
+    assert reloaded == [watcher.plan]
+    assert watcher.plan.order == ["outline", "critique", "summary"]
+    assert watcher.plan.steps["outline"] is before.steps["outline"]
+
+
+def test_watcher_keeps_plan_when_reload_fails(tmp_path: Path) -> None:
+    workflow_path = _write_workflow(tmp_path)
+    watcher = WorkflowWatcher(_runner(tmp_path), workflow_path)
+    before = watcher.plan
+
+    workflow_path.write_text("workflow: [", encoding="utf-8")
+    with pytest.raises(WorkflowError):
+        watcher.check()
+
+    assert watcher.plan is before
+
+
+def test_watcher_polls_in_background(tmp_path: Path) -> None:
+    reloaded = threading.Event()
+    runner = _runner(tmp_path)
+    watcher = WorkflowWatcher(
+        runner,
+        Workflow.load(_write_workflow(tmp_path)),
+        interval=0.01,
+        on_reload=lambda plan: reloaded.set(),
+    )
+
+    with watcher:
+        (tmp_path / "prompts" / "outline.md").write_text("Edited", encoding="utf-8")
+        assert reloaded.wait(5)
+
+    result = runner.run(watcher.plan, {"topic": "AI"})
+    assert result.outputs == {"article": {}}
@@ -101,3 +101,71 @@ outputs:
     )
     with pytest.raises(WorkflowValidationError):
         Workflow.load(workflow_path)
+
+
+def test_workflow_load_rejects_retry_on_non_llm_step(tmp_path: Path) -> None:
+    workflow_path = tmp_path / "workflow.yaml"
+    workflow_path.write_text(
+        """
+workflow:
+  name: demo
+  version: "1.0"
+
+inputs:
+  topic:
+    type: string
+
+steps:
+  - id: fetch
+    type: tool
+    tool:
+      name: fetch
+    retry:
+      max_attempts: 3
+
+outputs:
+  article: fetch
+""".strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(WorkflowValidationError, match="retry"):
+        Workflow.load(workflow_path)
+
+
+def test_workflow_load_uses_compiled_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    workflow_path = tmp_path / "workflow.yaml"
+    cache_dir = tmp_path / "cache"
+    _write_workflow(workflow_path)
+
+    first = Workflow.load(workflow_path, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    def _fail(payload: object) -> None:
+        raise AssertionError("cached load must not re-validate the spec")
+
+    monkeypatch.setattr("llmflow.workflow.WorkflowSpec.model_validate", _fail)
+    cached = Workflow.load(workflow_path, cache_dir=cache_dir)
+
+    assert cached == first
+    assert cached.graph().order == ["outline"]
+
+
+def test_workflow_load_cache_invalidated_by_edit(tmp_path: Path) -> None:
+    workflow_path = tmp_path / "workflow.yaml"
+    cache_dir = tmp_path / "cache"
+    _write_workflow(workflow_path)
+    Workflow.load(workflow_path, cache_dir=cache_dir)
+
+    raw = _write_workflow(workflow_path, prompt_path="prompts/other.md")
+    workflow = Workflow.load(workflow_path, cache_dir=cache_dir)
+
+    assert workflow.workflow_hash == sha256_text(raw)
+    assert workflow.spec.steps[0].prompt.endswith("other.md")
+
+    # Corrupt entries are treated as misses and rewritten.
+    for entry in cache_dir.glob("*.pickle"):
+        entry.write_bytes(b"not a pickle")
+    assert Workflow.load(workflow_path, cache_dir=cache_dir) == workflow